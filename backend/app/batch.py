@@ -0,0 +1,144 @@
+# backend/app/batch.py
+"""
+Batch variant generation: n variants of a project across tone x persona.
+
+- variant_matrix() walks tones x personas in order and wraps around until
+  n variants are covered.
+- Scripts and storyboards are composed inline, or in a process pool once a
+  batch reaches REELIXX_BATCH_POOL_MIN variants (the template generator takes
+  tens of microseconds, so small batches are cheaper without the IPC).
+- The batch job, every variant and (with render=True) one assemble-variant
+  job per variant are written with bulk INSERTs and a single commit.
+- Queued renders share assets: one end card rendered for the whole batch,
+  the worker's preloaded music bed, and the single-flight TTS cache, so a
+  line every variant speaks is synthesized once.
+- With plan=True the renders go out as a single render-batch job instead,
+  which plans every variant into one deduplicated asset graph
+  (generators/render_plan.py) and reports what the sharing saved.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .diskcache import content_key
+from .generators import image_pool
+from .generators.script_template import generate_script, script_caption
+from .generators.static_endcard import render_endcard_png
+from .generators.storyboard import compose_storyboard
+from .jobqueue import _utcnow, enqueue_many
+from .models import Job, JobStatus, Project, Variant
+
+POOL_MIN = int(os.getenv("REELIXX_BATCH_POOL_MIN", "64"))
+POOL_WORKERS = int(os.getenv("REELIXX_BATCH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+Combo = Tuple[Optional[str], Optional[str]]
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def variant_matrix(n: int, tones: Sequence[str] | None, personas: Sequence[str] | None) -> List[Combo]:
+    """(tone, persona) for each of n variants, cycling through tones x personas."""
+    combos = list(product(tones or [None], personas or [None]))
+    return [combos[i % len(combos)] for i in range(n)]
+
+
+def _compose(job: Tuple[Dict[str, Any], Optional[str], Optional[str]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    brief, tone, persona = job
+    script = generate_script(brief, tone=tone, persona=persona)
+    return script, compose_storyboard(script, brief)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return _pool
+
+
+def compose_all(
+    brief: Dict[str, Any], combos: Sequence[Combo], *, pool_min: int = POOL_MIN
+) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(script, storyboard) per combo, in order."""
+    jobs = [(brief, tone, persona) for tone, persona in combos]
+    if len(jobs) < pool_min or POOL_WORKERS < 2:
+        return [_compose(j) for j in jobs]
+    chunk = max(1, math.ceil(len(jobs) / (POOL_WORKERS * 4)))
+    return list(_get_pool().map(_compose, jobs, chunksize=chunk))
+
+
+def shared_endcard(project: Project, canvas: Tuple[int, int]) -> Path:
+    """The project's static end card at `canvas`, rendered once and cached."""
+    brief, brand = project.brief_json or {}, project.brand_json or {}
+    w, h = canvas
+    key = content_key("endcard", json.dumps([brief.get("title"), brand], sort_keys=True, default=str), w, h)
+    return image_pool.image_cache.get_or_create(
+        key, lambda tmp: tmp.write_bytes(render_endcard_png(brief, brand, w=w, h=h)), suffix=".png"
+    )
+
+
+def create_batch(
+    db: Session,
+    project: Project,
+    *,
+    n: int,
+    tones: Sequence[str] | None = None,
+    personas: Sequence[str] | None = None,
+    render: bool = False,
+    renderer: Optional[str] = None,
+    local_only: Optional[bool] = None,
+    plan: bool = False,
+) -> Job:
+    """
+    Create n ready variants (and optionally their queued renders) in one
+    transaction. The returned job's result_json lists variant and render job ids.
+    """
+    combos = variant_matrix(n, tones, personas)
+    composed = compose_all(project.brief_json or {}, combos)
+
+    job = Job(project_id=project.id, kind="generate-variant", status=JobStatus.completed,
+              progress=1.0, attempts=0, created_at=_utcnow())
+    db.add(job)
+    rows = [
+        {"project_id": project.id, "tone": tone, "persona": persona, "status": "ready",
+         "script_json": script, "storyboard_json": storyboard}
+        for (tone, persona), (script, storyboard) in zip(combos, composed)
+    ]
+    # one multi-row INSERT; ids are handed out in VALUES order, so sorted ids match rows
+    variant_ids = sorted(db.scalars(insert(Variant).returning(Variant.id), rows))
+
+    render_jobs: List[int] = []
+    if render:
+        endcard = shared_endcard(project, image_pool.canvas_of(composed[0][1]))
+        brand = project.brand_json if isinstance(project.brand_json, dict) else {}
+        color = brand.get("color") if isinstance(brand.get("color"), str) else "#111111"
+        if plan:
+            payload = {"variant_ids": variant_ids, "brand_color": color, "local_only": local_only,
+                       "endcard": str(endcard)}
+            render_jobs = enqueue_many(db, "render-batch", [payload], project_id=project.id)
+        else:
+            payloads = [
+                {"variant_id": vid, "caption": script_caption(script), "brand_color": color,
+                 "renderer": renderer, "local_only": local_only, "endcard": str(endcard)}
+                for vid, (script, _) in zip(variant_ids, composed)
+            ]
+            render_jobs = enqueue_many(db, "assemble-variant", payloads, project_id=project.id)
+
+    # tone/persona live on the variants; the job only points at them
+    job.result_json = {"variant_ids": variant_ids, "render_jobs": render_jobs}
+    db.commit()
+    return job
+
+
+__all__ = ["variant_matrix", "compose_all", "shared_endcard", "create_batch"]
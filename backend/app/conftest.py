@@ -0,0 +1,48 @@
+import atexit
+import os
+import shutil
+import tempfile
+import traceback
+from pathlib import Path
+
+# Before any app module is imported: the database, caches and exports of a test
+# run live in a throwaway directory, so the checked-in reelixx.db and app/ stay untouched.
+_RUN_DIR = Path(tempfile.mkdtemp(prefix="reelixx-tests-"))
+atexit.register(shutil.rmtree, _RUN_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{_RUN_DIR / 'reelixx.db'}"
+os.environ["REELIXX_EXPORT_DIR"] = str(_RUN_DIR / "exports")
+for _name, _path in {
+    "REELIXX_PACK_CACHE_DIR": "cache/packs",
+    "REELIXX_MUSIC_CACHE_DIR": "cache/music",
+    "REELIXX_TTS_CACHE_DIR": "cache/tts",
+    "REELIXX_SEGMENT_CACHE_DIR": "cache/segments",
+    "REELIXX_IMAGE_CACHE_DIR": "cache/images",
+    "REELIXX_SCRAPE_CACHE_DB": "cache/scrape.sqlite",
+    "REELIXX_QUEUE_LOCK": "reelixx-jobqueue.lock",
+}.items():
+    os.environ[_name] = str(_RUN_DIR / _path)
+
+import pytest  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.pool import Pool  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_leaked_connections():
+    """Fail a test that leaves a pooled connection checked out (an unclosed session or connection)."""
+    held = {}
+
+    def checkout(_dbapi_conn, record, _proxy):
+        held[id(record)] = "".join(traceback.format_stack(limit=12)[:-1])
+
+    def checkin(_dbapi_conn, record):
+        held.pop(id(record), None)
+
+    event.listen(Pool, "checkout", checkout)
+    event.listen(Pool, "checkin", checkin)
+    try:
+        yield
+    finally:
+        event.remove(Pool, "checkout", checkout)
+        event.remove(Pool, "checkin", checkin)
+    assert not held, "connection(s) never returned to the pool, checked out at:\n" + "\n".join(held.values())
@@ -1,21 +1,145 @@
+"""
+Engine and session factory.
+
+Pooling is configured per backend:
+
+- SQLite files get WAL (readers never wait on the writer), synchronous=NORMAL
+  (fsync at checkpoints, not on every commit; still durable across app
+  crashes) and a busy timeout, so writers queue instead of failing with
+  "database is locked".
+- Postgres connections are pre-pinged on checkout and recycled after
+  REELIXX_DB_POOL_RECYCLE_S, so connections dropped by the server or a proxy
+  never reach a request.
+
+Both use a bounded QueuePool (REELIXX_DB_POOL_SIZE + REELIXX_DB_MAX_OVERFLOW;
+the defaults match the 40 threads Starlette runs sync endpoints on, so status
+polls queue for a thread, not for a connection). pool_metrics() reports
+checked-out / overflow connections and how long checkouts waited.
+"""
 from __future__ import annotations
 
 import os
-from typing import Generator
+import threading
+import time
+from typing import Any, Dict, Generator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./reelixx.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-    ),
-    future=True,
-)
+POOL_SIZE = int(os.getenv("REELIXX_DB_POOL_SIZE", "20"))
+MAX_OVERFLOW = int(os.getenv("REELIXX_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT_S = float(os.getenv("REELIXX_DB_POOL_TIMEOUT_S", "10"))
+POOL_RECYCLE_S = int(os.getenv("REELIXX_DB_POOL_RECYCLE_S", "1800"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("REELIXX_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.waits = {"checkouts": 0, "waited": 0, "timeouts": 0, "wait_s": 0.0, "max_wait_s": 0.0}
+        self._waits_lock = threading.Lock()
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._waits_lock:
+                self.waits["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - t0
+            with self._waits_lock:
+                w = self.waits
+                w["checkouts"] += 1
+                w["wait_s"] += waited
+                w["max_wait_s"] = max(w["max_wait_s"], waited)
+                if waited > 0.001:  # queued for a connection, or had to open one
+                    w["waited"] += 1
+
+    def recreate(self) -> "TimedQueuePool":
+        # engine.dispose() swaps in a fresh pool; keep counting into the same totals
+        pool = super().recreate()
+        pool.waits, pool._waits_lock = self.waits, self._waits_lock
+        return pool
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory(url: str) -> bool:
+    return _is_sqlite(url) and (url.rstrip("/").endswith(":memory:") or url in ("sqlite://", "sqlite:///"))
+
+
+def engine_kwargs(url: str) -> Dict[str, Any]:
+    """create_engine() arguments for `url`'s backend."""
+    if _is_memory(url):
+        # one shared in-memory database: SQLAlchemy's default pool for it
+        return {"connect_args": {"check_same_thread": False}}
+    kwargs: Dict[str, Any] = {
+        "poolclass": TimedQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT_S,
+    }
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    else:
+        kwargs.update(pool_pre_ping=True, pool_recycle=POOL_RECYCLE_S)
+    return kwargs
+
+
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cur.close()
+
+
+def make_engine(url: str, **overrides: Any) -> Engine:
+    """An engine for `url` with this module's pool and connection settings."""
+    eng = create_engine(url, future=True, **{**engine_kwargs(url), **overrides})
+    if _is_sqlite(url) and not _is_memory(url):
+        event.listen(eng, "connect", _sqlite_pragmas)
+    return eng
+
+
+def pool_metrics(eng: Engine | None = None) -> Dict[str, Any]:
+    """Connection pool occupancy and checkout wait times for `eng` (default: the app engine)."""
+    pool = (eng or engine).pool
+    out: Dict[str, Any] = {"backend": (eng or engine).dialect.name, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+        )
+    waits = getattr(pool, "waits", None)
+    if waits is not None:
+        out.update(
+            checkouts=waits["checkouts"],
+            waited=waits["waited"],
+            timeouts=waits["timeouts"],
+            wait_s_total=round(waits["wait_s"], 4),
+            wait_s_max=round(waits["max_wait_s"], 4),
+        )
+    return out
+
+
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
@@ -25,10 +149,7 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_db() -> Generator:
-
-    db = SessionLocal()
-    try:
+def get_db() -> Generator[Session, None, None]:
+    """One session per request, closed (and its connection returned) when the response is done."""
+    with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,210 @@
+# backend/app/diskcache.py
+"""
+Size-bounded, content-addressed file cache on local disk with an optional
+shared S3 tier (through StorageManager).
+
+Entries live at <root>/<key[:2]>/<key><suffix>. A hit bumps the file's mtime,
+so eviction (oldest mtime first) is LRU across every process sharing the
+directory. Writes go to a temp file and are renamed into place, so readers
+never see partial entries. Hit/miss counters are kept in <root>/stats.sqlite
+so API and worker processes report the same numbers.
+
+get_or_create(..., single_flight=True) serializes producers of one key across
+processes with a lock file, so e.g. a voice line shared by a batch of renders
+is synthesized once.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator
+
+from .storage import storage
+
+
+def content_key(*parts: object) -> str:
+    """Stable sha256 over the given parts (joined with NUL)."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(str(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class DiskCache:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int,
+        s3_prefix: str | None = None,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        # shared tier only when StorageManager is actually talking to S3
+        self.s3_prefix = s3_prefix if (s3_prefix and storage.use_s3) else None
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        self._stats_path = self.root / "stats.sqlite"
+        self._local = threading.local()
+
+    # ---------- paths ----------
+    def path_for(self, key: str, suffix: str = "") -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def _s3_key(self, key: str, suffix: str) -> str:
+        return f"{self.s3_prefix}/{key[:2]}/{key}{suffix}"
+
+    # ---------- counters ----------
+    def _stats_db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self._stats_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        try:
+            self._stats_db().execute(
+                "INSERT INTO counters (name, n) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET n = n + excluded.n",
+                (name, n),
+            )
+        except sqlite3.Error:
+            pass  # counters are best-effort; never fail a render over them
+
+    # ---------- lookups ----------
+    def get(self, key: str, suffix: str = "") -> Path | None:
+        path = self.path_for(key, suffix)
+        if path.exists():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self._bump("hits")
+            return path
+
+        if self.s3_prefix:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            if storage.download_file(self._s3_key(key, suffix), tmp):
+                os.replace(tmp, path)
+                self._account(path.stat().st_size)
+                self._bump("s3_hits")
+                return path
+            tmp.unlink(missing_ok=True)
+        return None
+
+    @contextmanager
+    def _producer_lock(self, path: Path) -> Iterator[None]:
+        with open(path.with_name(f"{path.name}.lock"), "a+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def get_or_create(
+        self,
+        key: str,
+        produce: Callable[[Path], None],
+        suffix: str = "",
+        *,
+        single_flight: bool = False,
+    ) -> Path:
+        """
+        Return the cached entry for `key`, or call produce(tmp_path) to write it
+        and publish the result. Concurrent misses may both produce (last rename
+        wins) unless `single_flight`, where later ones wait and reuse the first.
+        """
+        hit = self.get(key, suffix)
+        if hit is not None:
+            return hit
+
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if single_flight:
+            with self._producer_lock(path):
+                if path.exists():
+                    self._bump("hits")
+                    return path
+                return self._produce(key, path, produce, suffix)
+        return self._produce(key, path, produce, suffix)
+
+    def _produce(self, key: str, path: Path, produce: Callable[[Path], None], suffix: str) -> Path:
+        self._bump("misses")
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}")
+        try:
+            produce(tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        self._account(path.stat().st_size)
+        if self.s3_prefix:
+            storage.save_file_from_path(path, self._s3_key(key, suffix))
+        return path
+
+    # ---------- eviction ----------
+    def _entries(self) -> Iterable[os.DirEntry]:
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for e in os.scandir(shard.path):
+                if e.is_file() and ".tmp" not in e.name and not e.name.endswith(".lock"):
+                    yield e
+
+    def _account(self, added: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(e.stat().st_size for e in self._entries())
+            else:
+                self._size += added
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until the cache is at 90% of max_bytes."""
+        entries = sorted(
+            ((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()),
+        )
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._size = total
+        if removed:
+            self._bump("evictions", removed)
+        return removed
+
+    def stats(self) -> Dict[str, float]:
+        out: Dict[str, float] = {"hits": 0, "misses": 0, "s3_hits": 0, "evictions": 0}
+        try:
+            out.update(dict(self._stats_db().execute("SELECT name, n FROM counters")))
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            out["bytes"] = self._size if self._size is not None else sum(e.stat().st_size for e in self._entries())
+        out["max_bytes"] = self.max_bytes
+        lookups = out["hits"] + out["s3_hits"] + out["misses"]
+        out["hit_rate"] = round((out["hits"] + out["s3_hits"]) / lookups, 4) if lookups else 0.0
+        return out
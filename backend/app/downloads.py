@@ -0,0 +1,116 @@
+# backend/app/downloads.py
+"""
+Serving rendered exports (MP4s, preview files, export packs).
+
+Every request for /exports/{name} and /exports/download/{name} goes through
+serve_export():
+
+- `name` must be a plain file name directly inside EXPORT_DIR; anything with
+  separators, "..", a leading dot or NUL is a 404, and the resolved path is
+  checked against EXPORT_DIR as well (symlinks cannot escape it).
+- Strong ETags are sha256 content hashes, computed once per (inode, size,
+  mtime) and kept in-process. If-None-Match answers 304.
+- Range / If-Range requests get 206 (or 416) from Starlette's FileResponse,
+  which hands the path to the server (`http.response.pathsend`, sendfile)
+  when the server supports it. Behind nginx, REELIXX_ACCEL_REDIRECT=<internal
+  location> skips the body entirely and lets nginx sendfile it.
+- When StorageManager talks to S3 and the file is not on local disk, the
+  client is redirected to a short-lived presigned URL instead of proxying the
+  object through the API process.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from .storage import storage
+
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(Path(__file__).resolve().parent / "exports")))
+EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+MAX_AGE_S = int(os.getenv("REELIXX_EXPORT_MAX_AGE_S", "3600"))
+PRESIGN_TTL_S = int(os.getenv("REELIXX_PRESIGN_TTL_S", "900"))
+# e.g. "/_exports/": an nginx `internal` location aliased to EXPORT_DIR
+ACCEL_PREFIX = os.getenv("REELIXX_ACCEL_REDIRECT", "")
+# where StorageManager uploads rendered videos
+S3_PREFIX = "videos"
+
+
+def safe_export_path(filename: str, root: Path | None = None) -> Path:
+    """The file `filename` names inside `root` (EXPORT_DIR); 404 for anything else."""
+    root = (root or EXPORT_DIR).resolve()
+    bad = (
+        not filename
+        or filename.startswith(".")
+        or any(c in filename for c in ("/", "\\", "\0"))
+        or Path(filename).name != filename
+    )
+    if bad:
+        raise HTTPException(status_code=404, detail="Not Found")
+    path = (root / filename).resolve()
+    if path.parent != root:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return path
+
+
+@lru_cache(maxsize=4096)
+def _digest(path: str, inode: int, size: int, mtime_ns: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_etag(path: Path, st: os.stat_result | None = None) -> str:
+    """Strong ETag: content hash, recomputed only when the file changes."""
+    st = st or path.stat()
+    return f'"{_digest(str(path), st.st_ino, st.st_size, st.st_mtime_ns)[:32]}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 asks for this header)."""
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def serve_export(request: Request, filename: str, *, attachment: bool) -> Response:
+    path = safe_export_path(filename)
+    if not path.is_file():
+        url = storage.presigned_url(
+            f"{S3_PREFIX}/{filename}", download_name=filename if attachment else None, expires_s=PRESIGN_TTL_S
+        )
+        if url:
+            return RedirectResponse(url, status_code=307)
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    st = path.stat()
+    etag = file_etag(path, st)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE_S}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if ACCEL_PREFIX:
+        headers["X-Accel-Redirect"] = ACCEL_PREFIX.rstrip("/") + "/" + filename
+        if attachment:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return Response(media_type=media_type, headers=headers)
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=media_type,
+        filename=filename if attachment else None,
+        stat_result=st,
+    )
+
+
+__all__ = ["EXPORT_DIR", "safe_export_path", "file_etag", "etag_matches", "serve_export"]
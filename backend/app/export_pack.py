@@ -0,0 +1,227 @@
+# backend/app/export_pack.py
+"""
+Export packs: one ZIP per variant with the video and what is needed to post it.
+
+    variant_<id>.mp4   the render
+    endcard.png        static end card in the storyboard's canvas size
+    captions.srt       one cue per storyboard scene, timed like the MP4
+    post.txt           caption + hashtags (Variant.post_text or generate_post_text)
+    storyboard.json, script.json
+
+Media entries are ZIP_STORED (MP4 and PNG are already compressed), text is
+deflated. Entries are copied in CHUNK-sized pieces straight into the output:
+a file (write_pack) or the HTTP response (iter_pack), so memory stays flat
+however large the video is. Built packs live in a DiskCache keyed by the
+variant's content: the video's hash plus everything else that goes in.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple, Union
+from urllib.parse import urlparse
+
+from .diskcache import DiskCache, content_key
+from .downloads import EXPORT_DIR, S3_PREFIX, file_etag
+from .generators.post_text import generate_post_text
+from .generators.static_endcard import DEFAULT_H, DEFAULT_W, render_endcard_png
+from .models import Project, Variant
+from .storage import storage
+
+APP_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("REELIXX_PACK_CACHE_DIR", str(APP_DIR / "cache" / "packs")))
+CACHE_MB = int(os.getenv("REELIXX_PACK_CACHE_MB", "2048"))
+CHUNK = 1 << 20
+
+# bump when the pack layout changes
+PACK_VERSION = "2"
+STORED = (".mp4", ".png", ".jpg", ".webp")
+
+pack_cache = DiskCache(CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024)
+
+Entry = Tuple[str, Union[Path, bytes]]
+
+
+# ---------- pack contents ----------
+def _srt_time(t: float) -> str:
+    ms = int(round(max(0.0, t) * 1000))
+    return f"{ms // 3_600_000:02d}:{ms // 60_000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def srt_from_storyboard(
+    storyboard: Dict[str, Any] | None, default_s: float = 2.5, scenes: List[Dict[str, Any]] | None = None
+) -> str:
+    """
+    SubRip captions: one cue per scene with text. `scenes` are the render's
+    scene times ({"start", "duration"} per scene, see preview.scene_times):
+    the MP4 is timed by its voice lines, so they win over the storyboard's
+    start/end, which only time scenes the render did not report.
+    """
+    cues, t = [], 0.0
+    for i, scene in enumerate((storyboard or {}).get("scenes") or []):
+        timed = scenes[i] if scenes and i < len(scenes) else None
+        if timed:
+            start = float(timed["start"])
+            end = start + float(timed["duration"])
+        else:
+            start = float(scene.get("start", t))
+            end = float(scene.get("end", start + float(scene.get("duration") or default_s)))
+        t = end
+        text = str(scene.get("text") or "").strip()
+        if text and end > start:
+            cues.append(f"{len(cues) + 1}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n")
+    return "\n".join(cues)
+
+
+def _post_text(variant: Variant, project: Project | None) -> str:
+    if variant.post_text:
+        return variant.post_text
+    post = generate_post_text(
+        brief=(project.brief_json if project else None) or {},
+        script=variant.script_json or {},
+        tone=variant.tone,
+        persona=variant.persona,
+    )
+    return post["caption"] + "\n\n" + " ".join(post["hashtags"])
+
+
+def variant_video(variant: Variant) -> Path | None:
+    """The variant's MP4 on local disk (fetched from S3 if it only lives there)."""
+    names = [f"variant_{variant.id}.mp4"]
+    if variant.mp4_url:
+        names.append(Path(urlparse(variant.mp4_url).path).name)
+    for name in names:
+        if name and (EXPORT_DIR / name).is_file():
+            return EXPORT_DIR / name
+    name = names[-1]
+    if name.endswith(".mp4") and storage.download_file(f"{S3_PREFIX}/{name}", EXPORT_DIR / name):
+        return EXPORT_DIR / name
+    return None
+
+
+def _json(obj: Any) -> bytes:
+    return json.dumps(obj or {}, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def pack_entries(
+    variant: Variant, project: Project | None, video: Path, scenes: List[Dict[str, Any]] | None = None
+) -> Tuple[str, List[Entry]]:
+    """(cache key, entries) for a variant's pack; `scenes` times the captions (render_cache.linked_scenes)."""
+    sb = variant.storyboard_json or {}
+    canvas = sb.get("canvas") or {}
+    brief = (project.brief_json if project else None) or {}
+    brand = (project.brand_json if project else None) or {}
+    w, h = int(canvas.get("w") or DEFAULT_W), int(canvas.get("h") or DEFAULT_H)
+    post = _post_text(variant, project)
+    key = content_key(
+        "pack", PACK_VERSION, variant.id, file_etag(video),
+        json.dumps([sb, variant.script_json, brief, brand, scenes], sort_keys=True, default=str),
+        # generated post text has shuffled hashtags: key on its inputs, not its output
+        variant.post_text or json.dumps([variant.tone, variant.persona], default=str),
+    )
+    entries: List[Entry] = [
+        (f"variant_{variant.id}.mp4", video),
+        ("endcard.png", render_endcard_png(brief, brand, w=w, h=h)),
+        ("captions.srt", srt_from_storyboard(sb, scenes=scenes).encode("utf-8")),
+        ("post.txt", post.encode("utf-8")),
+        ("storyboard.json", _json(sb)),
+        ("script.json", _json(variant.script_json)),
+    ]
+    return key, entries
+
+
+# ---------- writing ----------
+def _write(z: zipfile.ZipFile, entries: List[Entry]) -> Iterator[None]:
+    """Write entries into `z`, yielding after every chunk so callers can drain the output."""
+    for name, src in entries:
+        compress = zipfile.ZIP_STORED if name.lower().endswith(STORED) else zipfile.ZIP_DEFLATED
+        if isinstance(src, Path):
+            info = zipfile.ZipInfo.from_file(src, name)
+            info.compress_type = compress
+            with open(src, "rb") as fh, z.open(info, "w", force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+                for chunk in iter(lambda: fh.read(CHUNK), b""):
+                    dst.write(chunk)
+                    yield
+        else:
+            z.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), src, compress_type=compress)
+            yield
+
+
+def write_pack(out: Path | BinaryIO, entries: List[Entry]) -> None:
+    with zipfile.ZipFile(out, "w") as z:
+        for _ in _write(z, entries):
+            pass
+
+
+class _Sink:
+    """Write-only, unseekable buffer: zipfile then streams with data descriptors."""
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+
+    def write(self, b) -> int:
+        self.parts.append(bytes(b))
+        return len(b)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def iter_pack(entries: List[Entry]) -> Iterator[bytes]:
+    """The pack as a byte stream, e.g. for a StreamingResponse."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w") as z:
+        for _ in _write(z, entries):
+            if sink.parts:
+                yield sink.drain()
+    yield sink.drain()  # central directory
+
+
+def build_pack(key: str, entries: List[Entry]) -> Tuple[Path, bool]:
+    """(cached pack path, whether it was already cached)."""
+    hit = pack_cache.get(key, ".zip")
+    if hit is not None:
+        return hit, True
+    return pack_cache.get_or_create(key, lambda tmp: write_pack(tmp, entries), ".zip"), False
+
+
+def publish(pack: Path, name: str) -> Path:
+    """Expose a cached pack as EXPORT_DIR/<name> (hard link when possible, no copy)."""
+    dst = EXPORT_DIR / name
+    try:
+        if dst.exists() and os.path.samefile(pack, dst):
+            return dst
+    except OSError:
+        pass
+    tmp = dst.with_name(f".{name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(pack, tmp)
+    except OSError:
+        shutil.copyfile(pack, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+
+def stats() -> dict:
+    return pack_cache.stats()
+
+
+__all__ = [
+    "pack_entries",
+    "srt_from_storyboard",
+    "variant_video",
+    "write_pack",
+    "iter_pack",
+    "build_pack",
+    "publish",
+    "stats",
+]
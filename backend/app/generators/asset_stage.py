@@ -0,0 +1,261 @@
+# backend/app/generators/asset_stage.py
+"""
+Concurrent per-scene asset stage.
+
+TTS and image requests for every scene are fanned out on one bounded thread
+pool instead of scene-by-scene. Each provider call goes through a shared
+per-provider rate limiter and is retried with exponential backoff on 429/5xx
+and connection errors. Results come back in scene order with timings.
+"""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+MAX_WORKERS = int(os.getenv("REELIXX_ASSET_CONCURRENCY", "6"))
+MAX_RETRIES = int(os.getenv("REELIXX_ASSET_RETRIES", "4"))
+BACKOFF_BASE_S = float(os.getenv("REELIXX_ASSET_BACKOFF_S", "0.5"))
+
+# requests/second per provider key; override with REELIXX_RATE_<KEY>, e.g. REELIXX_RATE_OPENAI_IMAGE=0.5
+DEFAULT_RATES = {
+    "openai:tts": 5.0,
+    "openai:image": 1.0,
+}
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket shared by every render in the process."""
+
+    def __init__(self, rate_per_s: float, burst: int | None = None):
+        self.rate = max(0.01, float(rate_per_s))
+        self.capacity = float(burst or max(1, int(self.rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_limiters: Dict[str, Optional[RateLimiter]] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(key: str) -> Optional[RateLimiter]:
+    """Process-wide limiter for a provider key; None (unlimited) for local providers."""
+    with _limiters_lock:
+        if key not in _limiters:
+            env = "REELIXX_RATE_" + key.upper().replace(":", "_").replace("-", "_")
+            rate = os.getenv(env) or DEFAULT_RATES.get(key)
+            _limiters[key] = RateLimiter(float(rate)) if rate else None
+        return _limiters[key]
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return int(status) in RETRY_STATUS
+    # openai.APIConnectionError / APITimeoutError, requests / socket errors
+    name = type(exc).__name__
+    return isinstance(exc, (ConnectionError, TimeoutError)) or name in (
+        "APIConnectionError",
+        "APITimeoutError",
+    )
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    *,
+    limiter: Optional[RateLimiter] = None,
+    retries: Optional[int] = None,
+    backoff_s: Optional[float] = None,
+) -> tuple[Any, Dict[str, float]]:
+    """Run fn() under the limiter, retrying transient failures. Returns (result, timing)."""
+    retries = MAX_RETRIES if retries is None else retries
+    backoff_s = BACKOFF_BASE_S if backoff_s is None else backoff_s
+    timing = {"wait_s": 0.0, "attempts": 0}
+    attempt = 0
+    while True:
+        if limiter is not None:
+            timing["wait_s"] += limiter.acquire()
+        timing["attempts"] = attempt + 1
+        try:
+            return fn(), timing
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+        # full jitter around the exponential step
+        delay = backoff_s * (2 ** attempt) * (0.5 + random.random())
+        time.sleep(delay)
+        timing["wait_s"] += delay
+        attempt += 1
+
+
+def _finish_timing(timing: Dict[str, float], t0: float) -> Dict[str, float]:
+    timing["call_s"] = round(time.perf_counter() - t0 - timing["wait_s"], 4)
+    timing["wait_s"] = round(timing["wait_s"], 4)
+    return timing
+
+
+class Provider:
+    """
+    Bundles the TTS/image callables for one backend with its rate-limit keys.
+    `image` may be None when every scene already has an image.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tts: Callable[[str, str], Path],
+        image: Optional[Callable[[str], Path]],
+        *,
+        tts_key: str | None = None,
+        image_key: str | None = None,
+    ):
+        self.name = name
+        self.tts = tts
+        self.image = image
+        self.tts_key = tts_key or f"{name}:tts"
+        self.image_key = image_key or f"{name}:image"
+
+
+def stub_provider(
+    out_dir: Path,
+    *,
+    latency_s: float = 0.0,
+    fail_first: int = 0,
+    fail_status: int = 429,
+    voice_s: float = 1.0,
+    image_size: tuple[int, int] = (1080, 1920),
+) -> Provider:
+    """
+    Offline provider for tests/benchmarks: after `latency_s` it writes a silent
+    WAV / solid PNG, and raises an HTTP-like error for the first `fail_first` calls.
+    """
+    import wave
+
+    from PIL import Image
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state = {"calls": 0}
+    lock = threading.Lock()
+
+    class StubHTTPError(Exception):
+        status_code = fail_status
+
+    def _maybe_fail() -> None:
+        with lock:
+            state["calls"] += 1
+            n = state["calls"]
+        time.sleep(latency_s)
+        if n <= fail_first:
+            raise StubHTTPError(f"stub {fail_status}")
+
+    def tts(text: str, voice: str) -> Path:
+        _maybe_fail()
+        p = out_dir / f"vo_{uuid.uuid4().hex}.wav"
+        with wave.open(str(p), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\0\0" * int(16000 * voice_s))
+        return p
+
+    def image(prompt: str) -> Path:
+        _maybe_fail()
+        p = out_dir / f"scene_{uuid.uuid4().hex}.png"
+        Image.new("RGB", image_size, (17, 17, 17)).save(p)
+        return p
+
+    return Provider("stub", tts, image)
+
+
+def run_asset_stage(
+    texts: List[str],
+    provider: Provider,
+    *,
+    voice: str = "alloy",
+    image_prompts: Optional[List[str]] = None,
+    images: Optional[List[Optional[Path]]] = None,
+    max_workers: Optional[int] = None,
+    on_done: Optional[Callable[[str, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Produce {"index", "voice", "image", "timings"} for every scene, in scene
+    order. `images` holds already-resolved scene images (e.g. from the image
+    pool); only scenes without one are sent to provider.image, and none are
+    when provider.image is None. `on_done(kind, index)` is called as each
+    "tts" / "images" request finishes (see progress.Progress.assets).
+    """
+    prompts = image_prompts if image_prompts is not None else texts
+    tts_lim = limiter_for(provider.tts_key)
+    img_lim = limiter_for(provider.image_key)
+
+    def _tts(i: int):
+        t0 = time.perf_counter()
+        path, timing = call_with_retry(lambda: provider.tts(texts[i], voice), limiter=tts_lim)
+        return path, _finish_timing(timing, t0)
+
+    def _img(i: int):
+        t0 = time.perf_counter()
+        path, timing = call_with_retry(lambda: provider.image(prompts[i]), limiter=img_lim)
+        return path, _finish_timing(timing, t0)
+
+    workers = max(1, min(max_workers or MAX_WORKERS, len(texts) * 2))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets") as pool:
+        # images first: they are the slow calls, so they should start earliest
+        img_futs = [
+            pool.submit(_img, i) if provider.image and not (images and images[i]) else None
+            for i in range(len(texts))
+        ]
+        tts_futs = [pool.submit(_tts, i) for i in range(len(texts))]
+        if on_done is not None:
+            for kind, futs in (("images", img_futs), ("tts", tts_futs)):
+                for i, f in enumerate(futs):
+                    if f is not None:
+                        f.add_done_callback(
+                            lambda f, kind=kind, i=i: f.cancelled() or f.exception() or on_done(kind, i)
+                        )
+
+        out: List[Dict[str, Any]] = []
+        try:
+            for i in range(len(texts)):
+                voice_path, tts_t = tts_futs[i].result()
+                if img_futs[i] is not None:
+                    img_path, img_t = img_futs[i].result()
+                else:
+                    img_path, img_t = (images[i] if images else None), None
+                out.append({
+                    "index": i,
+                    "voice": voice_path,
+                    "image": img_path,
+                    "timings": {"tts": tts_t, "image": img_t},
+                })
+        except BaseException:
+            for f in img_futs + tts_futs:
+                if f is not None:
+                    f.cancel()
+            raise
+    return out
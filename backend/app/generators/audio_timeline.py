@@ -0,0 +1,121 @@
+# backend/app/generators/audio_timeline.py
+"""
+Single-pass audio timeline for a whole ad.
+
+The music bed is loaded once per render from the decoded-music cache and runs
+continuously under every scene; each voice clip is placed at its scene offset.
+Gain and sidechain ducking are vectorized NumPy ops and the result is written
+once as a 16-bit WAV, so there are no per-scene MP3 encode/decode round trips.
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+APP_DIR = Path(__file__).resolve().parent
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
+EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+
+def db_to_gain(db: float) -> float:
+    return float(10.0 ** (db / 20.0))
+
+
+def decode_pcm16(path: Path, sr: int = SAMPLE_RATE, channels: int = CHANNELS) -> np.ndarray:
+    """Decode any pydub/ffmpeg-readable file to int16 of shape (n, channels)."""
+    seg = AudioSegment.from_file(str(path)).set_frame_rate(sr).set_channels(channels).set_sample_width(2)
+    return np.frombuffer(seg.raw_data, dtype=np.int16).reshape(-1, channels)
+
+
+def decode_pcm(path: Path, sr: int = SAMPLE_RATE, channels: int = CHANNELS) -> np.ndarray:
+    """Decode any pydub/ffmpeg-readable file to float32 [-1, 1] of shape (n, channels)."""
+    return decode_pcm16(path, sr, channels).astype(np.float32) / 32768.0
+
+
+def loop_to(pcm: np.ndarray, n: int) -> np.ndarray:
+    """Tile (or crop) `pcm` to exactly n frames."""
+    if len(pcm) == 0:
+        return np.zeros((n, pcm.shape[1] if pcm.ndim == 2 else CHANNELS), dtype=pcm.dtype)
+    reps = -(-n // len(pcm))
+    return np.tile(pcm, (reps, 1))[:n] if reps > 1 else pcm[:n]
+
+
+def write_wav(pcm: np.ndarray, out: Path, sr: int = SAMPLE_RATE) -> Path:
+    data = (np.clip(pcm, -1.0, 1.0) * 32767.0).astype("<i2")
+    with wave.open(str(out), "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(data.tobytes())
+    return out
+
+
+def build_timeline(
+    voices: List[Path],
+    music_path: Path | None,
+    *,
+    music_gain_db: float = -15.0,
+    duck: Optional[Dict[str, float]] = None,
+    min_scene_s: float = 0.0,
+    out: Path | None = None,
+    sr: int = SAMPLE_RATE,
+) -> Dict[str, Any]:
+    """
+    Lay the voice clips end to end over one continuous music bed. The bed comes
+    from the shared decoded-music cache (see music_bed), so it is only decoded
+    when it is not already resident or on disk as a PCM sidecar.
+
+    Scene i lasts as long as voice i (at least `min_scene_s`). `music_gain_db`
+    applies to the whole bed; when `duck` is given (a possibly empty dict of
+    music_ai.sidechain_duck parameters) the bed is sidechain-ducked under the
+    voice track. Returns {"path", "durations", "offsets", "decode_s", "mix_s",
+    "music_decode_saved_s"}.
+    """
+    # both modules build on the helpers here, so import them late
+    from .music_ai import sidechain_duck
+    from .music_bed import load_bed
+
+    t0 = time.perf_counter()
+    voice_pcm = [decode_pcm(v, sr) for v in voices]
+    music, saved_s = None, 0.0
+    if music_path and Path(music_path).exists():
+        music, saved_s = load_bed(Path(music_path), sr)
+    decode_s = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    lengths = [max(len(v), int(min_scene_s * sr)) for v in voice_pcm]
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(int) if lengths else np.array([], dtype=int)
+    total = int(sum(lengths))
+
+    mix = np.zeros((total, CHANNELS), dtype=np.float32)
+    for o, v in zip(offsets, voice_pcm):
+        mix[o:o + len(v)] += v
+    if music is not None and total:
+        # int16 bed -> float32 only for the frames this ad actually uses
+        bed = loop_to(music, total).astype(np.float32) * np.float32(db_to_gain(music_gain_db) / 32768.0)
+        if duck is not None:
+            bed = sidechain_duck(bed, mix, sr, **duck)
+        mix += bed
+
+    out = out or EXPORT_DIR / f"track_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}.wav"
+    write_wav(mix, out, sr)
+    mix_s = time.perf_counter() - t1
+
+    return {
+        "path": out,
+        "durations": [n / sr for n in lengths],
+        "offsets": [int(o) / sr for o in offsets],
+        "decode_s": round(decode_s, 4),
+        "mix_s": round(mix_s, 4),
+        "music_decode_saved_s": round(saved_s, 4),
+    }
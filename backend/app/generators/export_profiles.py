@@ -0,0 +1,242 @@
+# backend/app/generators/export_profiles.py
+"""
+Named export profiles shared by every video writer.
+
+A storyboard's `"exports": [{"preset": "vertical_1080p"}, ...]` selects one
+output per entry; the renderers build the scene assets (TTS, images, audio
+timeline) once and encode each profile from them. A profile fixes the output
+resolution, x264 CRF / preset / tune, GOP length and encoder thread count, so
+speed is chosen by tier name rather than by what the host happens to have.
+
+Vertical profiles cover-crop scenes to their frame (scaled to fill, centre
+cropped), so 2:3 stills fill a 9:16 canvas instead of picking up bars. The
+square and landscape profiles letterbox (scaled to fit, centred on black), so
+one set of 9:16 assets can also feed those cuts without losing the subject.
+A storyboard without `exports` gets SOURCE: scenes at their own canvas,
+CRF 23 / medium, no tune, i.e. what the renderers produced before profiles
+existed.
+"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+from proglog import ProgressBarLogger
+
+THREADS = int(os.getenv("REELIXX_ENCODE_THREADS", "2"))
+
+
+class ExportProfile:
+    def __init__(
+        self,
+        name: str,
+        size: Optional[Tuple[int, int]],
+        *,
+        crf: int = 23,
+        preset: str = "medium",
+        tune: Optional[str] = "stillimage",
+        gop_s: float = 2.0,
+        threads: int = THREADS,
+        fps: Optional[int] = None,
+        fit: str = "pad",
+    ):
+        if fit not in ("pad", "crop"):
+            raise ValueError(f"fit must be 'pad' or 'crop', not {fit!r}")
+        self.name = name
+        # None: the canvas the scenes come in (see SOURCE)
+        self.size = (int(size[0]) - int(size[0]) % 2, int(size[1]) - int(size[1]) % 2) if size else None
+        self.crf = int(crf)
+        self.preset = preset
+        self.tune = tune
+        self.gop_s = float(gop_s)
+        self.threads = int(threads)
+        self.fps = fps
+        # "pad": letterbox into the frame; "crop": fill it and centre-crop the overflow
+        self.fit = fit
+
+    def sized(self, size: Tuple[int, int]) -> "ExportProfile":
+        """Same encoder settings at a concrete frame size."""
+        return ExportProfile(
+            self.name, size, crf=self.crf, preset=self.preset, tune=self.tune,
+            gop_s=self.gop_s, threads=self.threads, fps=self.fps, fit=self.fit,
+        )
+
+    def fps_for(self, fps: int) -> int:
+        return int(self.fps or fps)
+
+    def gop(self, fps: int) -> int:
+        return max(1, int(round(self.gop_s * self.fps_for(fps))))
+
+    def x264_args(self, fps: int) -> List[str]:
+        """ffmpeg output options for this profile's video stream."""
+        args = ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+        if self.tune:
+            args += ["-tune", self.tune]
+        return args + ["-g", str(self.gop(fps)), "-threads", str(self.threads)]
+
+    def moviepy_kwargs(self, fps: int) -> Dict[str, Any]:
+        """write_videofile() keyword arguments for this profile."""
+        extra = ["-crf", str(self.crf), "-g", str(self.gop(fps))]
+        if self.tune:
+            extra += ["-tune", self.tune]
+        return {
+            "fps": self.fps_for(fps),
+            "codec": "libx264",
+            "audio_codec": "aac",
+            "preset": self.preset,
+            "threads": self.threads,
+            "ffmpeg_params": extra,
+        }
+
+    def video_filter(self, fps: int) -> str:
+        """ffmpeg filter chain: letterbox or cover-crop to the profile frame, then fps / pixel format."""
+        w, h = self.size
+        if self.fit == "crop":
+            fit = f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h},"
+        else:
+            fit = f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:color=black,"
+        return f"{fit}setsar=1,fps={self.fps_for(fps)},format=yuv420p"
+
+    def fit_frame(self, frame: np.ndarray) -> np.ndarray:
+        """RGB frame fitted to this profile's frame the way video_filter() does it."""
+        return cover(frame, self.size) if self.fit == "crop" else letterbox(frame, self.size)
+
+    def cache_key(self) -> Tuple[Any, ...]:
+        """Everything that changes the encoded bytes (not the name)."""
+        return (self.size, self.crf, self.preset, self.tune, self.gop_s, self.fps, self.fit)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "preset": self.name,
+            "size": list(self.size) if self.size else None,
+            "crf": self.crf,
+            "x264_preset": self.preset,
+            "tune": self.tune,
+            "gop_s": self.gop_s,
+            "threads": self.threads,
+            "fps": self.fps,
+            "fit": self.fit,
+        }
+
+
+PROFILES: Dict[str, ExportProfile] = {
+    p.name: p
+    for p in (
+        ExportProfile("preview_360p", (360, 640), crf=32, preset="ultrafast", fps=12, fit="crop"),
+        ExportProfile("preview_540p_ultrafast", (540, 960), crf=30, preset="ultrafast", gop_s=1.0, fit="crop"),
+        ExportProfile("vertical_1080p", (1080, 1920), crf=21, fit="crop"),
+        ExportProfile("square_1080", (1080, 1080), crf=21),
+        ExportProfile("landscape_1080", (1920, 1080), crf=21),
+    )
+}
+
+SOURCE = ExportProfile("source", None, tune=None)
+# storyboard iteration (see preview.py)
+PREVIEW = PROFILES["preview_360p"]
+
+
+def get_profile(name: str) -> ExportProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown export preset '{name}'. Use one of: {', '.join(PROFILES)}") from None
+
+
+def resolve_exports(storyboard: Dict[str, Any]) -> List[ExportProfile]:
+    """Profiles requested by `storyboard["exports"]` (deduplicated, in order); [SOURCE] if none."""
+    out: List[ExportProfile] = []
+    for entry in storyboard.get("exports") or []:
+        name = entry.get("preset") if isinstance(entry, dict) else entry
+        if not name:
+            continue
+        profile = get_profile(str(name).strip())
+        if profile not in out:
+            out.append(profile)
+    return out or [SOURCE]
+
+
+def letterbox(frame: np.ndarray, size: Optional[Tuple[int, int]]) -> np.ndarray:
+    """RGB frame scaled to fit `size` and centred on black (unchanged when size is None or equal)."""
+    if size is None or (frame.shape[1], frame.shape[0]) == tuple(size):
+        return frame
+    img = ImageOps.pad(Image.fromarray(frame), size, method=Image.LANCZOS, color=(0, 0, 0))
+    return np.asarray(img)
+
+
+def cover(frame: np.ndarray, size: Optional[Tuple[int, int]]) -> np.ndarray:
+    """RGB frame scaled to fill `size` and centre-cropped (unchanged when size is None or equal)."""
+    if size is None or (frame.shape[1], frame.shape[0]) == tuple(size):
+        return frame
+    img = ImageOps.fit(Image.fromarray(frame), size, method=Image.LANCZOS)
+    return np.asarray(img)
+
+
+class _FrameLogger(ProgressBarLogger):
+    """proglog logger that turns MoviePy's frame bar ("t") into encoder progress."""
+
+    def __init__(self, on_progress, index: int, count: int, start: float):
+        super().__init__()
+        self.on_progress, self.index, self.count, self.start = on_progress, index, count, start
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar != "t" or attr != "index":
+            return
+        total = self.bars[bar].get("total") or 0
+        if not total:
+            return
+        done = (self.index + min(1.0, (value + 1) / total)) / self.count
+        elapsed = time.perf_counter() - self.start
+        self.on_progress(100.0 * done, elapsed * (1.0 - done) / done if done else None, None)
+
+
+def write_clip_exports(
+    frames: Sequence[np.ndarray],
+    durations: Sequence[float],
+    audio: Any,
+    outputs: Sequence[Tuple[ExportProfile, Path]],
+    *,
+    fps: int,
+    on_progress: Optional[Callable[[float, Optional[float], Optional[int]], None]] = None,
+) -> Dict[str, float]:
+    """
+    MoviePy writer for several profiles: scene frames are decoded once by the
+    caller, fitted to each profile's frame, and `audio` (an AudioClip or None) is
+    reused by every output and left open for the caller to close. Returns encode seconds per output file name.
+    `on_progress(percent, eta_s, None)` follows the frames MoviePy has handed
+    to the encoder, across all outputs.
+    """
+    from moviepy.editor import ImageClip, concatenate_videoclips
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    for n, (profile, out) in enumerate(outputs):
+        t0 = time.perf_counter()
+        clips = [
+            ImageClip(profile.fit_frame(f)).set_duration(d).set_fps(profile.fps_for(fps))
+            for f, d in zip(frames, durations)
+        ]
+        video = concatenate_videoclips(clips, method="compose")
+        if audio is not None:
+            video = video.set_audio(audio)
+        logger = _FrameLogger(on_progress, n, len(outputs), start) if on_progress else None
+        video.write_videofile(str(out), logger=logger, **profile.moviepy_kwargs(fps))
+        # CompositeVideoClip.close() also closes .audio, which the next output still needs
+        video.audio = None
+        video.close()
+        timings[Path(out).name] = round(time.perf_counter() - t0, 3)
+    return timings
+
+
+def output_name(stem: str, profile: ExportProfile, index: int) -> str:
+    """The first export keeps the plain name; further ones carry their preset."""
+    return f"{stem}.mp4" if index == 0 else f"{stem}_{profile.name}.mp4"
+
+
+__all__ = [
+    "ExportProfile", "PROFILES", "SOURCE", "PREVIEW", "get_profile", "resolve_exports", "letterbox",
+    "cover", "write_clip_exports", "output_name",
+]
@@ -0,0 +1,193 @@
+# backend/app/generators/ffmpeg_render.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import subprocess
+import tempfile
+import time
+
+from PIL import Image
+from moviepy.config import get_setting
+
+from .export_profiles import ExportProfile
+
+# Same binary MoviePy resolves (imageio-ffmpeg or FFMPEG_BINARY env)
+FFMPEG_BIN = get_setting("FFMPEG_BINARY")
+
+
+# (percent, eta_s, scene index or None), see progress.Progress.encoder
+OnProgress = Callable[[float, Optional[float], Optional[int]], None]
+
+
+def _parse_progress(lines: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """Group ffmpeg `-progress` key=value lines into one dict per report."""
+    block: Dict[str, str] = {}
+    for raw in lines:
+        key, _, value = raw.decode("utf-8", "ignore").strip().partition("=")
+        if not key:
+            continue
+        block[key] = value
+        if key == "progress":
+            yield block
+            block = {}
+
+
+def _out_seconds(block: Dict[str, str]) -> Optional[float]:
+    # out_time_ms is microseconds too (a long-standing ffmpeg misnomer)
+    for key in ("out_time_us", "out_time_ms"):
+        try:
+            return max(0.0, int(block[key]) / 1e6)
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def run_ffmpeg(
+    cmd: List[str],
+    *,
+    duration_s: Optional[float] = None,
+    frames: Optional[int] = None,
+    on_progress: Optional[Callable[[float, Optional[float], int], None]] = None,
+) -> None:
+    """
+    Run an ffmpeg command, raising RuntimeError with its stderr tail on failure.
+    With `on_progress`, ffmpeg's own `-progress` reports drive
+    on_progress(percent, eta_s, frames_done): percent of `duration_s` of
+    output (or of `frames`), ETA from the encode rate so far.
+    """
+    if on_progress is None:
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        err = proc.stderr
+    else:
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        with tempfile.TemporaryFile() as errf:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errf)
+            t0 = time.monotonic()
+            for block in _parse_progress(proc.stdout):
+                try:
+                    frame = int(block.get("frame") or 0)
+                except ValueError:
+                    frame = 0
+                if frames:
+                    done = min(1.0, frame / frames)
+                else:
+                    out_s = _out_seconds(block)
+                    done = min(1.0, out_s / duration_s) if (out_s is not None and duration_s) else 0.0
+                if block.get("progress") == "end":
+                    done = 1.0
+                elapsed = time.monotonic() - t0
+                eta = elapsed * (1.0 - done) / done if done > 0 else None
+                on_progress(100.0 * done, eta, frame)
+            proc.wait()
+            errf.seek(0)
+            err = errf.read()
+    if proc.returncode != 0:
+        msg = err.decode("utf-8", "ignore").strip()
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {msg[-500:]}")
+
+
+def _canvas_for(images: Sequence[Path]) -> Tuple[int, int]:
+    """
+    Match concatenate_videoclips(method="compose"): the canvas is the largest
+    width/height across clips, rounded up to even numbers for yuv420p (pad
+    cannot shrink its input).
+    """
+    w = h = 0
+    for p in images:
+        with Image.open(p) as im:
+            w, h = max(w, im.width), max(h, im.height)
+    return (w + w % 2, h + h % 2)
+
+
+def _concat_list(slides: Sequence[Tuple[Path, float]]) -> str:
+    lines = ["ffconcat version 1.0"]
+    for path, duration in slides:
+        lines.append(f"file '{Path(path).resolve().as_posix()}'")
+        lines.append(f"duration {max(0.04, float(duration)):.3f}")
+    # The concat demuxer ignores the last entry's duration unless the file is repeated
+    lines.append(f"file '{Path(slides[-1][0]).resolve().as_posix()}'")
+    return "\n".join(lines) + "\n"
+
+
+def render_slideshow(
+    slides: List[Tuple[Path, float]],
+    audio_path: Path | None,
+    out_path: Path,
+    *,
+    fps: int = 30,
+    preset: str = "medium",
+    threads: int = 2,
+) -> Path:
+    """
+    Encode still-image scenes straight through ffmpeg.
+
+    Each (image, seconds) pair becomes one concat-demuxer entry, so ffmpeg
+    holds one decoded picture per scene and Python never touches frames.
+    Images are centred on a black canvas exactly like MoviePy's "compose"
+    concatenation, and `audio_path` (one track for the whole ad) is muxed in.
+    """
+    profile = ExportProfile("slideshow", None, preset=preset, threads=threads)
+    render_exports(slides, audio_path, [(profile, out_path)], fps=fps)
+    return out_path
+
+
+def render_exports(
+    slides: List[Tuple[Path, float]],
+    audio_path: Path | None,
+    outputs: Sequence[Tuple[ExportProfile, Path]],
+    *,
+    fps: int = 30,
+    on_progress: Optional[OnProgress] = None,
+) -> List[Path]:
+    """
+    Encode several export profiles in one ffmpeg run: the scenes and the
+    audio track are demuxed and decoded once, the decoded video is split and
+    each branch is fitted to its frame and encoded with its profile's x264 settings.
+    A profile without a size pads to the largest scene (see render_slideshow).
+    `on_progress` gets ffmpeg's own progress over the whole ad.
+    """
+    if not slides:
+        raise ValueError("render_slideshow: no slides")
+    if not outputs:
+        raise ValueError("render_exports: no outputs")
+
+    chains = []
+    for i, (profile, _) in enumerate(outputs):
+        if profile.size is None:
+            w, h = _canvas_for([p for p, _ in slides])
+            vf = f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2:color=black,fps={profile.fps_for(fps)},format=yuv420p"
+        else:
+            vf = profile.video_filter(fps)
+        chains.append(f"[s{i}]{vf}[v{i}]")
+    if len(outputs) == 1:
+        graph = chains[0].replace("[s0]", "[0:v]", 1)
+    else:
+        split = "[0:v]split=" + str(len(outputs)) + "".join(f"[s{i}]" for i in range(len(outputs)))
+        graph = ";".join([split] + chains)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".ffconcat", delete=False) as f:
+        f.write(_concat_list(slides))
+        list_path = Path(f.name)
+
+    cmd = [
+        FFMPEG_BIN, "-y", "-loglevel", "error",
+        "-f", "concat", "-safe", "0", "-i", str(list_path),
+    ]
+    if audio_path is not None:
+        cmd += ["-i", str(audio_path)]
+    cmd += ["-filter_complex", graph]
+    for i, (profile, out_path) in enumerate(outputs):
+        cmd += ["-map", f"[v{i}]"] + profile.x264_args(fps)
+        if audio_path is not None:
+            cmd += ["-map", "1:a:0", "-c:a", "aac", "-shortest"]
+        cmd += ["-movflags", "+faststart", str(out_path)]
+
+    # no scene to tag: the whole ad is one ffmpeg run
+    report = (lambda percent, eta, _frame: on_progress(percent, eta, None)) if on_progress else None
+
+    try:
+        run_ffmpeg(cmd, duration_s=sum(max(0.04, float(d)) for _, d in slides), on_progress=report)
+    finally:
+        list_path.unlink(missing_ok=True)
+    return [out for _, out in outputs]
@@ -0,0 +1,79 @@
+# backend/app/generators/fonts.py
+"""
+Shared font registry for the slide/card renderers.
+
+Font files are resolved once at import (first existing candidate per family),
+and loaded FreeTypeFont objects are cached per (path, size). FreeType faces
+are not safe to rasterize from several threads at once and scene images are
+drawn on the asset-stage thread pool, so the cache is also keyed by thread,
+as matplotlib does for its FT2Font cache.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import ImageFont
+
+APP_DIR = Path(__file__).resolve().parent
+ASSETS_DIR = APP_DIR / "assets"
+
+CACHE_SIZE = int(os.getenv("REELIXX_FONT_CACHE_SIZE", "64"))
+
+_SANS = [
+    "/System/Library/Fonts/SFNS.ttf",
+    "/System/Library/Fonts/SFNSRounded.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+]
+
+FAMILIES: Dict[str, List[str]] = {
+    # scene slides (video_ai)
+    "sans": _SANS,
+    # end-card (static_endcard)
+    "rounded": [
+        "/System/Library/Fonts/SFCompactRounded.ttf",
+        "/System/Library/Fonts/Supplemental/Arial.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ],
+    # stub video cards (video_stub); bundled font first
+    "card": [str(ASSETS_DIR / "Inter-SemiBold.ttf"), *_SANS],
+}
+
+
+def _resolve(candidates: List[str]) -> Optional[str]:
+    override = os.getenv("REELIXX_FONT_PATH")
+    for p in ([override] if override else []) + candidates:
+        if os.path.exists(p):
+            return p
+    return None
+
+
+FONT_PATHS: Dict[str, Optional[str]] = {name: _resolve(c) for name, c in FAMILIES.items()}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load(path: Optional[str], size: int, thread_id: int) -> ImageFont.ImageFont:
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+def get_font(size: int, family: str = "sans") -> ImageFont.ImageFont:
+    """Cached font for `family` at `size` px; Pillow's default font if none is installed."""
+    return _load(FONT_PATHS.get(family), int(size), threading.get_ident())
+
+
+def clear() -> None:
+    _load.cache_clear()
+
+
+def stats() -> dict:
+    info = _load.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -2,13 +2,13 @@
 from __future__ import annotations
 from typing import List, Optional
 from pathlib import Path
-import io, base64, time, os
+import io, base64, time, os, uuid
 from PIL import Image
 from openai import OpenAI
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 APP_DIR = Path(__file__).resolve().parent
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 
@@ -22,7 +22,8 @@ def generate_scene_image(prompt: str) -> Path:
     )
     b64 = res.data[0].b64_json
     img = Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGB")
-    out = EXPORT_DIR / f"scene_{int(time.time()*1000)}.png"
+    # scenes are generated concurrently, so the timestamp alone can collide
+    out = EXPORT_DIR / f"scene_{int(time.time()*1000)}_{uuid.uuid4().hex[:8]}.png"
     img.save(out, format="PNG", optimize=True)
     return out
 
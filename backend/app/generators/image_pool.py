@@ -0,0 +1,239 @@
+# backend/app/generators/image_pool.py
+"""
+Local image pool for scene visuals.
+
+Storyboard scenes carry a `visual` spec (see storyboard._beat_visual):
+{"type": "image_or_stock" | "user_or_stock" | "stock" | "endcard",
+"prefer": <image>, "query": <stock search>}. The pool resolves those specs
+against the project's own images (scraped / uploaded) and a local stock
+directory before anything is generated. Every image handed to a renderer is
+cover-fit to the canvas once and cached by content hash, so renderers only
+decode canvas-sized files and repeated renders reuse the same crops.
+
+A scene the pool cannot serve resolves to None; the renderer then falls back
+to its image provider (paid generation), or to a local slide in local-only
+mode (REELIXX_LOCAL_IMAGES_ONLY=1). Generated images go through the same
+cache, keyed on what was asked for (provider, prompt, brand colour, canvas)
+rather than on the bytes that came back: gpt-image-1 never returns the same
+image twice, so re-rendering an edited storyboard must not ask again for the
+scenes that did not change (see cached_images / image_id).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from ..diskcache import DiskCache, content_key
+from ..utils.image_prep import CANVAS, fit_image
+from .asset_stage import Provider
+
+APP_DIR = Path(__file__).resolve().parent
+STOCK_DIR = Path(os.getenv("REELIXX_STOCK_DIR", str(APP_DIR / "assets" / "stock")))
+PROJECTS_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports"))) / "projects"
+CACHE_DIR = Path(os.getenv("REELIXX_IMAGE_CACHE_DIR", str(APP_DIR.parent / "cache" / "images")))
+CACHE_MB = int(os.getenv("REELIXX_IMAGE_CACHE_MB", "512"))
+LOCAL_ONLY = os.getenv("REELIXX_LOCAL_IMAGES_ONLY", "0") == "1"
+
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".webp")
+# words in storyboard queries that say nothing about the subject
+STOP_WORDS = {
+    "a", "an", "and", "the", "in", "on", "of", "for", "with", "vertical",
+    "close", "up", "shot", "photo", "image", "dramatic", "lighting", "motion",
+}
+
+image_cache = DiskCache(CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024)
+
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digests_lock = threading.Lock()
+
+
+def _tokens(text: str) -> set:
+    return {t for t in re.split(r"[^a-z0-9]+", (text or "").lower()) if len(t) > 1 and t not in STOP_WORDS}
+
+
+def _digest(path: Path) -> str:
+    """sha256 of the file, memoized on (path, size, mtime)."""
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        d = _digests.get(key)
+    if d is None:
+        d = hashlib.sha256(path.read_bytes()).hexdigest()
+        with _digests_lock:
+            _digests[key] = d
+    return d
+
+
+def fitted(path: Path, canvas: Tuple[int, int] = CANVAS) -> Optional[Path]:
+    """Canvas-sized JPEG of `path`, from the content-hash cache when possible."""
+    try:
+        key = content_key("fit", _digest(path), canvas[0], canvas[1])
+
+        def _produce(out: Path) -> None:
+            if fit_image(path.read_bytes(), out, canvas) is None:
+                raise ValueError(f"not an image: {path}")
+
+        return image_cache.get_or_create(key, _produce, suffix=".jpg")
+    except (OSError, ValueError):
+        return None
+
+
+def generated(
+    provider: str, prompt: str, brand_color: str, canvas: Tuple[int, int], produce: Callable[[], Path]
+) -> Path:
+    """Image `produce()` generates for these scene inputs, generated once and then served from the cache."""
+    key = content_key("gen", provider, (brand_color or "").strip().lower(), int(canvas[0]), int(canvas[1]),
+                      " ".join(prompt.split()))
+
+    def _produce(out: Path) -> None:
+        with Image.open(produce()) as img:
+            img.save(out, format="PNG")
+
+    return image_cache.get_or_create(key, _produce, suffix=".png")
+
+
+def cached_images(provider: Provider, brand_color: str, canvas: Tuple[int, int]) -> Provider:
+    """`provider` with its image calls going through generated() (TTS has its own cache)."""
+    if provider.image is None:
+        return provider
+    image = provider.image
+    return Provider(
+        provider.name, provider.tts,
+        lambda prompt: generated(provider.name, prompt, brand_color, canvas, lambda: image(prompt)),
+        tts_key=provider.tts_key, image_key=provider.image_key,
+    )
+
+
+def image_id(path: Path) -> str:
+    """
+    Stable identity of a scene image for downstream cache keys: the cache key
+    (i.e. the inputs) of pool crops and generated images, else the file hash.
+    """
+    path = Path(path)
+    if path.parent.parent == image_cache.root:
+        return path.stem
+    return _digest(path)
+
+
+def project_dir(project_id: int) -> Path:
+    """Where a project's scraped / uploaded images live."""
+    return PROJECTS_DIR / str(int(project_id)) / "images"
+
+
+def project_images(project_id: int) -> List[Path]:
+    d = project_dir(project_id)
+    if not d.is_dir():
+        return []
+    return sorted(p for p in d.iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXT)
+
+
+def stock_index(stock_dir: Path = STOCK_DIR) -> List[Tuple[Path, set]]:
+    """Stock images with the keywords of their file names (e.g. happy_customer_lifestyle.jpg)."""
+    if not stock_dir.is_dir():
+        return []
+    return [
+        (p, _tokens(p.stem))
+        for p in sorted(stock_dir.rglob("*"))
+        if p.is_file() and p.suffix.lower() in IMAGE_EXT
+    ]
+
+
+class ImagePool:
+    """
+    Resolves scene `visual` specs to canvas-sized local images for one render.
+    Project images are handed out in order (hero first) so consecutive scenes
+    differ; stock picks prefer the best keyword match, then the least used.
+    """
+
+    def __init__(
+        self,
+        images: Sequence[Path | str] = (),
+        *,
+        stock_dir: Path = STOCK_DIR,
+        canvas: Tuple[int, int] = CANVAS,
+        endcard: Optional[Path] = None,
+    ):
+        self.images = [Path(p) for p in images if p and Path(p).is_file()]
+        # prerendered end card (e.g. one shared by a variant batch) for "endcard" scenes
+        self.endcard = Path(endcard) if endcard and Path(endcard).is_file() else None
+        self.stock = stock_index(stock_dir)
+        self.canvas = (int(canvas[0]), int(canvas[1]))
+        self._next = 0
+        self._used: set = set()
+        self._stock_uses: Dict[Path, int] = {}
+        self.resolved = 0
+        self.missed = 0
+
+    def _project_image(self, prefer: Any = None) -> Optional[Path]:
+        if not self.images:
+            return None
+        if prefer is not None:
+            # storyboards come from clients: only images already in the pool
+            # are honoured by path, anything else (e.g. a source URL) means the hero
+            p = next((p for p in self.images if str(p) == str(prefer)), self.images[0])
+        else:
+            # unused shots first, then round-robin
+            p = next((p for p in self.images if p not in self._used), None)
+            if p is None:
+                p = self.images[self._next % len(self.images)]
+                self._next += 1
+        self._used.add(p)
+        return p
+
+    def _stock_image(self, query: str) -> Optional[Path]:
+        want = _tokens(query)
+        if not self.stock or not want:
+            return None
+        score, _, path = max(
+            (len(want & tags), -self._stock_uses.get(p, 0), p) for p, tags in self.stock
+        )
+        if score == 0:
+            return None
+        self._stock_uses[path] = self._stock_uses.get(path, 0) + 1
+        return path
+
+    def resolve(self, visual: Optional[Dict[str, Any]], query: str = "") -> Optional[Path]:
+        """Canvas-sized image for one scene, or None when nothing local fits."""
+        visual = visual if isinstance(visual, dict) else {}
+        kind = visual.get("type") or "image_or_stock"
+        query = visual.get("query") or query
+
+        if kind == "endcard":
+            src = self.endcard
+        elif kind == "stock":
+            src = self._stock_image(query) or self._project_image()
+        elif kind == "image_or_stock" and "prefer" in visual:
+            src = self._project_image(visual.get("prefer") or "") or self._stock_image(query)
+        else:
+            src = self._project_image() or self._stock_image(query)
+
+        out = fitted(src, self.canvas) if src is not None else None
+        if out is None:
+            self.missed += 1
+        else:
+            self.resolved += 1
+        return out
+
+    def resolve_scenes(self, scenes: Sequence[Dict[str, Any]], prompts: Sequence[str]) -> List[Optional[Path]]:
+        return [self.resolve(s.get("visual"), q) for s, q in zip(scenes, prompts)]
+
+
+def canvas_of(storyboard: Dict[str, Any]) -> Tuple[int, int]:
+    c = storyboard.get("canvas") or {}
+    return int(c.get("w") or CANVAS[0]), int(c.get("h") or CANVAS[1])
+
+
+def stats() -> dict:
+    return image_cache.stats()
+
+
+__all__ = [
+    "ImagePool", "LOCAL_ONLY", "fitted", "generated", "cached_images", "image_id",
+    "project_dir", "project_images", "stock_index", "canvas_of", "stats",
+]
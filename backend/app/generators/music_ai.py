@@ -1,11 +1,19 @@
 # backend/app/generators/music_ai.py
 from __future__ import annotations
 from pathlib import Path
+from typing import Any, Dict, Optional
+import os
+import time
+import uuid
+import numpy as np
 from pydub import AudioSegment
 
+from .audio_timeline import CHANNELS, SAMPLE_RATE, db_to_gain, decode_pcm, loop_to
+from .music_bed import load_bed
+
 APP_DIR = Path(__file__).resolve().parent
 ASSETS = APP_DIR / "assets"
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 
@@ -15,17 +23,111 @@ MUSIC_MAP = {
     "chill":  ASSETS / "music_chill.mp3",
 }
 
+MUSIC_GAIN_DB = -15.0
+
+# Sidechain ducking; a storyboard can override any of these via "audio": {"duck": {...}}
+DUCK_DEFAULTS: Dict[str, float] = {
+    "depth_db": -9.0,       # extra music reduction while the voice is above threshold + knee
+    "threshold_db": -40.0,  # voice RMS (dBFS) where ducking starts
+    "knee_db": 6.0,         # soft knee width above the threshold
+    "attack_ms": 40.0,      # time to reach full depth
+    "release_ms": 350.0,    # time to recover from full depth
+    "window_ms": 20.0,      # RMS window
+    "hop_ms": 5.0,          # envelope resolution
+}
+
 def pick_music(mood: str = "upbeat") -> Path:
     p = MUSIC_MAP.get(mood) or MUSIC_MAP["upbeat"]
     return p
 
-def duck_and_mix(voice_mp3: Path, mood: str = "upbeat") -> Path:
-    voice = AudioSegment.from_file(voice_mp3)
-    music_path = pick_music(mood)
-    music = AudioSegment.from_file(str(music_path))
-    music = (music - 15)
-    music = music[: len(voice)] if len(music) > len(voice) else music.append(AudioSegment.silent(duration=len(voice) - len(music)), crossfade=0)
-    mixed = music.overlay(voice)
-    out = EXPORT_DIR / f"mix_{voice_mp3.stem}.mp3"
-    mixed.export(out, format="mp3")
-    return out
\ No newline at end of file
+def duck_params(spec: Any) -> Optional[Dict[str, float]]:
+    """
+    Normalize a storyboard `audio.duck` value: falsy -> None (no ducking),
+    True -> defaults, dict -> defaults overridden by its known keys.
+    """
+    if not spec:
+        return None
+    if isinstance(spec, dict):
+        return {k: float(v) for k, v in spec.items() if k in DUCK_DEFAULTS}
+    return {}
+
+def rms_envelope_db(x: np.ndarray, sr: int, *, window_ms: float = 20.0, hop_ms: float = 5.0) -> np.ndarray:
+    """RMS level in dBFS, one value per hop, of a (n,) or (n, channels) float signal."""
+    hop = max(1, int(sr * hop_ms / 1000))
+    # mean square over every channel of each hop, read straight off the
+    # contiguous buffer (no downmix copy)
+    frames = x.reshape(len(x), -1) if x.ndim == 2 else x.reshape(-1, 1)
+    full = len(frames) // hop
+    body = np.ascontiguousarray(frames[: full * hop]).reshape(full, -1)
+    power = np.einsum("ij,ij->i", body, body) / body.shape[1]
+    tail = frames[full * hop:]
+    if len(tail):
+        power = np.append(power, np.float32(np.mean(np.square(tail))))
+    width = max(1, int(round(window_ms / hop_ms)))
+    if width > 1:
+        power = np.convolve(power, np.ones(width, dtype=np.float32) / width, mode="same")
+    return 10.0 * np.log10(power + 1e-10)
+
+def _ramp_max(x: np.ndarray, step: float) -> np.ndarray:
+    """y[n] = max_{k<=n} (x[k] - (n-k)*step): hold peaks, fall at `step` per hop."""
+    slope = np.arange(len(x), dtype=np.float32) * np.float32(step)
+    return np.maximum.accumulate(x + slope) - slope
+
+def duck_gain(
+    voice: np.ndarray,
+    sr: int,
+    *,
+    depth_db: float = DUCK_DEFAULTS["depth_db"],
+    threshold_db: float = DUCK_DEFAULTS["threshold_db"],
+    knee_db: float = DUCK_DEFAULTS["knee_db"],
+    attack_ms: float = DUCK_DEFAULTS["attack_ms"],
+    release_ms: float = DUCK_DEFAULTS["release_ms"],
+    window_ms: float = DUCK_DEFAULTS["window_ms"],
+    hop_ms: float = DUCK_DEFAULTS["hop_ms"],
+) -> np.ndarray:
+    """
+    Per-sample linear gain (shape (n,)) to apply to the music under `voice`.
+
+    Gain reduction follows the voice's RMS envelope through a soft knee, then
+    is smoothed in the dB domain: release is a linear recovery after the voice
+    stops, attack a linear ramp into it. The whole track is known up front, so
+    attack is applied with look-ahead and the music is already down when the
+    first syllable lands. Both are running maxima, so nothing loops per sample.
+    """
+    n = len(voice)
+    if n == 0:
+        return np.ones(0, dtype=np.float32)
+    env = rms_envelope_db(voice, sr, window_ms=window_ms, hop_ms=hop_ms)
+    depth = abs(float(depth_db))
+    reduction = depth * np.clip((env - threshold_db) / max(knee_db, 1e-3), 0.0, 1.0).astype(np.float32)
+
+    reduction = _ramp_max(reduction, depth * hop_ms / max(release_ms, hop_ms))
+    reduction = _ramp_max(reduction[::-1], depth * hop_ms / max(attack_ms, hop_ms))[::-1]
+
+    # hop-rate dB curve -> per-sample linear gain, linearly interpolated inside each hop
+    hop = max(1, int(sr * hop_ms / 1000))
+    g = np.power(np.float32(10.0), -reduction / np.float32(20.0))
+    nxt = np.append(g[1:], g[-1])
+    frac = np.arange(hop, dtype=np.float32) / hop
+    curve = (g[:, None] + (nxt - g)[:, None] * frac[None, :]).reshape(-1)
+    return curve[:n]
+
+def sidechain_duck(music: np.ndarray, voice: np.ndarray, sr: int, **params: float) -> np.ndarray:
+    """Duck `music` ((n,) or (n, channels) float32) under `voice` in place and return it."""
+    gain = duck_gain(voice, sr, **params)
+    music *= gain[:, None] if music.ndim == 2 else gain
+    return music
+
+def duck_and_mix(voice_mp3: Path, mood: str = "upbeat", *, duck: Any = True) -> Path:
+    voice = decode_pcm(voice_mp3)
+    # decoded bed comes from the shared cache instead of re-reading the MP3
+    pcm, _ = load_bed(pick_music(mood))
+    music = loop_to(pcm, len(voice)).astype(np.float32) * np.float32(db_to_gain(MUSIC_GAIN_DB) / 32768.0)
+    params = duck_params(duck)
+    if params is not None:
+        music = sidechain_duck(music, voice, SAMPLE_RATE, **params)
+    mixed = (np.clip(voice + music, -1.0, 1.0) * 32767.0).astype("<i2")
+    # voice files are shared cache entries now, so the stem alone is not unique
+    out = EXPORT_DIR / f"mix_{voice_mp3.stem[:12]}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:6]}.mp3"
+    AudioSegment(mixed.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=CHANNELS).export(out, format="mp3")
+    return out
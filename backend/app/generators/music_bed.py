@@ -0,0 +1,156 @@
+# backend/app/generators/music_bed.py
+"""
+Process-wide cache of decoded music beds.
+
+The first time a bed is needed it is decoded to int16 PCM and written next to
+the cache as a raw .npy sidecar; after that every process maps the sidecar
+read-only (np.load(mmap_mode="r")), so API and worker processes on one host
+share the same page-cache pages instead of each holding a decoded copy.
+Resident beds are kept in an LRU bounded by REELIXX_MUSIC_CACHE_MB.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from ..diskcache import content_key
+from .audio_timeline import CHANNELS, SAMPLE_RATE, decode_pcm16, loop_to
+
+APP_DIR = Path(__file__).resolve().parent
+ASSETS_DIR = APP_DIR / "assets"
+CACHE_DIR = Path(os.getenv("REELIXX_MUSIC_CACHE_DIR", str(APP_DIR.parent / "cache" / "music")))
+CACHE_MB = int(os.getenv("REELIXX_MUSIC_CACHE_MB", "256"))
+
+
+class BedCache:
+    def __init__(self, root: Path, *, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self._beds: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "sidecar_loads": 0, "decodes": 0, "evictions": 0, "decode_s_saved": 0.0}
+
+    def _key(self, path: Path, sr: int, channels: int) -> str:
+        st = path.stat()
+        return content_key("bed", path.resolve(), st.st_size, st.st_mtime_ns, sr, channels)
+
+    def _load_sidecar(self, key: str) -> Tuple[np.ndarray, float] | None:
+        npy, meta = self.root / f"{key}.npy", self.root / f"{key}.json"
+        if not (npy.exists() and meta.exists()):
+            return None
+        try:
+            cost = float(json.loads(meta.read_text()).get("decode_s", 0.0))
+            return np.load(npy, mmap_mode="r"), cost
+        except (OSError, ValueError):
+            return None
+
+    def _write_sidecar(self, key: str, pcm: np.ndarray, cost: float) -> np.ndarray:
+        self.root.mkdir(parents=True, exist_ok=True)
+        npy, meta = self.root / f"{key}.npy", self.root / f"{key}.json"
+        tag = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_npy, tmp_meta = npy.with_name(f"{npy.name}.{tag}"), meta.with_name(f"{meta.name}.{tag}")
+        try:
+            with open(tmp_npy, "wb") as f:
+                np.save(f, np.ascontiguousarray(pcm))
+            tmp_meta.write_text(json.dumps({"decode_s": round(cost, 4), "frames": len(pcm)}))
+            # data first, then meta: a sidecar only counts once its meta exists
+            os.replace(tmp_npy, npy)
+            os.replace(tmp_meta, meta)
+        except OSError:
+            tmp_npy.unlink(missing_ok=True)
+            tmp_meta.unlink(missing_ok=True)
+            return pcm  # read-only cache dir: keep the in-memory copy
+        return np.load(npy, mmap_mode="r")
+
+    def load(self, path: Path, sr: int = SAMPLE_RATE, channels: int = CHANNELS) -> Tuple[np.ndarray, float]:
+        """
+        Return (int16 PCM of shape (n, channels), decode seconds saved). The array
+        is read-only; callers copy what they need.
+        """
+        key = self._key(path, sr, channels)
+        with self._lock:
+            hit = self._beds.get(key)
+            if hit is not None:
+                self._beds.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["decode_s_saved"] += hit[1]
+                return hit
+
+        entry = self._load_sidecar(key)
+        if entry is not None:
+            saved = entry[1]
+            counter = "sidecar_loads"
+        else:
+            t0 = time.perf_counter()
+            pcm = decode_pcm16(path, sr, channels)
+            cost = time.perf_counter() - t0
+            entry = (self._write_sidecar(key, pcm, cost), cost)
+            saved = 0.0
+            counter = "decodes"
+
+        with self._lock:
+            self._counters[counter] += 1
+            self._counters["decode_s_saved"] += saved
+            if key not in self._beds:
+                self._beds[key] = entry
+                self._bytes += entry[0].nbytes
+                self._trim(keep=key)
+        return entry[0], saved
+
+    def _trim(self, keep: str) -> None:
+        while self._bytes > self.max_bytes and len(self._beds) > 1:
+            key, (pcm, _) = next(iter(self._beds.items()))
+            if key == keep:
+                self._beds.move_to_end(key)
+                continue
+            del self._beds[key]
+            self._bytes -= pcm.nbytes
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            out: Dict[str, float] = dict(self._counters)
+            out["decode_s_saved"] = round(out["decode_s_saved"], 3)
+            out["resident"] = len(self._beds)
+            out["bytes"] = self._bytes
+        out["max_bytes"] = self.max_bytes
+        return out
+
+
+bed_cache = BedCache(CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024)
+
+
+def load_bed(path: Path, sr: int = SAMPLE_RATE) -> Tuple[np.ndarray, float]:
+    return bed_cache.load(Path(path), sr)
+
+
+def bed_segment(path: Path, duration_ms: int) -> AudioSegment:
+    """The cached bed looped/cropped to duration_ms, as a pydub segment."""
+    pcm, _ = load_bed(path)
+    pcm = loop_to(pcm, int(SAMPLE_RATE * duration_ms / 1000))
+    return AudioSegment(pcm.tobytes(), sample_width=2, frame_rate=SAMPLE_RATE, channels=pcm.shape[1])
+
+
+def preload(paths: Iterable[Path] | None = None) -> int:
+    """Decode/map every bundled music bed up front (worker startup). Returns count."""
+    n = 0
+    for p in paths if paths is not None else sorted(ASSETS_DIR.glob("music_*.mp3")):
+        try:
+            load_bed(p)
+            n += 1
+        except Exception as e:
+            print(f"music preload failed for {p}: {e}")
+    return n
+
+
+def stats() -> dict:
+    return bed_cache.stats()
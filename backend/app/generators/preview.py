@@ -0,0 +1,84 @@
+# backend/app/generators/preview.py
+"""
+Cheap previews for storyboard iteration.
+
+Preview renders use export_profiles.PREVIEW (360x640, 12 fps, ultrafast),
+local images only and cached or silent voice, so a storyboard can be looked
+at many times before the full render. Instead of an MP4 a preview can be an
+animated WebP (one frame per scene, shown for the scene's duration) or a
+sprite sheet of scene thumbnails; neither needs a video encoder at all.
+"""
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+FORMATS = ("mp4", "webp", "sprite")
+SPRITE_TILE = (180, 320)
+SPRITE_COLS = 5
+
+
+def preview_format(value: Any) -> str | None:
+    """Normalize a request's `preview` value: falsy -> None, true -> "mp4"."""
+    if value in (None, False, "", 0):
+        return None
+    if value is True or value == 1:
+        return "mp4"
+    fmt = str(value).strip().lower()
+    if fmt in ("1", "true", "yes"):
+        return "mp4"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown preview format '{value}'. Use one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+def _frame(path: Path, size: Tuple[int, int]) -> Image.Image:
+    with Image.open(path) as im:
+        return ImageOps.pad(im.convert("RGB"), size, color=(0, 0, 0))
+
+
+def write_webp(images: Sequence[Path], durations: Sequence[float], out: Path, *, size: Tuple[int, int]) -> Path:
+    """Animated WebP: one frame per scene, held for the scene's duration."""
+    frames = [_frame(p, size) for p in images]
+    frames[0].save(
+        out,
+        format="WEBP",
+        save_all=True,
+        append_images=frames[1:],
+        duration=[max(20, int(round(d * 1000))) for d in durations],
+        loop=0,
+        quality=70,
+        method=0,
+    )
+    return out
+
+
+def write_sprite(
+    images: Sequence[Path],
+    out: Path,
+    *,
+    tile: Tuple[int, int] = SPRITE_TILE,
+    cols: int = SPRITE_COLS,
+) -> Dict[str, Any]:
+    """Scene thumbnails on a grid (row-major, scene order); returns the grid layout."""
+    cols = max(1, min(cols, len(images)))
+    rows = math.ceil(len(images) / cols)
+    sheet = Image.new("RGB", (tile[0] * cols, tile[1] * rows), (0, 0, 0))
+    for i, p in enumerate(images):
+        sheet.paste(_frame(p, tile), ((i % cols) * tile[0], (i // cols) * tile[1]))
+    sheet.save(out, format="JPEG", quality=80)
+    return {"cols": cols, "rows": rows, "tile": list(tile)}
+
+
+def scene_times(durations: Sequence[float]) -> List[Dict[str, float]]:
+    out, t = [], 0.0
+    for i, d in enumerate(durations):
+        out.append({"index": i, "start": round(t, 3), "duration": round(d, 3)})
+        t += d
+    return out
+
+
+__all__ = ["FORMATS", "preview_format", "write_webp", "write_sprite", "scene_times"]
@@ -0,0 +1,249 @@
+# backend/app/generators/render_plan.py
+"""
+Render planner for a set of storyboards (e.g. every variant of a project).
+
+Each storyboard is broken into asset nodes keyed by the hash of their inputs:
+
+    tts      one voice line          (provider, voice, normalized text)
+    image    one generated scene     (provider, brand colour, canvas, prompt)
+    segment  one encoded scene       (image node, tts node, profile, fps)
+    mix      one ad's audio track    (its tts nodes, music bed, gain, ducking)
+    final    one output MP4          (its segment nodes, mix node, profile)
+
+Scenes that come out the same in several storyboards (the end card, the CTA
+line, a shared hook) hash to the same node, so the graph holds each piece of
+work once. run() executes the graph with bounded parallelism (at most
+REELIXX_PLAN_WORKERS nodes at a time, provider calls still go through the
+asset_stage rate limiters) and report() says how many node references were
+served by an already-planned node and how much time that saved, measured as
+each shared node's run time times its extra references.
+
+Scene images the local pool can serve are plain inputs, not nodes.
+"""
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..diskcache import content_key
+from . import image_pool
+from .asset_stage import Provider, call_with_retry, limiter_for
+from .audio_timeline import SAMPLE_RATE, build_timeline, decode_pcm16
+from .export_profiles import ExportProfile, resolve_exports
+from .preview import scene_times
+from .segment_render import concat_segments, encode_segment, frames_for, segment_cache, segment_key
+from .tts_cache import normalize_text
+
+WORKERS = int(os.getenv("REELIXX_PLAN_WORKERS", "4"))
+# start the slow provider calls first, finish with the cheap muxes
+ORDER = {"image": 0, "tts": 1, "segment": 2, "mix": 3, "final": 4}
+
+
+class Node:
+    def __init__(self, key: str, kind: str, deps: List[str], fn: Callable[..., Any]):
+        self.key = key
+        self.kind = kind
+        self.deps = deps
+        self.fn = fn
+        self.refs = 1
+        self.result: Any = None
+        self.seconds = 0.0
+
+
+class RenderPlan:
+    def __init__(
+        self,
+        provider: Provider,
+        *,
+        voice: str = "alloy",
+        brand_color: str = "#111111",
+        music: Path | None = None,
+        music_gain_db: float = -15.0,
+        fps: int = 30,
+        profile: ExportProfile | None = None,
+        out_dir: Path,
+        workers: int = WORKERS,
+    ):
+        self.provider = provider
+        self.voice = voice
+        self.brand_color = (brand_color or "").strip().lower()
+        self.music = music
+        self.music_gain_db = music_gain_db
+        self.fps = fps
+        self.profile = profile
+        self.out_dir = Path(out_dir)
+        self.workers = max(1, workers)
+        self.nodes: Dict[str, Node] = {}
+        self.outputs: List[Dict[str, str]] = []  # per storyboard: profile name -> final node key
+        self.mixes: List[str] = []  # per storyboard: its mix node key
+        self._stem = f"plan_{int(time.time() * 1000)}_{uuid.uuid4().hex[:6]}"
+
+    # ---------- planning ----------
+    def _node(self, kind: str, parts: Sequence[Any], deps: List[str], fn: Callable[..., Any]) -> str:
+        key = content_key(kind, *parts)
+        node = self.nodes.get(key)
+        if node is None:
+            self.nodes[key] = Node(key, kind, deps, fn)
+        else:
+            node.refs += 1
+        return key
+
+    def _tts(self, text: str) -> str:
+        def run() -> Dict[str, Any]:
+            path, _ = call_with_retry(lambda: self.provider.tts(text, self.voice),
+                                      limiter=limiter_for(self.provider.tts_key))
+            # same length build_timeline will give the scene
+            return {"path": path, "seconds": len(decode_pcm16(path)) / SAMPLE_RATE}
+
+        return self._node("tts", (self.provider.name, self.voice, normalize_text(text)), [], run)
+
+    def _image(self, prompt: str, canvas: Tuple[int, int]) -> str:
+        def run() -> Path:
+            def generate() -> Path:
+                path, _ = call_with_retry(lambda: self.provider.image(prompt),
+                                          limiter=limiter_for(self.provider.image_key))
+                return path
+
+            return image_pool.generated(self.provider.name, prompt, self.brand_color, canvas, generate)
+
+        return self._node("image", (self.provider.name, self.brand_color, canvas, prompt), [], run)
+
+    def _segment(self, image: str | Path, tts: str, profile: ExportProfile, fps: int) -> str:
+        deps = [tts] + ([image] if isinstance(image, str) else [])
+
+        def run(*results: Any) -> Path:
+            img = Path(results[1]) if isinstance(image, str) else image
+            n = frames_for(results[0]["seconds"], fps)
+            return segment_cache.get_or_create(
+                segment_key(img, n, profile, fps),
+                lambda tmp: encode_segment(img, n, tmp, profile=profile, fps=fps),
+                suffix=".mp4",
+            )
+
+        source = image if isinstance(image, str) else f"file:{image}"
+        return self._node("segment", (source, tts, *profile.cache_key(), fps), deps, run)
+
+    def _mix(self, tts: List[str], duck: Optional[Dict[str, float]]) -> str:
+        def run(*voices: Dict[str, Any]) -> Dict[str, Any]:
+            return build_timeline([v["path"] for v in voices], self.music, music_gain_db=self.music_gain_db, duck=duck)
+
+        music = str(self.music) if self.music else ""
+        return self._node("mix", (*tts, music, self.music_gain_db, sorted((duck or {}).items())), list(tts), run)
+
+    def _final(self, segments: List[str], mix: str, profile: ExportProfile) -> str:
+        out = self.out_dir / f"{self._stem}_{len(self.nodes)}_{profile.name}.mp4"
+
+        def run(*results: Any) -> Path:
+            *segs, track = results
+            return concat_segments(list(segs), track["path"], out)
+
+        return self._node("final", (*segments, mix, *profile.cache_key()), segments + [mix], run)
+
+    def add(
+        self,
+        storyboard: Dict[str, Any],
+        caption: str = "",
+        *,
+        scene_images: Sequence[Path] = (),
+        endcard: Path | None = None,
+        duck: Optional[Dict[str, float]] = None,
+    ) -> int:
+        """Plan one storyboard; returns its index into results()."""
+        scenes = storyboard.get("scenes") or []
+        if not scenes:
+            raise ValueError("Storyboard must contain scenes.")
+        canvas = image_pool.canvas_of(storyboard)
+        texts = [(s.get("text") or caption or "").strip() or " " for s in scenes]
+        pool = image_pool.ImagePool(scene_images, canvas=canvas, endcard=endcard)
+        images: List[str | Path] = [
+            local or self._image(text, canvas) for local, text in zip(pool.resolve_scenes(scenes, texts), texts)
+        ]
+        tts = [self._tts(t) for t in texts]
+        mix = self._mix(tts, duck)
+
+        finals: Dict[str, str] = {}
+        for profile in [self.profile] if self.profile else resolve_exports(storyboard):
+            profile = profile.sized(canvas) if profile.size is None else profile
+            fps = profile.fps_for(int((storyboard.get("canvas") or {}).get("fps") or self.fps))
+            segments = [self._segment(img, t, profile, fps) for img, t in zip(images, tts)]
+            finals[profile.name] = self._final(segments, mix, profile)
+        self.outputs.append(finals)
+        self.mixes.append(mix)
+        return len(self.outputs) - 1
+
+    # ---------- execution ----------
+    def _execute(self, node: Node) -> None:
+        t0 = time.perf_counter()
+        node.result = node.fn(*(self.nodes[d].result for d in node.deps))
+        node.seconds = time.perf_counter() - t0
+
+    def run(self, on_node: Optional[Callable[[int, int], None]] = None) -> None:
+        """Run every node once, dependencies first; `on_node(done, total)` after each."""
+        waiting = {k: set(n.deps) for k, n in self.nodes.items()}
+        children: Dict[str, List[str]] = {k: [] for k in self.nodes}
+        for k, n in self.nodes.items():
+            for d in n.deps:
+                children[d].append(k)
+        ready = [k for k, deps in waiting.items() if not deps]
+        running: Dict[Future, str] = {}
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="plan") as pool:
+            try:
+                while ready or running:
+                    ready.sort(key=lambda k: ORDER[self.nodes[k].kind])
+                    while ready and len(running) < self.workers:
+                        k = ready.pop(0)
+                        running[pool.submit(self._execute, self.nodes[k])] = k
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for f in finished:
+                        k = running.pop(f)
+                        f.result()
+                        done += 1
+                        if on_node is not None:
+                            on_node(done, len(self.nodes))
+                        for c in children[k]:
+                            waiting[c].discard(k)
+                            if not waiting[c]:
+                                ready.append(c)
+            except BaseException:
+                for f in running:
+                    f.cancel()
+                raise
+            finally:
+                for n in self.nodes.values():
+                    if n.kind == "mix" and n.result:
+                        Path(n.result["path"]).unlink(missing_ok=True)
+
+    def results(self) -> List[Dict[str, Path]]:
+        """Per planned storyboard: profile name -> output MP4."""
+        return [{name: self.nodes[key].result for name, key in finals.items()} for finals in self.outputs]
+
+    def scene_times(self) -> List[List[Dict[str, float]]]:
+        """Per planned storyboard: each scene's start/duration as timed in its MP4 (the voice lines)."""
+        return [scene_times(self.nodes[key].result["durations"]) for key in self.mixes]
+
+    def report(self) -> Dict[str, Any]:
+        by_kind: Dict[str, Dict[str, float]] = {}
+        for n in self.nodes.values():
+            k = by_kind.setdefault(n.kind, {"nodes": 0, "reused": 0, "run_s": 0.0, "saved_s": 0.0})
+            k["nodes"] += 1
+            k["reused"] += n.refs - 1
+            k["run_s"] += n.seconds
+            k["saved_s"] += n.seconds * (n.refs - 1)
+        for k in by_kind.values():
+            k["run_s"], k["saved_s"] = round(k["run_s"], 3), round(k["saved_s"], 3)
+        return {
+            "storyboards": len(self.outputs),
+            "nodes": len(self.nodes),
+            "requested": sum(n.refs for n in self.nodes.values()),
+            "reused": sum(n.refs - 1 for n in self.nodes.values()),
+            "saved_s": round(sum(k["saved_s"] for k in by_kind.values()), 3),
+            "by_kind": by_kind,
+        }
+
+
+__all__ = ["RenderPlan", "Node", "WORKERS"]
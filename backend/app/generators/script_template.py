@@ -0,0 +1,41 @@
+# backend/app/generators/script_template.py
+from __future__ import annotations
+from typing import Any, Dict, Optional
+
+
+def generate_script(
+    brief: Dict[str, Any], *, tone: Optional[str] = None, persona: Optional[str] = None
+) -> Dict[str, Any]:
+    title = (
+        brief.get("title")
+        or brief.get("product_title")
+        or (brief.get("product") or {}).get("title")
+        or "Your product"
+    )
+    desc = (
+        brief.get("description")
+        or (brief.get("product") or {}).get("description")
+        or ""
+    )
+
+    beats = [
+        {"time": 0.0,  "vo": f"Meet {title}."},
+        {"time": 2.5,  "vo": (desc[:140] or "Built for daily use.")},
+        {"time": 5.0,  "vo": "See how it works."},
+        {"time": 8.0,  "vo": "Tap to get yours now."},
+    ]
+    return {"beats": beats, "meta": {"tone": tone, "persona": persona}}
+
+
+def script_caption(script: Dict[str, Any] | None) -> str:
+    """All beat voice-over lines as one caption (" " when there are none)."""
+    s = script or {}
+    if isinstance(s, dict) and isinstance(s.get("beats"), list):
+        try:
+            return " ".join(
+                (b.get("vo") or b.get("text") or "").strip()
+                for b in s["beats"]
+            ).strip() or " "
+        except Exception:
+            pass
+    return " "
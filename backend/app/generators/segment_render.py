@@ -0,0 +1,177 @@
+# backend/app/generators/segment_render.py
+"""
+Incremental renderer: one cached video segment per scene.
+
+Every scene is encoded on its own as a closed-GOP H.264 segment (it starts on
+an IDR frame and references nothing outside itself) with one export profile's
+frame size and x264 settings. A segment is keyed by its image's identity
+(image_pool.image_id: the scene inputs behind a generated or pooled image,
+not its bytes) plus its frame count, fps and the profile, and kept in a
+DiskCache, so re-rendering a storyboard after editing one scene encodes only
+that scene.
+The segments are then joined with the concat demuxer as a stream copy (no
+re-encode) and the ad's one continuous audio track (see audio_timeline) is
+muxed on top.
+"""
+from __future__ import annotations
+
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..diskcache import DiskCache, content_key
+from . import image_pool
+from .export_profiles import SOURCE, ExportProfile
+from .ffmpeg_render import FFMPEG_BIN, OnProgress, run_ffmpeg
+
+APP_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("REELIXX_SEGMENT_CACHE_DIR", str(APP_DIR.parent / "cache" / "segments")))
+CACHE_MB = int(os.getenv("REELIXX_SEGMENT_CACHE_MB", "1024"))
+WORKERS = int(os.getenv("REELIXX_SEGMENT_WORKERS", "2"))
+
+# bump when the encode settings below (or the key's parts) change what a segment contains
+SEGMENT_VERSION = "3"
+# every segment must share this (and its profile) for the stream-copy concat to be valid
+TIMESCALE = 15360
+
+segment_cache = DiskCache(CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024)
+
+
+def frames_for(seconds: float, fps: int) -> int:
+    """Whole frames covering `seconds` (never shorter than the scene's audio)."""
+    return max(1, math.ceil(float(seconds) * fps - 1e-6))
+
+
+def segment_key(image: Path, frames: int, profile: ExportProfile, fps: int) -> str:
+    return content_key("segment", SEGMENT_VERSION, image_pool.image_id(image), frames, fps, *profile.cache_key())
+
+
+def encode_segment(
+    image: Path,
+    frames: int,
+    out: Path,
+    *,
+    profile: ExportProfile,
+    fps: int = 30,
+    on_frames: Optional[Callable[[int], None]] = None,
+) -> Path:
+    """
+    Encode one still as `frames` frames of closed-GOP H.264, fitted to
+    the profile frame; `on_frames(n)` follows ffmpeg's own frame counter.
+    """
+    report = (lambda _pct, _eta, frame: on_frames(frame)) if on_frames else None
+    run_ffmpeg([
+        FFMPEG_BIN, "-y", "-loglevel", "error",
+        # decode and scale the still once, then clone that frame (no -loop re-decoding)
+        "-framerate", str(fps), "-i", str(image),
+        "-vf", f"{profile.video_filter(fps)},tpad=stop_mode=clone:stop={frames - 1}",
+        "-frames:v", str(frames), "-an",
+        *profile.x264_args(fps), "-flags", "+cgop",
+        "-video_track_timescale", str(TIMESCALE),
+        "-f", "mp4", str(out),
+    ], frames=frames, on_progress=report)
+    return out
+
+
+def concat_segments(segments: Sequence[Path], audio_path: Path | None, out_path: Path) -> Path:
+    """Join segments by stream copy and mux the ad's single audio track."""
+    with tempfile.NamedTemporaryFile("w", suffix=".ffconcat", delete=False) as f:
+        f.write("ffconcat version 1.0\n")
+        for seg in segments:
+            f.write(f"file '{Path(seg).resolve().as_posix()}'\n")
+        list_path = Path(f.name)
+
+    cmd = [FFMPEG_BIN, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(list_path)]
+    if audio_path is not None:
+        cmd += ["-i", str(audio_path)]
+    cmd += ["-map", "0:v:0", "-c:v", "copy"]
+    if audio_path is not None:
+        cmd += ["-map", "1:a:0", "-c:a", "aac", "-shortest"]
+    cmd += ["-movflags", "+faststart", str(out_path)]
+    try:
+        run_ffmpeg(cmd)
+    finally:
+        list_path.unlink(missing_ok=True)
+    return out_path
+
+
+def render_segments(
+    slides: List[Tuple[Path, float]],
+    audio_path: Path | None,
+    out_path: Path,
+    *,
+    canvas: Tuple[int, int],
+    profile: ExportProfile = SOURCE,
+    fps: int = 30,
+    on_progress: Optional[OnProgress] = None,
+) -> Dict[str, Any]:
+    """
+    Render (image, seconds) scenes through the segment cache with `profile`'s
+    encoder settings (a sizeless profile renders at `canvas`). Only scenes
+    whose segment is not cached are encoded (a few at a time); returns
+    {"path", "segments_encoded", "segments_reused", "encode_s", "concat_s"}.
+    `on_progress` follows the frames ffmpeg reports for the segments being
+    encoded, tagged with the scene that just advanced.
+    """
+    if not slides:
+        raise ValueError("render_segments: no slides")
+    if profile.size is None:
+        profile = profile.sized(canvas)
+    fps = profile.fps_for(fps)
+
+    jobs = [(Path(img), frames_for(sec, fps)) for img, sec in slides]
+    keys = [segment_key(img, n, profile, fps) for img, n in jobs]
+    encoded: List[int] = []
+    # frames still to encode (for percent / ETA): segments not on disk yet
+    todo = sum(n for (_, n), k in zip(jobs, keys) if not segment_cache.path_for(k, ".mp4").exists()) or 1
+    done_frames: Dict[int, int] = {}
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+
+    def _advance(i: int, frame: int) -> None:
+        with lock:
+            done_frames[i] = frame
+            done = sum(done_frames.values())
+        if on_progress is not None:
+            elapsed = time.perf_counter() - t0
+            eta = elapsed * (todo - done) / done if done else None
+            on_progress(100.0 * min(1.0, done / todo), eta, i)
+
+    def _segment(i: int) -> Path:
+        img, n = jobs[i]
+
+        def _produce(tmp: Path) -> None:
+            with lock:
+                encoded.append(i)
+            on_frames = (lambda f: _advance(i, f)) if on_progress else None
+            encode_segment(img, n, tmp, profile=profile, fps=fps, on_frames=on_frames)
+
+        return segment_cache.get_or_create(keys[i], _produce, suffix=".mp4")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(jobs)))) as pool:
+        segments = list(pool.map(_segment, range(len(jobs))))
+    encode_s = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    concat_segments(segments, audio_path, out_path)
+    if on_progress is not None:
+        on_progress(100.0, 0.0, None)
+    return {
+        "path": out_path,
+        "segments_encoded": sorted(encoded),
+        "segments_reused": len(jobs) - len(encoded),
+        "encode_s": round(encode_s, 3),
+        "concat_s": round(time.perf_counter() - t1, 3),
+    }
+
+
+def stats() -> dict:
+    return segment_cache.stats()
+
+
+__all__ = ["encode_segment", "concat_segments", "render_segments", "segment_key", "frames_for", "stats"]
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from typing import Any, Dict, Tuple
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import io
 import base64
-import os
+
+from .text_layout import fit_text
 
 DEFAULT_W, DEFAULT_H = 1080, 1920
 
@@ -29,34 +30,31 @@ def _text(
     text: str,
     size: int,
     color=(255, 255, 255),
-    anchor="mm",
+    *,
+    max_width: int,
+    max_lines: int = 1,
 ):
-    font_paths = [
-        "/System/Library/Fonts/SFCompactRounded.ttf",  
-        "/System/Library/Fonts/Supplemental/Arial.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ]
-    font = None
-    for p in font_paths:
-        if os.path.exists(p):
-            try:
-                font = ImageFont.truetype(p, size)
-                break
-            except Exception:
-                continue
-    if font is None:
-        font = ImageFont.load_default()
-    draw.text(xy, text, fill=color, font=font, anchor=anchor)
+    """Centered on xy; shrinks down to 60% of `size`, then ellipsizes, to fit max_width."""
+    layout = fit_text(
+        text,
+        max_width,
+        int(size * 1.5 * max_lines),
+        family="rounded",
+        max_size=size,
+        min_size=max(10, int(size * 0.6)),
+        max_lines=max_lines,
+    )
+    layout.draw(draw, xy, fill=color, anchor="mm")
 
 
-def render_endcard(
+def render_endcard_png(
     brief: Dict[str, Any] | None,
     brand: Dict[str, Any] | None,
     *,
     w: int = DEFAULT_W,
     h: int = DEFAULT_H,
     cta: str = "Try it today →",
-) -> str:
+) -> bytes:
   
     title = ""
     if isinstance(brief, dict):
@@ -76,9 +74,11 @@ def render_endcard(
         _text(
             d,
             (center_x, int(h * 0.35)),
-            title[:28],
+            title,
             size=int(h * 0.055),
             color=(255, 255, 255),
+            max_width=w - 2 * padding,
+            max_lines=2,
         )
 
 
@@ -95,9 +95,10 @@ def render_endcard(
     _text(
         d,
         (center_x, btn_y0 + btn_h // 2),
-        cta[:32],
+        cta,
         size=int(h * 0.038),
         color=(0, 0, 0),
+        max_width=int(btn_w * 0.9),
     )
 
 
@@ -109,10 +110,23 @@ def render_endcard(
         "Reelixx • auto-generated end-card",
         size=int(h * 0.03),
         color=(220, 220, 220),
+        max_width=w - 2 * padding,
     )
 
 
     buf = io.BytesIO()
     img.save(buf, format="PNG", optimize=True)
-    b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-    return f"data:image/png;base64,{b64}"
+    return buf.getvalue()
+
+
+def render_endcard(
+    brief: Dict[str, Any] | None,
+    brand: Dict[str, Any] | None,
+    *,
+    w: int = DEFAULT_W,
+    h: int = DEFAULT_H,
+    cta: str = "Try it today →",
+) -> str:
+    """The end card as a PNG data URL."""
+    png = render_endcard_png(brief, brand, w=w, h=h, cta=cta)
+    return f"data:image/png;base64,{base64.b64encode(png).decode('ascii')}"
@@ -0,0 +1,242 @@
+# backend/app/generators/text_layout.py
+"""
+Text layout for slides and cards.
+
+Glyph advances and kerning corrections are measured once per (font, size)
+and memoized, so measuring a string is a sum over its characters instead of
+a FreeType layout of the whole string. Line breaking is a single greedy pass
+over the words, with optional max-lines truncation (ellipsis) and auto-fit
+sizing by binary search. The resulting TextLayout draws itself.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from PIL import ImageDraw, ImageFont
+
+from .fonts import get_font
+
+ELLIPSIS = "…"
+METRICS_CACHE_SIZE = 128
+
+
+class GlyphMetrics:
+    """
+    Memoized advances for one font face at one size. Missing entries are
+    measured with the font passed by the caller (fonts are per-thread, see
+    fonts.py); the numbers themselves are shared.
+    """
+
+    def __init__(self) -> None:
+        self.advance: Dict[str, float] = {}
+        self.kern: Dict[str, float] = {}
+
+    def _adv(self, ch: str, font: ImageFont.ImageFont) -> float:
+        w = self.advance.get(ch)
+        if w is None:
+            w = self.advance[ch] = float(font.getlength(ch))
+        return w
+
+    def _pair(self, pair: str, font: ImageFont.ImageFont) -> float:
+        k = self.kern.get(pair)
+        if k is None:
+            # whatever the layout engine does for the pair (kerning table, raqm
+            # shaping) beyond the two advances
+            k = self.kern[pair] = float(font.getlength(pair)) - self._adv(pair[0], font) - self._adv(pair[1], font)
+        return k
+
+    def width(self, text: str, font: ImageFont.ImageFont) -> float:
+        total, prev = 0.0, ""
+        for ch in text:
+            total += self._adv(ch, font)
+            if prev:
+                total += self._pair(prev + ch, font)
+            prev = ch
+        return total
+
+    def join_width(self, left: str, right: str, font: ImageFont.ImageFont) -> float:
+        """Kerning correction where two measured strings meet."""
+        return self._pair(left[-1] + right[0], font) if left and right else 0.0
+
+
+_metrics: "OrderedDict[Tuple, GlyphMetrics]" = OrderedDict()
+_metrics_lock = threading.Lock()
+
+
+def metrics_for(font: ImageFont.ImageFont) -> GlyphMetrics:
+    path = getattr(font, "path", None)
+    key = (path if isinstance(path, str) else id(font), getattr(font, "size", 0), getattr(font, "index", 0))
+    with _metrics_lock:
+        m = _metrics.get(key)
+        if m is None:
+            m = _metrics[key] = GlyphMetrics()
+            if len(_metrics) > METRICS_CACHE_SIZE:
+                _metrics.popitem(last=False)
+        else:
+            _metrics.move_to_end(key)
+        return m
+
+
+class TextLayout:
+    """Broken lines plus the metrics needed to place and draw them."""
+
+    def __init__(
+        self,
+        lines: List[str],
+        widths: List[float],
+        font: ImageFont.ImageFont,
+        line_height: int,
+        spacing: int,
+        truncated: bool,
+    ):
+        self.lines = lines
+        self.widths = widths
+        self.font = font
+        self.line_height = line_height
+        self.spacing = spacing
+        self.truncated = truncated
+
+    @property
+    def width(self) -> int:
+        return int(round(max(self.widths, default=0.0)))
+
+    @property
+    def height(self) -> int:
+        n = len(self.lines)
+        return n * self.line_height + max(0, n - 1) * self.spacing if n else 0
+
+    def draw(
+        self,
+        draw: ImageDraw.ImageDraw,
+        xy: Tuple[int, int],
+        *,
+        fill=(255, 255, 255),
+        anchor: str = "ma",
+        shadow: Optional[Tuple[int, Tuple[int, int, int]]] = None,
+    ) -> None:
+        """
+        Draw the block. `anchor` works like Pillow's for the whole block:
+        first letter l/m/r (horizontal, also the line alignment), second a/m
+        (top or middle). `shadow` is (offset_px, color), drawn underneath.
+        """
+        x, y = xy
+        if anchor[1:2] == "m":
+            y -= self.height // 2
+        for i, (line, lw) in enumerate(zip(self.lines, self.widths)):
+            if anchor[0] == "m":
+                lx = x - lw / 2
+            elif anchor[0] == "r":
+                lx = x - lw
+            else:
+                lx = x
+            ly = y + i * (self.line_height + self.spacing)
+            if shadow:
+                off, color = shadow
+                draw.text((round(lx) + off, ly + off), line, fill=color, font=self.font)
+            draw.text((round(lx), ly), line, fill=fill, font=self.font)
+
+
+def _line_height(font: ImageFont.ImageFont) -> int:
+    try:
+        ascent, descent = font.getmetrics()
+        return int(ascent + descent)
+    except AttributeError:
+        return int(getattr(font, "size", 10) * 1.2)
+
+
+def _fit_chars(text: str, max_width: float, m: GlyphMetrics, font, suffix: str = "") -> str:
+    """Longest prefix of `text` that fits together with `suffix` (one pass)."""
+    budget = max_width - m.width(suffix, font)
+    total, prev, cut = 0.0, "", 0
+    for i, ch in enumerate(text):
+        total += m._adv(ch, font) + (m._pair(prev + ch, font) if prev else 0.0)
+        if total + (m.join_width(ch, suffix, font) if suffix else 0.0) > budget:
+            break
+        cut, prev = i + 1, ch
+    return text[:cut]
+
+
+def layout_text(
+    text: str,
+    font: ImageFont.ImageFont,
+    max_width: int,
+    *,
+    max_lines: Optional[int] = None,
+    line_height: Optional[int] = None,
+    spacing: int = 0,
+) -> TextLayout:
+    """
+    Greedy word wrap to `max_width` in one pass. Words wider than the line are
+    broken by character. With `max_lines`, the last kept line ends in an
+    ellipsis when text was dropped.
+    """
+    m = metrics_for(font)
+    space = m.width(" ", font)
+
+    lines: List[str] = []
+    widths: List[float] = []
+    cur, cur_w = "", 0.0
+    for word in (text or "").split():
+        ww = m.width(word, font)
+        if cur:
+            joined = cur_w + m.join_width(cur, " ", font) + space + m.join_width(" ", word, font) + ww
+            if joined <= max_width:
+                cur, cur_w = f"{cur} {word}", joined
+                continue
+            lines.append(cur)
+            widths.append(cur_w)
+        cur, cur_w = word, ww
+        while cur_w > max_width and len(cur) > 1:
+            head = _fit_chars(cur, max_width, m, font) or cur[0]
+            lines.append(head)
+            widths.append(m.width(head, font))
+            cur = cur[len(head):]
+            cur_w = m.width(cur, font)
+    if cur:
+        lines.append(cur)
+        widths.append(cur_w)
+
+    truncated = False
+    if max_lines is not None and len(lines) > max_lines:
+        truncated = True
+        keep = max(1, max_lines)
+        rest = " ".join(lines[keep - 1:])
+        last = _fit_chars(rest, max_width, m, font, suffix=ELLIPSIS).rstrip() + ELLIPSIS
+        lines = lines[: keep - 1] + [last]
+        widths = widths[: keep - 1] + [m.width(last, font)]
+
+    return TextLayout(lines, widths, font, line_height or _line_height(font), spacing, truncated)
+
+
+def fit_text(
+    text: str,
+    max_width: int,
+    max_height: int,
+    *,
+    family: str = "sans",
+    max_size: int,
+    min_size: int = 12,
+    max_lines: Optional[int] = None,
+    line_spacing: float = 0.0,
+) -> TextLayout:
+    """
+    Largest font size in [min_size, max_size] whose layout fits the box without
+    truncation (binary search). Falls back to min_size, truncated if need be.
+    """
+    def _at(size: int) -> TextLayout:
+        return layout_text(
+            text, get_font(size, family), max_width, max_lines=max_lines, spacing=int(size * line_spacing)
+        )
+
+    lo, hi = int(min_size), int(max(min_size, max_size))
+    best: Optional[TextLayout] = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        lay = _at(mid)
+        if not lay.truncated and lay.height <= max_height and lay.width <= max_width:
+            best, lo = lay, mid + 1
+        else:
+            hi = mid - 1
+    return best or _at(int(min_size))
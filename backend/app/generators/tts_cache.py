@@ -0,0 +1,53 @@
+# backend/app/generators/tts_cache.py
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..diskcache import DiskCache, content_key
+
+APP_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(os.getenv("REELIXX_TTS_CACHE_DIR", str(APP_DIR.parent / "cache" / "tts")))
+CACHE_MB = int(os.getenv("REELIXX_TTS_CACHE_MB", "512"))
+# opt-in shared tier so every node reuses the same voice lines
+S3_PREFIX = "cache/tts" if os.getenv("REELIXX_TTS_CACHE_S3", "0") == "1" else None
+
+tts_cache = DiskCache(CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024, s3_prefix=S3_PREFIX)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace; case is kept (it changes delivery)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def cached_speech(
+    text: str,
+    voice: str,
+    model: str,
+    synthesize: Callable[[Path], None],
+) -> Path:
+    """
+    Return an MP3 of `text`, calling synthesize(out_path) only on a cache miss.
+    Single-flight: renders running at once (e.g. a variant batch) that share a
+    line wait for one synthesis instead of each paying for it.
+    """
+    key = content_key("speech", model, voice, normalize_text(text))
+    return tts_cache.get_or_create(key, synthesize, suffix=".mp3", single_flight=True)
+
+
+def peek_speech(text: str, voice: str, model: str) -> Optional[Path]:
+    """The cached MP3 of `text` if it was synthesized before; never synthesizes."""
+    return tts_cache.get(content_key("speech", model, voice, normalize_text(text)), suffix=".mp3")
+
+
+def cached_silence(duration_ms: int, synthesize: Callable[[Path], None]) -> Path:
+    """Free-mode placeholder VO; silent MP3s are keyed by duration only."""
+    key = content_key("silence", int(duration_ms))
+    return tts_cache.get_or_create(key, synthesize, suffix=".mp3")
+
+
+def stats() -> dict:
+    return tts_cache.stats()
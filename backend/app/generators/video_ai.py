@@ -2,24 +2,36 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import io
 import os
 import time
 import base64
-import math
+import uuid
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from pydub import AudioSegment
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
+from moviepy.editor import AudioFileClip
 
 # Import storage manager
+from ..progress import Progress
 from ..storage import storage
+from . import image_pool
+from .asset_stage import Provider, run_asset_stage
+from .audio_timeline import build_timeline
+from .export_profiles import PREVIEW, ExportProfile, output_name, resolve_exports, write_clip_exports
+from .ffmpeg_render import OnProgress, render_exports
+from .segment_render import render_segments
+from .text_layout import fit_text
+from .music_ai import MUSIC_GAIN_DB, duck_params
+from .music_bed import bed_segment
+from .preview import preview_format, scene_times, write_sprite, write_webp
+from .tts_cache import cached_silence, cached_speech, peek_speech
 
 # ---------- Paths ----------
 APP_DIR = Path(__file__).resolve().parent
 ASSETS_DIR = APP_DIR / "assets"
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 ASSETS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -27,6 +39,13 @@ ASSETS_DIR.mkdir(parents=True, exist_ok=True)
 API_KEY = os.getenv("OPENAI_API_KEY")
 FREE_MODE = os.getenv("REELIXX_FREE_MODE", "0") == "1" or not API_KEY
 
+# "moviepy" composites frames in Python; "ffmpeg" hands still slides to ffmpeg directly;
+# "segments" encodes each scene once into a cached segment and stream-copies them together
+RENDERERS = ("moviepy", "ffmpeg", "segments")
+DEFAULT_RENDERER = os.getenv("REELIXX_RENDERER", "moviepy")
+
+TTS_MODEL = "gpt-4o-mini-tts"
+
 # Lazy OpenAI client (only if available & not in free mode)
 client = None
 if not FREE_MODE:
@@ -34,41 +53,6 @@ if not FREE_MODE:
     client = OpenAI(api_key=API_KEY)
 
 # ---------- Helpers (common) ----------
-def _pick_font(size: int) -> ImageFont.ImageFont:
-    """Pick a font that exists on macOS/Linux; fallback to default."""
-    candidates = [
-        "/System/Library/Fonts/SFNS.ttf",
-        "/System/Library/Fonts/SFNSRounded.ttf",
-        "/System/Library/Fonts/Supplemental/Arial.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            try:
-                return ImageFont.truetype(p, size)
-            except Exception:
-                continue
-    return ImageFont.load_default()
-
-def _wrap(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont, max_width: int, max_lines: int = 4) -> List[str]:
-    words = text.split()
-    lines: List[str] = []
-    cur = ""
-    for w in words:
-        trial = (cur + " " + w).strip()
-        bbox = draw.textbbox((0, 0), trial, font=font)
-        if (bbox[2] - bbox[0]) <= max_width:
-            cur = trial
-        else:
-            if cur:
-                lines.append(cur)
-            cur = w
-        if len(lines) >= max_lines:
-            break
-    if cur and len(lines) < max_lines:
-        lines.append(cur)
-    return lines
-
 def _hex_to_rgb(h: str | None, default=(17, 17, 17)) -> Tuple[int, int, int]:
     if not h or not isinstance(h, str):
         return default
@@ -98,86 +82,96 @@ def _pick_music(mood: str | None = "upbeat") -> Path | None:
     return p if p.exists() else None
 
 # ---------- TTS ----------
+def _silent_vo(text: str) -> Path:
+    """Silent MP3 whose duration ~= reading time (~14 chars/sec, min 1.2s)."""
+    secs = max(1.2, len(text.strip()) / 14.0)
+    duration_ms = int(secs * 1000)
+
+    def _silence(out: Path) -> None:
+        AudioSegment.silent(duration=duration_ms).export(out, format="mp3")
+
+    return cached_silence(duration_ms, _silence)
+
+
+def preview_tts(text: str, voice: str = "alloy") -> Path:
+    """Voice for previews: the real line if it is already in the TTS cache, silence otherwise."""
+    return peek_speech(text, voice, TTS_MODEL) or _silent_vo(text)
+
+
 def tts_generate(text: str, voice: str = "alloy") -> Path:
     """
-    Generate an MP3 voiceover.
+    Generate an MP3 voiceover (served from the TTS cache when possible).
     - Pro mode: OpenAI TTS (gpt-4o-mini-tts)
     - Free mode: silent MP3 whose duration ~= reading time
     """
-    out = EXPORT_DIR / f"vo_{int(time.time()*1000)}.mp3"
-
     if FREE_MODE or client is None:
-        # Estimate duration: ~14 chars/sec, min 1.2s
-        secs = max(1.2, len(text.strip()) / 14.0)
-        silence = AudioSegment.silent(duration=int(secs * 1000))
-        silence.export(out, format="mp3")
-        return out
+        return _silent_vo(text)
 
     # OpenAI TTS
-    with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice=voice,
-        input=text
-    ) as resp:
-        resp.stream_to_file(out)
-    return out
+    def _speech(out: Path) -> None:
+        with client.audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text
+        ) as resp:
+            resp.stream_to_file(out)
+
+    return cached_speech(text, voice, TTS_MODEL, _speech)
 
 # ---------- Music mix ----------
-def bg_music_overlay(voice_path: Path, music_path: Path | None, music_gain_db: float = -15.0) -> Path:
+def bg_music_overlay(voice_path: Path, music_path: Path | None, music_gain_db: float = MUSIC_GAIN_DB) -> Path:
     """
     Mix background music under the voice. If music_path is None, just return voice.
     """
     voice = AudioSegment.from_file(str(voice_path))
 
     if music_path and music_path.exists():
-        music = AudioSegment.from_file(str(music_path))
-        # Trim/loop or crop to match voice duration
-        if len(music) < len(voice):
-            # Simple loop if bg track is shorter
-            loops = math.ceil(len(voice) / max(1, len(music)))
-            music = music * loops
-        music = music[: len(voice)]
-        music = music + music_gain_db
+        music = bed_segment(music_path, len(voice)) + music_gain_db
         mixed = music.overlay(voice)
     else:
         mixed = voice
 
-    out = EXPORT_DIR / f"mix_{int(time.time()*1000)}.mp3"
+    out = EXPORT_DIR / f"mix_{int(time.time()*1000)}_{uuid.uuid4().hex[:6]}.mp3"
     mixed.export(out, format="mp3")
     return out
 
 # ---------- Image generation ----------
+def local_scene_image(prompt: str, brand_color: str = "#111111", size: Tuple[int, int] = (1080, 1920)) -> Path:
+    """Free slide: solid brand background with clean wrapped text (no API call)."""
+    # scenes are generated concurrently, so the timestamp alone can collide
+    out = EXPORT_DIR / f"scene_{int(time.time()*1000)}_{uuid.uuid4().hex[:8]}.png"
+    w, h = size
+    bg = _hex_to_rgb(brand_color, (17, 17, 17))
+    img = Image.new("RGB", (w, h), bg)
+    draw = ImageDraw.Draw(img)
+
+    # largest size (up to 6% of height) that fits 6 lines; ellipsis past that
+    layout = fit_text(
+        prompt.strip() or " ",
+        int(w * 0.8),
+        int(h * 0.6),
+        max_size=int(h * 0.06),
+        min_size=int(h * 0.035),
+        max_lines=6,
+        line_spacing=0.1,
+    )
+    layout.draw(draw, (w // 2, int(h * 0.25)), fill=(255, 255, 255))
+
+    img.save(out, format="PNG", optimize=True)
+    return out
+
+
 def generate_scene_image(prompt: str, size: str = "1024x1536", brand_color: str = "#111111") -> Path:
     """
     Create a scene image.
     - Pro mode: OpenAI gpt-image-1
     - Free mode: solid background with clean wrapped text
     """
-    out = EXPORT_DIR / f"scene_{int(time.time()*1000)}.png"
-
     if FREE_MODE or client is None:
-        # Make a nice 9:16 canvas and place prompt text
-        w, h = (1080, 1920)
-        bg = _hex_to_rgb(brand_color, (17, 17, 17))
-        img = Image.new("RGB", (w, h), bg)
-        draw = ImageDraw.Draw(img)
-
-        title_font = _pick_font(int(h * 0.06))
-        body_w = int(w * 0.8)
-        lines = _wrap(draw, prompt.strip() or " ", title_font, body_w, max_lines=6)
-
-        y = int(h * 0.25)
-        for i, line in enumerate(lines):
-            bb = draw.textbbox((0, 0), line, font=title_font)
-            tw = bb[2] - bb[0]
-            x = (w - tw) // 2
-            draw.text((x, y), line, fill=(255, 255, 255), font=title_font)
-            y += int(title_font.size * 1.25)
-
-        img.save(out, format="PNG", optimize=True)
-        return out
+        return local_scene_image(prompt, brand_color)
 
     # OpenAI image
+    out = EXPORT_DIR / f"scene_{int(time.time()*1000)}_{uuid.uuid4().hex[:8]}.png"
     res = client.images.generate(
         model="gpt-image-1",
         prompt=f"vertical 9:16 cinematic product ad still, {prompt}",
@@ -189,6 +183,94 @@ def generate_scene_image(prompt: str, size: str = "1024x1536", brand_color: str
     img.save(out, format="PNG", optimize=True)
     return out
 
+def _asset_provider(brand_color: str, *, local_only: bool = False, canvas: Tuple[int, int] = (1080, 1920)) -> Provider:
+    if local_only or FREE_MODE or client is None:
+        return Provider("local", tts_generate, lambda prompt: local_scene_image(prompt, brand_color, canvas))
+
+    def image(prompt: str) -> Path:
+        return generate_scene_image(prompt, size="1024x1536", brand_color=brand_color)
+
+    return Provider("openai", tts_generate, image)
+
+
+# ---------- Renderers ----------
+Outputs = List[Tuple[ExportProfile, Path]]
+
+
+def _render_moviepy(
+    slides: List[Tuple[Path, float]], audio_path: Path, outputs: Outputs, on_progress: Optional[OnProgress] = None
+) -> Dict[str, float]:
+    frames = [np.array(Image.open(p).convert("RGB")) for p, _ in slides]
+    audio_clip = AudioFileClip(str(audio_path))
+    try:
+        return write_clip_exports(frames, [d for _, d in slides], audio_clip, outputs, fps=30,
+                                  on_progress=on_progress)
+    finally:
+        audio_clip.close()
+
+
+def _render_ffmpeg(
+    slides: List[Tuple[Path, float]], audio_path: Path, outputs: Outputs, on_progress: Optional[OnProgress] = None
+) -> Dict[str, float]:
+    """Let ffmpeg loop each still for its scene duration over the ad's single track (all exports in one run)."""
+    t0 = time.perf_counter()
+    render_exports(slides, audio_path, outputs, fps=30, on_progress=on_progress)
+    # one shared decode: the run's wall time is the cost of every output together
+    return {out.name: round(time.perf_counter() - t0, 3) for _, out in outputs}
+
+
+def _render_segments(
+    slides: List[Tuple[Path, float]],
+    audio_path: Path,
+    outputs: Outputs,
+    canvas: Tuple[int, int],
+    on_progress: Optional[OnProgress] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Per-scene cached segments: an edit to one scene re-encodes only that scene."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for n, (profile, out) in enumerate(outputs):
+        # each export is its own segment run: spread them over 0..100
+        scaled = (
+            (lambda pct, eta, scene, n=n: on_progress((100.0 * n + pct) / len(outputs), eta, scene))
+            if on_progress else None
+        )
+        results[out.name] = render_segments(
+            slides, audio_path, out, canvas=canvas, profile=profile, fps=30, on_progress=scaled
+        )
+    return results
+
+
+def _still_preview(
+    fmt: str, slides: List[Tuple[Path, float]], assets: List[Dict[str, Any]], pool: image_pool.ImagePool,
+    asset_stage_s: float,
+) -> Dict[str, Any]:
+    """Animated WebP or sprite sheet of the scenes (no video encode)."""
+    t0 = time.perf_counter()
+    stem = f"preview_{int(time.time() * 1000)}_{uuid.uuid4().hex[:6]}"
+    images = [p for p, _ in slides]
+    durations = [d for _, d in slides]
+    extra: Dict[str, Any] = {}
+    if fmt == "webp":
+        out = write_webp(images, durations, EXPORT_DIR / f"{stem}.webp", size=PREVIEW.size)
+    else:
+        out = EXPORT_DIR / f"{stem}_sprite.jpg"
+        extra["sprite"] = write_sprite(images, out)
+    return {
+        "ok": True,
+        "preview": fmt,
+        "path": str(out),
+        "url": f"/exports/{out.name}",
+        "filename": out.name,
+        "scenes": scene_times(durations),
+        **extra,
+        "asset_stage_s": round(asset_stage_s, 3),
+        "asset_timings": [a["timings"] for a in assets],
+        "images_from_pool": pool.resolved,
+        "images_generated": pool.missed,
+        "render_s": round(time.perf_counter() - t0, 3),
+    }
+
+
 # ---------- Public entry ----------
 def generate_ai_ad(
     storyboard: Dict[str, Any],
@@ -197,73 +279,196 @@ def generate_ai_ad(
     brand_color: str = "#111111",
     music_mood: str | None = "upbeat",
     tts_voice: str = "alloy",
+    renderer: str | None = None,
+    asset_provider: Provider | None = None,
+    scene_images: List[Path] | None = None,
+    local_only: bool | None = None,
+    preview: str | bool | None = None,
+    progress: Callable[[Dict[str, Any]], None] | None = None,
+    endcard: Path | None = None,
 ) -> Dict[str, Any]:
     """
     Build the ad:
       - TTS per scene (or silence in free mode)
-      - Background music under VO (or silence if missing)
-      - One image per scene (OpenAI or local slide)
+      - One continuous background music bed under the VO (or silence if missing)
+      - One image per scene: the scene's `visual` resolved from the local image
+        pool (`scene_images` + stock dir; "endcard" scenes use `endcard` if given),
+        else OpenAI or a local slide
+      - Encode with `renderer`: "moviepy" (default), "ffmpeg" (still-image concat)
+        or "segments" (per-scene segment cache + stream-copy concat), once per
+        `storyboard["exports"]` profile (see export_profiles); path/url/filename
+        are the first export's, "exports" lists all of them
+    TTS and image requests for all scenes run concurrently (see asset_stage);
+    pass `asset_provider` to swap the backend, e.g. asset_stage.stub_provider().
+    `local_only` (default REELIXX_LOCAL_IMAGES_ONLY) never calls a paid image API.
+    `preview` ("mp4" | "webp" | "sprite", see preview.py) renders a quick local-only
+    draft at 360x640 / 12 fps instead, with cached-or-silent voice and no exports[].
+    `progress` receives structured events per stage (see app/progress.py).
     """
     scenes: List[Dict[str, Any]] = storyboard.get("scenes") or []
     if not scenes:
         raise ValueError("Storyboard must contain scenes.")
 
+    renderer = (renderer or DEFAULT_RENDERER).lower().strip()
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer '{renderer}'. Use one of: {', '.join(RENDERERS)}")
+    preview = preview_format(preview)
+    prog = Progress(progress, scenes=len(scenes))
+
     # background music
     music_file = _pick_music(music_mood)
 
-    clips = []
-    for s in scenes:
-        # Text source: scene text -> caption string -> caption.caption
-        raw_caption = caption if isinstance(caption, str) else (caption.get("caption") if isinstance(caption, dict) else "")
-        text = (s.get("text") or raw_caption or "").strip() or " "
-
-        # 1) voice
-        voice_mp3 = tts_generate(text, voice=tts_voice)
-
-        # 2) music mix
-        mixed_mp3 = bg_music_overlay(voice_mp3, music_file)
-
-        # 3) image
-        img_path = generate_scene_image(text, size="1024x1536", brand_color=brand_color)
-
-        # 4) clip (duration from audio)
-        audio_clip = AudioFileClip(str(mixed_mp3))
-        frame = np.array(Image.open(img_path).convert("RGB"))
-        clip = (
-            ImageClip(frame)
-            .set_duration(audio_clip.duration)
-            .set_audio(audio_clip)
-            .set_fps(30)
+    # Text source: scene text -> caption string -> caption.caption
+    raw_caption = caption if isinstance(caption, str) else (caption.get("caption") if isinstance(caption, dict) else "")
+    texts = [(s.get("text") or raw_caption or "").strip() or " " for s in scenes]
+
+    # 1) scene visuals from the local pool first; generation only for the rest
+    local_only = image_pool.LOCAL_ONLY if local_only is None else local_only
+    canvas = PREVIEW.size if preview else image_pool.canvas_of(storyboard)
+    pool = image_pool.ImagePool(scene_images or [], canvas=canvas, endcard=endcard)
+    pooled = pool.resolve_scenes(scenes, texts)
+    if preview:
+        # never a paid call: local slides, and only voice lines that are already cached
+        provider = Provider("preview", asset_provider.tts if asset_provider else preview_tts,
+                            lambda prompt: local_scene_image(prompt, brand_color, canvas))
+    else:
+        # generated scenes are cached on their inputs, so an unchanged scene is never re-generated
+        provider = image_pool.cached_images(
+            asset_provider or _asset_provider(brand_color, local_only=local_only, canvas=canvas), brand_color, canvas
         )
-        clips.append(clip)
-
-    final = concatenate_videoclips(clips, method="compose")
-
-    ts = int(time.time())
-    filename = f"ai_ad_{ts}.mp4"
-    out_path = EXPORT_DIR / filename
-    
-    # Write video file locally first
-    final.write_videofile(
-        str(out_path),
-        fps=30,
-        codec="libx264",
-        audio_codec="aac",
-        threads=2,
-        logger=None,
-    )
-    final.close()
 
-    # Upload to storage (S3 or keep local)
-    file_url = storage.save_file_from_path(out_path, f"videos/{filename}")
-    
-    # Clean up local file if using S3
-    if storage.use_s3 and out_path.exists():
-        out_path.unlink()
+    # 2) voice + remaining images for every scene, fanned out concurrently
+    t0 = time.perf_counter()
+    n_images = sum(1 for p in pooled if not p) if provider.image else 0
+    assets = run_asset_stage(texts, provider, voice=tts_voice, images=pooled,
+                             on_done=prog.assets(len(texts) + n_images))
+    asset_stage_s = time.perf_counter() - t0
+
+    # 3) one continuous music bed under all voice clips, decoded/encoded once
+    # storyboard "audio": {"duck": true | {...}} turns on sidechain ducking under the VO
+    duck = duck_params((storyboard.get("audio") or {}).get("duck"))
+    if preview in ("webp", "sprite"):
+        music_file = None  # only the scene durations are needed
+    track = build_timeline([a["voice"] for a in assets], music_file, music_gain_db=MUSIC_GAIN_DB, duck=duck)
+    slides = [(a["image"], d) for a, d in zip(assets, track["durations"])]
+    prog("mix", 100)
+
+    if preview in ("webp", "sprite"):
+        Path(track["path"]).unlink(missing_ok=True)
+        return _still_preview(preview, slides, assets, pool, asset_stage_s)
+
+    profiles = [PREVIEW] if preview else resolve_exports(storyboard)
+    suffix = uuid.uuid4().hex[:6]
+    stem = f"preview_{int(time.time() * 1000)}_{suffix}" if preview else f"ai_ad_{int(time.time())}_{suffix}"
+    outputs = [(p, EXPORT_DIR / output_name(stem, p, i)) for i, p in enumerate(profiles)]
+
+    # Write video files locally first
+    segments: Dict[str, Dict[str, Any]] = {}
+    on_encode = prog.encoder() if progress else None
+    try:
+        if renderer == "segments":
+            segments = _render_segments(slides, track["path"], outputs, canvas, on_encode)
+            timings = {name: seg["encode_s"] + seg["concat_s"] for name, seg in segments.items()}
+        elif renderer == "ffmpeg":
+            timings = _render_ffmpeg(slides, track["path"], outputs, on_encode)
+        else:
+            timings = _render_moviepy(slides, track["path"], outputs, on_encode)
+    finally:
+        Path(track["path"]).unlink(missing_ok=True)
+
+    exports = []
+    for profile, path in outputs:
+        size = path.stat().st_size
+        if preview:
+            url = f"/exports/{path.name}"  # drafts stay local
+        else:
+            # Upload to storage (S3 or keep local)
+            url = storage.save_file_from_path(path, f"videos/{path.name}")
+            # Clean up local file if using S3
+            if storage.use_s3 and path.exists():
+                path.unlink()
+        entry = {"preset": profile.name, "filename": path.name, "url": url, "bytes": size,
+                 "encode_s": timings.get(path.name)}
+        if path.name in segments:
+            entry.update({k: segments[path.name][k] for k in ("segments_encoded", "segments_reused")})
+        exports.append(entry)
+        prog("upload", 100.0 * len(exports) / len(outputs))
+
+    out_path, filename, file_url = outputs[0][1], exports[0]["filename"], exports[0]["url"]
 
     return {
         "ok": True,
         "path": str(out_path),
         "url": file_url,
         "filename": filename,
-    }
\ No newline at end of file
+        "renderer": renderer,
+        "preview": preview,
+        "asset_stage_s": round(asset_stage_s, 3),
+        "asset_timings": [a["timings"] for a in assets],
+        "images_from_pool": pool.resolved,
+        "images_generated": pool.missed,
+        "audio_decode_s": track["decode_s"],
+        "audio_mix_s": track["mix_s"],
+        "music_decode_saved_s": track["music_decode_saved_s"],
+        # scene timing in the MP4 (voice-line lengths, not storyboard start/end): captions follow these
+        "scenes": scene_times(track["durations"]),
+        "exports": exports,
+        **({k: exports[0][k] for k in ("segments_encoded", "segments_reused")} if segments else {}),
+    }
+
+
+def render_storyboards(
+    items: List[Dict[str, Any]],
+    *,
+    brand_color: str = "#111111",
+    music_mood: str | None = "upbeat",
+    tts_voice: str = "alloy",
+    asset_provider: Provider | None = None,
+    scene_images: List[Path] | None = None,
+    endcard: Path | None = None,
+    local_only: bool | None = None,
+    on_node: Callable[[int, int], None] | None = None,
+) -> Dict[str, Any]:
+    """
+    Render several ads as one deduplicated asset graph (see render_plan.py):
+    a voice line, image, encoded scene or audio mix shared by several
+    storyboards is produced once. `items` are {"storyboard", "caption"} dicts;
+    returns {"ads": [{"exports": [...], "scenes": [...]}, ...] in input order,
+    "report": {...}}.
+    """
+    from .render_plan import RenderPlan
+
+    local_only = image_pool.LOCAL_ONLY if local_only is None else local_only
+    canvas = image_pool.canvas_of(items[0]["storyboard"] if items else {})
+    plan = RenderPlan(
+        asset_provider or _asset_provider(brand_color, local_only=local_only, canvas=canvas),
+        voice=tts_voice,
+        brand_color=brand_color,
+        music=_pick_music(music_mood),
+        music_gain_db=MUSIC_GAIN_DB,
+        out_dir=EXPORT_DIR,
+    )
+    for item in items:
+        sb = item["storyboard"]
+        plan.add(sb, item.get("caption") or "", scene_images=scene_images or [], endcard=endcard,
+                 duck=duck_params((sb.get("audio") or {}).get("duck")))
+    plan.run(on_node)
+
+    # variants that dedupe to the same final share one file: save each path once,
+    # and only drop local copies once every variant has its URL
+    saved: dict = {}
+    ads = []
+    for outputs, scenes in zip(plan.results(), plan.scene_times()):
+        exports = []
+        for name, path in outputs.items():
+            if path not in saved:
+                saved[path] = (storage.save_file_from_path(path, f"videos/{path.name}"), path.stat().st_size)
+            url, size = saved[path]
+            exports.append({"preset": name, "filename": path.name, "url": url, "bytes": size})
+        ads.append({"filename": exports[0]["filename"], "url": exports[0]["url"], "exports": exports,
+                    "scenes": scenes})
+    if storage.use_s3:
+        for path, (url, _) in saved.items():
+            if not url.startswith("/exports/"):  # a failed upload falls back to the local file
+                path.unlink(missing_ok=True)
+    return {"ads": ads, "report": plan.report()}
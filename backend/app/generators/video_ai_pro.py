@@ -1,62 +1,93 @@
 # backend/app/generators/video_ai_pro.py
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from pathlib import Path
+import os
 import time
+import uuid
 import numpy as np
 from PIL import Image
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
+from moviepy.editor import AudioFileClip
 
-from .image_ai import resolve_images_for_scenes
+from ..progress import Progress
+from . import image_pool
+from .asset_stage import Provider, run_asset_stage
+from .export_profiles import output_name, resolve_exports, write_clip_exports
+from .image_ai import generate_scene_image
+from .video_ai import local_scene_image
 from .voice_ai import tts_generate
-from .music_ai import duck_and_mix
+from .audio_timeline import build_timeline
+from .music_ai import MUSIC_GAIN_DB, duck_params, pick_music
 
 APP_DIR = Path(__file__).resolve().parent
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-def _img_clip(path: Path, duration: float, fps: int = 30) -> ImageClip:
-    arr = np.array(Image.open(path).convert("RGB"))
-    return ImageClip(arr).set_duration(duration).set_fps(fps)
-
 def generate_ai_video(
     storyboard: Dict[str, Any],
     *,
     voice: str = "alloy",
     music_mood: str = "upbeat",
     scene_images: Optional[List[Path]] = None,  # <-- new
+    asset_provider: Optional[Provider] = None,
+    local_only: Optional[bool] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
 ) -> Dict[str, Any]:
     scenes: List[Dict[str, Any]] = storyboard.get("scenes", [])
     if not scenes:
         raise ValueError("Storyboard must contain scenes")
+    prog = Progress(progress, scenes=len(scenes))
 
     fps = int((storyboard.get("canvas") or {}).get("fps", 30))
     prompts = [(s.get("text") or "").strip() or "product hero" for s in scenes]
-    resolved_imgs = resolve_images_for_scenes(prompts, provided=scene_images)
-
-    clips = []
-    for i, s in enumerate(scenes):
-        text = (s.get("text") or "").strip() or " "
-       
-        voice_mp3 = tts_generate(text, voice=voice)
-        mixed_mp3 = duck_and_mix(voice_mp3, mood=music_mood)
+    texts = [(s.get("text") or "").strip() or " " for s in scenes]
 
-    
-        img_path = resolved_imgs[i]
+    # scene visuals come from the local pool (provided images + stock) first;
+    # only scenes it cannot serve are generated (local slides in local-only mode)
+    local_only = image_pool.LOCAL_ONLY if local_only is None else local_only
+    canvas = image_pool.canvas_of(storyboard)
+    pool = image_pool.ImagePool(scene_images or [], canvas=canvas)
+    pooled = pool.resolve_scenes(scenes, prompts)
+    if local_only:
+        def _local(prompt: str) -> Path:
+            return local_scene_image(prompt, size=canvas)
 
-        
-        audio_clip = AudioFileClip(str(mixed_mp3))
-        clip = _img_clip(img_path, duration=audio_clip.duration, fps=fps).set_audio(audio_clip)
-        clips.append(clip)
+        provider = Provider("local", asset_provider.tts if asset_provider else tts_generate, _local)
+    else:
+        provider = asset_provider or Provider("openai", tts_generate, generate_scene_image)
+    t0 = time.perf_counter()
+    n_images = sum(1 for p in pooled if not p) if provider.image else 0
+    assets = run_asset_stage(texts, provider, voice=voice, image_prompts=prompts, images=pooled,
+                             on_done=prog.assets(len(texts) + n_images))
+    asset_stage_s = time.perf_counter() - t0
 
-    video = concatenate_videoclips(clips, method="compose")
-    ts = int(time.time())
-    out = EXPORT_DIR / f"pro_ad_{ts}.mp4"
-    video.write_videofile(
-        str(out), fps=fps, codec="libx264", audio_codec="aac", preset="medium", threads=2, logger=None
+    # music bed decoded once and mixed under all scenes in one pass
+    duck = duck_params((storyboard.get("audio") or {}).get("duck"))
+    track = build_timeline(
+        [a["voice"] for a in assets], pick_music(music_mood), music_gain_db=MUSIC_GAIN_DB, duck=duck
     )
-    duration = getattr(video, "duration", None)
-    video.close()
+    prog("mix", 100)
+
+    # scene images decoded once, then encoded once per storyboard export profile
+    frames = [np.array(Image.open(a["image"]).convert("RGB")) for a in assets]
+    profiles = resolve_exports(storyboard)
+    stem = f"pro_ad_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    outputs = [(p, EXPORT_DIR / output_name(stem, p, i)) for i, p in enumerate(profiles)]
+    audio_clip = AudioFileClip(str(track["path"]))
+    try:
+        timings = write_clip_exports(frames, track["durations"], audio_clip, outputs, fps=fps,
+                                     on_progress=prog.encoder() if progress else None)
+        duration = audio_clip.duration
+    finally:
+        audio_clip.close()
+        Path(track["path"]).unlink(missing_ok=True)
+
+    out = outputs[0][1]
+    exports = [
+        {"preset": p.name, "filename": path.name, "url": f"/exports/{path.name}",
+         "bytes": path.stat().st_size, "encode_s": timings[path.name]}
+        for p, path in outputs
+    ]
 
     return {
         "ok": True,
@@ -64,4 +95,10 @@ def generate_ai_video(
         "url": f"/exports/{out.name}",
         "filename": out.name,
         "duration": duration,
+        "asset_stage_s": round(asset_stage_s, 3),
+        "asset_timings": [a["timings"] for a in assets],
+        "images_from_pool": pool.resolved,
+        "images_generated": pool.missed,
+        "music_decode_saved_s": track["music_decode_saved_s"],
+        "exports": exports,
     }
\ No newline at end of file
@@ -2,19 +2,18 @@
 from __future__ import annotations
 from typing import Dict, Any, List, Tuple
 from pathlib import Path
+import os
 import time
 import numpy as np
 
-from PIL import Image, ImageDraw, ImageFont
-from moviepy.editor import (
-    ImageClip,
-    AudioFileClip,
-    concatenate_videoclips,
-    afx,
-)
+from PIL import Image, ImageDraw
+
+from .export_profiles import output_name, resolve_exports, write_clip_exports
+from .text_layout import fit_text
+from moviepy.editor import AudioFileClip, afx
 
 APP_DIR = Path(__file__).resolve().parent
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 ASSETS_DIR = APP_DIR / "assets"
@@ -31,25 +30,6 @@ def _hex_to_rgb(hexcolor: str) -> Tuple[int, int, int]:
     return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
 
 
-def _wrap_text(draw: ImageDraw.ImageDraw, text: str, max_width: int, font: ImageFont.ImageFont) -> str:
-
-    words = (text or "").split()
-    if not words:
-        return ""
-
-    lines: List[str] = []
-    cur = words[0]
-    for w in words[1:]:
-        test = f"{cur} {w}"
-        if draw.textlength(test, font=font) <= max_width:
-            cur = test
-        else:
-            lines.append(cur)
-            cur = w
-    lines.append(cur)
-    return "\n".join(lines)
-
-
 def _render_card(
     text: str,
     size: Tuple[int, int],
@@ -61,29 +41,16 @@ def _render_card(
     draw = ImageDraw.Draw(img)
 
 
-    try:
-      
-        font_path = str((ASSETS_DIR / "Inter-SemiBold.ttf"))
-        font = ImageFont.truetype(font_path, size=int(H * 0.05))
-    except Exception:
-        font = ImageFont.load_default()
-
-    
-    max_text_width = int(W * 0.82)
-    wrapped = _wrap_text(draw, text or "", max_text_width, font)
-
-
-    bbox = draw.multiline_textbbox((0, 0), wrapped, font=font, align="center", spacing=8)
-    tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
-    x = (W - tw) // 2
-    y = (H - th) // 2
-
-
-    shadow_offset = 2
-    draw.multiline_text((x + shadow_offset, y + shadow_offset), wrapped, fill=(0, 0, 0), font=font, align="center", spacing=8)
-
-
-    draw.multiline_text((x, y), wrapped, fill=(255, 255, 255), font=font, align="center", spacing=8)
+    layout = fit_text(
+        text or "",
+        int(W * 0.82),
+        int(H * 0.8),
+        family="card",
+        max_size=int(H * 0.05),
+        min_size=int(H * 0.03),
+        line_spacing=0.08,
+    )
+    layout.draw(draw, (W // 2, H // 2), anchor="mm", shadow=(2, (0, 0, 0)))
 
     return img
 
@@ -105,42 +72,43 @@ def render_stub_video(
         scenes = [{"start": 0, "end": 6, "text": "Your Ad"}]
 
    
-    clips: List[ImageClip] = []
+    # cards drawn once at the canvas size, then encoded per export profile
+    frames: List[np.ndarray] = []
+    durations: List[float] = []
     for s in scenes:
         start = float(s.get("start", 0))
         end = float(s.get("end", max(3.0, start + 3.0)))
-        duration = max(0.2, end - start)
+        durations.append(max(0.2, end - start))
 
         text = (s.get("text") or "").strip() or " "
-        frame_img = _render_card(text, (W, H), color)
-        clip = ImageClip(np.array(frame_img)).with_duration(duration).with_fps(fps)
-        clips.append(clip)
+        frames.append(np.array(_render_card(text, (W, H), color)))
+    total = sum(durations)
 
-    video = concatenate_videoclips(clips, method="compose")
-
-  
     if music_path is None:
         music_path = DEFAULT_MUSIC if DEFAULT_MUSIC.exists() else None
 
+    music = None
     if music_path is not None:
         try:
-            music = AudioFileClip(str(music_path)).fx(afx.volumex, 0.6)
-            music = music.set_duration(video.duration)
-            video = video.set_audio(music)
+            music = AudioFileClip(str(music_path))
+            music = music.fx(afx.volumex, 0.6).set_duration(min(total, music.duration))
         except Exception:
-           
-            pass
+            music = None
 
-    ts = int(time.time())
-    out = EXPORT_DIR / f"stub_{ts}.mp4"
-    
-    video.write_videofile(str(out), fps=fps, codec="libx264", audio_codec="aac", preset="medium", threads=2, logger=None)
-    video.close()
+    stem = f"stub_{int(time.time())}"
+    outputs = [(p, EXPORT_DIR / output_name(stem, p, i)) for i, p in enumerate(resolve_exports(storyboard))]
+    try:
+        write_clip_exports(frames, durations, music, outputs, fps=fps)
+    finally:
+        if music is not None:
+            music.close()
 
+    out = outputs[0][1]
     return {
         "ok": True,
         "path": str(out),
         "url": f"/exports/{out.name}",
         "filename": out.name,
-        "duration": getattr(video, "duration", None),
-    }
\ No newline at end of file
+        "duration": total,
+        "exports": [{"preset": p.name, "filename": o.name, "url": f"/exports/{o.name}"} for p, o in outputs],
+    }
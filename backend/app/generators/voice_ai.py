@@ -1,27 +1,31 @@
 # backend/app/generators/voice_ai.py
 from __future__ import annotations
 from pathlib import Path
-import time, os
+import os
 from openai import OpenAI
 
+from .tts_cache import cached_speech
+
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 APP_DIR = Path(__file__).resolve().parent
-EXPORT_DIR = APP_DIR.parent / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR.parent / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def tts_generate(text: str, voice: str = "alloy") -> Path:
+TTS_MODEL = "gpt-4o-mini-tts"
 
-    out = EXPORT_DIR / f"vo_{int(time.time() * 1000)}.mp3"
 
-   
-    with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice=voice,
-        input=text
-    ) as resp:
-        resp.stream_to_file(out)
+def tts_generate(text: str, voice: str = "alloy") -> Path:
+
+    def _speech(out: Path) -> None:
+        with client.audio.speech.with_streaming_response.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text
+        ) as resp:
+            resp.stream_to_file(out)
 
-    return out
\ No newline at end of file
+    # identical (model, voice, text) lines skip the API entirely
+    return cached_speech(text, voice, TTS_MODEL, _speech)
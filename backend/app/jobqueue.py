@@ -0,0 +1,266 @@
+# backend/app/jobqueue.py
+"""
+Render job queue on top of models.Job.
+
+Routers call `enqueue()` and return the job id right away; `app.worker`
+claims queued rows with `claim_next()` and runs them in a process pool.
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED on Postgres and an
+exclusive file lock on SQLite (which has no row locks).
+
+Job messages (failures, batch summaries) are "log" rows in the same
+job_events table as progress events. Each job keeps its newest
+REELIXX_JOB_EVENTS_MAX events, and a message is cut to REELIXX_JOB_LOG_MAX_CHARS.
+"""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import Job, JobEvent, JobStatus
+
+# A running job whose heartbeat is older than this is assumed orphaned
+STALE_AFTER_S = int(os.getenv("REELIXX_JOB_STALE_S", "300"))
+MAX_ATTEMPTS = int(os.getenv("REELIXX_JOB_MAX_ATTEMPTS", "3"))
+EVENTS_MAX = int(os.getenv("REELIXX_JOB_EVENTS_MAX", "200"))
+LOG_MAX_CHARS = int(os.getenv("REELIXX_JOB_LOG_MAX_CHARS", "2000"))
+SQLITE_LOCK_PATH = Path(
+    os.getenv("REELIXX_QUEUE_LOCK", str(Path(tempfile.gettempdir()) / "reelixx-jobqueue.lock"))
+)
+
+
+def _utcnow() -> datetime:
+    # naive UTC: SQLite drops tzinfo, so keep both backends comparable
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _is_sqlite(db: Session) -> bool:
+    bind = db.get_bind()
+    return bind.dialect.name == "sqlite"
+
+
+@contextlib.contextmanager
+def _sqlite_claim_lock() -> Iterator[None]:
+    SQLITE_LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(SQLITE_LOCK_PATH, "a+") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def trim_events(db: Session, job_id: int, keep: int = EVENTS_MAX) -> None:
+    """Drop all but the newest `keep` events of a job (caller commits)."""
+    cutoff = db.execute(
+        select(JobEvent.id).where(JobEvent.job_id == job_id).order_by(JobEvent.id.desc()).offset(keep).limit(1)
+    ).scalar()
+    if cutoff is not None:
+        db.execute(delete(JobEvent).where(JobEvent.job_id == job_id, JobEvent.id <= cutoff))
+
+
+def log_event(db: Session, job_id: int, message: str, *, level: str = "info", **data: Any) -> None:
+    """Append a message to the job's event log (caller commits)."""
+    if len(message) > LOG_MAX_CHARS:
+        message = message[: LOG_MAX_CHARS - 1] + "…"
+    db.add(JobEvent(job_id=job_id, stage="log", data={"level": level, "message": message, **data},
+                    created_at=_utcnow()))
+    db.flush()
+    trim_events(db, job_id)
+
+
+def last_message(db: Session, job_id: int) -> Optional[str]:
+    """The job's newest log message (e.g. why it failed), if any."""
+    data = db.execute(
+        select(JobEvent.data).where(JobEvent.job_id == job_id, JobEvent.stage == "log")
+        .order_by(JobEvent.id.desc()).limit(1)
+    ).scalar()
+    return data.get("message") if isinstance(data, dict) else None
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    *,
+    project_id: Optional[int] = None,
+) -> Job:
+    job = Job(
+        project_id=project_id,
+        kind=kind,
+        status=JobStatus.queued,
+        payload=payload,
+        progress=0.0,
+        attempts=0,
+        created_at=_utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def enqueue_many(
+    db: Session,
+    kind: str,
+    payloads: List[Dict[str, Any]],
+    *,
+    project_id: Optional[int] = None,
+) -> List[int]:
+    """
+    Queue one job per payload with a single bulk INSERT, inside the caller's
+    transaction (nothing is committed). Returns job ids in payload order.
+    """
+    if not payloads:
+        return []
+    now = _utcnow()
+    rows = [
+        {"project_id": project_id, "kind": kind, "status": JobStatus.queued, "payload": p,
+         "progress": 0.0, "attempts": 0, "created_at": now}
+        for p in payloads
+    ]
+    # sort_by_parameter_order would fall back to one INSERT per row on SQLite;
+    # ids are assigned in VALUES order, so sorting them restores payload order
+    return sorted(db.scalars(insert(Job).returning(Job.id), rows))
+
+
+def claim_next(db: Session, worker: str) -> Optional[Job]:
+    """
+    Atomically move the oldest queued job to `running` and return it,
+    or None when the queue is empty.
+    """
+    stmt = (
+        select(Job)
+        .where(Job.status == JobStatus.queued)
+        .order_by(Job.id)
+        .limit(1)
+    )
+
+    lock = _sqlite_claim_lock() if _is_sqlite(db) else contextlib.nullcontext()
+    with lock:
+        if not _is_sqlite(db):
+            stmt = stmt.with_for_update(skip_locked=True)
+        job = db.execute(stmt).scalars().first()
+        if job is None:
+            db.rollback()
+            return None
+        job.status = JobStatus.running
+        job.worker = worker
+        job.attempts = (job.attempts or 0) + 1
+        job.heartbeat_at = _utcnow()
+        db.commit()
+    db.refresh(job)
+    return job
+
+
+def heartbeat(db: Session, job_ids: list[int]) -> None:
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.status == JobStatus.running)
+        .values(heartbeat_at=_utcnow())
+    )
+    db.commit()
+
+
+def requeue_stale(db: Session, stale_after_s: int = STALE_AFTER_S) -> int:
+    """
+    Return orphaned `running` jobs (worker crashed, node lost) to the queue,
+    or fail them once they have used up MAX_ATTEMPTS. Returns rows touched.
+    """
+    cutoff = _utcnow() - timedelta(seconds=stale_after_s)
+    stale = (
+        db.execute(
+            select(Job).where(
+                Job.status == JobStatus.running,
+                (Job.heartbeat_at.is_(None)) | (Job.heartbeat_at < cutoff),
+            )
+        )
+        .scalars()
+        .all()
+    )
+    for job in stale:
+        if (job.attempts or 0) >= MAX_ATTEMPTS:
+            job.status = JobStatus.failed
+            log_event(db, job.id, f"gave up after {job.attempts} attempts (worker lost)", level="error")
+        else:
+            job.status = JobStatus.queued
+            job.worker = None
+    db.commit()
+    return len(stale)
+
+
+def set_progress(job_id: int, progress: float) -> None:
+    """Record progress (0..1) from inside a task; uses its own short session."""
+    with SessionLocal() as db:
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(progress=max(0.0, min(1.0, float(progress))), heartbeat_at=_utcnow())
+        )
+        db.commit()
+
+
+def finish(db: Session, job_id: int, *, result: Dict[str, Any] | None = None, error: str | None = None) -> None:
+    job = db.get(Job, job_id)
+    if job is None:
+        return
+    if error is None:
+        job.status = JobStatus.completed
+        job.progress = 1.0
+        job.result_json = result or {}
+    else:
+        job.status = JobStatus.failed
+        log_event(db, job_id, error, level="error")
+    job.heartbeat_at = _utcnow()
+    db.commit()
+
+
+def release(db: Session, job_id: int, reason: str) -> None:
+    """Put a job whose worker process died back in the queue (or fail it)."""
+    job = db.get(Job, job_id)
+    if job is None or job.status != JobStatus.running:
+        return
+    if (job.attempts or 0) >= MAX_ATTEMPTS:
+        job.status = JobStatus.failed
+        log_event(db, job_id, reason, level="error")
+    else:
+        job.status = JobStatus.queued
+        job.worker = None
+    db.commit()
+
+
+def job_response(job: Job) -> Dict[str, Any]:
+    """Shape returned by endpoints that enqueue instead of rendering inline."""
+    return {
+        "ok": True,
+        "job_id": job.id,
+        "status": job.status.value if isinstance(job.status, JobStatus) else job.status,
+        "poll": f"/jobs/{job.id}",
+        "events": f"/jobs/{job.id}/events",
+    }
+
+
+__all__ = [
+    "enqueue",
+    "enqueue_many",
+    "log_event",
+    "last_message",
+    "trim_events",
+    "claim_next",
+    "heartbeat",
+    "requeue_stale",
+    "set_progress",
+    "finish",
+    "release",
+    "job_response",
+]
@@ -7,18 +7,16 @@ from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 
 
-from app.routers import scrape, projects, jobs, staticgen, posttext, assemble, exportpack
+from app.routers import scrape, projects, jobs, staticgen, posttext, assemble, exportpack, exports
 from app.routers.ai_generate import router as ai_router
 from app.routers.ai_pro import router as ai_pro_router
 from app.routers.ai_auto import router as ai_auto_router  
 
-from .db import Base, engine
+from .db import SessionLocal, engine, pool_metrics
 
 app = FastAPI(title="Reelixx API", version="1.0.0", docs_url="/docs", redoc_url=None)
 
@@ -37,49 +35,88 @@ app.add_middleware(
 )
 
 
-Base.metadata.create_all(bind=engine)
-
-
-EXPORT_DIR = Path(__file__).resolve().parent / "exports"
-EXPORT_DIR.mkdir(parents=True, exist_ok=True)
-app.mount("/exports", StaticFiles(directory=str(EXPORT_DIR)), name="exports")
-
-
-@app.get("/exports/download/{filename}")
-def force_download(filename: str):
-    file_path = EXPORT_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Not Found")
-    return FileResponse(
-        path=str(file_path),
-        media_type="application/octet-stream",
-        filename=filename,
-    )
+HEALTH_DB_CHECK_S = float(os.getenv("REELIXX_HEALTH_DB_CHECK_S", "30"))
+_db_check = {"at": float("-inf"), "ok": False, "error": None}
 
 
 @app.get("/health", tags=["meta"])
 def health():
-    """Health check endpoint for load balancer"""
-    try:
-        # Test database connection
-        from .db import engine
-        from sqlalchemy import text
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
-        return {
-            "ok": True,
-            "db": True,
-            "environment": os.getenv("ENVIRONMENT", "development")
-        }
-    except Exception as e:
-        return {
-            "ok": False,
-            "db": False,
-            "error": str(e),
-            "environment": os.getenv("ENVIRONMENT", "development")
-        }
-
+    """
+    Health check endpoint for load balancer. The database is pinged on a
+    pooled connection at most every REELIXX_HEALTH_DB_CHECK_S seconds; probes
+    in between answer from the last result.
+    """
+    import time
+
+    from sqlalchemy import text
+
+    now = time.monotonic()
+    if now - _db_check["at"] >= HEALTH_DB_CHECK_S:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            _db_check.update(ok=True, error=None)
+        except Exception as e:
+            _db_check.update(ok=False, error=str(e))
+        _db_check["at"] = now
+
+    body = {
+        "status": "ok" if _db_check["ok"] else "degraded",
+        "ok": _db_check["ok"],
+        "db": _db_check["ok"],
+        "environment": os.getenv("ENVIRONMENT", "development"),
+    }
+    if _db_check["error"]:
+        body["error"] = _db_check["error"]
+    return body
+
+
+@app.get("/db/stats", tags=["meta"])
+def db_stats():
+    """Connection pool occupancy and checkout wait times (this API process)."""
+    return pool_metrics()
+
+
+@app.get("/cache/stats", tags=["meta"])
+def cache_stats():
+    """Hit/miss counters for the on-disk caches (per API process) and the render index."""
+    from . import export_pack, render_cache
+    from .generators import image_pool, music_bed, segment_render, tts_cache
+    from .utils import scrape_cache
+
+    with SessionLocal() as db:
+        renders = render_cache.stats(db)
+    return {
+        "tts": tts_cache.stats(),
+        "music": music_bed.stats(),
+        "scrape": scrape_cache.stats(),
+        "images": image_pool.stats(),
+        "segments": segment_render.stats(),
+        "renders": renders,
+        "packs": export_pack.stats(),
+    }
+
+
+@app.on_event("startup")
+def start_embedded_worker():
+    """Render queued jobs in-process unless a separate worker service is configured."""
+    from . import worker
+
+    app.state.worker = worker.start_embedded() if worker.EMBEDDED else None
+
+
+@app.on_event("shutdown")
+def stop_embedded_worker():
+    if getattr(app.state, "worker", None) is not None:
+        app.state.worker.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    """Drain the pooled scraping client."""
+    from .utils import fetch
+
+    await fetch.aclose()
 
 
 app.include_router(scrape.router,      prefix="/scrape",          tags=["scrape"])
@@ -89,6 +126,7 @@ app.include_router(staticgen.router,   prefix="/generate_static", tags=["static"
 app.include_router(posttext.router,    prefix="/post_text",       tags=["post_text"])
 app.include_router(assemble.router,    prefix="",                 tags=["assemble"])   
 app.include_router(exportpack.router,  prefix="",                 tags=["export"])    
+app.include_router(exports.router,     prefix="/exports",         tags=["export"])
 app.include_router(ai_router,          prefix="/ai",              tags=["ai"])
 app.include_router(ai_pro_router,      prefix="/ai",              tags=["ai-pro"])     
 app.include_router(ai_auto_router,     prefix="/ai",              tags=["ai-auto"])   
\ No newline at end of file
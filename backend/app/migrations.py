@@ -0,0 +1,191 @@
+# backend/app/migrations.py
+"""
+Schema migrations, run once per deploy before the API/worker processes start:
+
+    cd backend && python -m app.migrations           # apply pending migrations
+    cd backend && python -m app.migrations --check   # exit 1 if any are pending
+
+Applied versions are recorded in `schema_migrations`. Each migration runs in
+its own transaction; on Postgres the whole run holds an advisory lock, so two
+deploys starting at once apply each migration exactly once.
+
+Migration 1 creates whatever tables are missing from the models, so a
+database created by the old import-time create_all() is adopted as-is and
+only picks up the later migrations. Everything after it must be idempotent
+(IF NOT EXISTS / inspector checks): on a fresh database migration 1 already
+builds the tables from the current models. create_all() never alters a table
+that exists, so columns added to existing tables need their own migration
+(see 5, which brings a pre-queue jobs table up to the current model).
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from . import models  # noqa: F401  (registers the tables on Base.metadata)
+from .db import Base, engine as app_engine
+
+# Postgres advisory lock id for the migration run ("reelixx" in ASCII)
+LOCK_ID = 0x7265656C697878
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(128), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _list_indexes(conn: Connection) -> None:
+    # newest-first per-project listings (latest variant, post text, project jobs)
+    # and the worker's "oldest queued job" claim
+    for stmt in (
+        "CREATE INDEX IF NOT EXISTS ix_variants_project_id_id ON variants (project_id, id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_project_id_id ON jobs (project_id, id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_status_id ON jobs (status, id)",
+    ):
+        conn.execute(text(stmt))
+
+
+def _jsonb(conn: Connection) -> None:
+    # JSON columns become JSONB on Postgres (models.JSONType); other backends keep JSON
+    if conn.dialect.name != "postgresql":
+        return
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        current = {c["name"]: c["type"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if isinstance(col.type, JSON) and col.name in current and type(current[col.name]).__name__ != "JSONB":
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ALTER COLUMN "{col.name}" TYPE JSONB USING "{col.name}"::jsonb'
+                ))
+
+
+def _job_logs_to_events(conn: Connection) -> None:
+    # jobs.logs (free text, often a full storyboard dump) -> one capped "log" event per job
+    from .jobqueue import LOG_MAX_CHARS
+
+    columns = {c["name"] for c in inspect(conn).get_columns("jobs")}
+    if "logs" not in columns:
+        return
+    events = models.JobEvent.__table__
+    # pre-queue tables have no created_at yet (migration 5 adds it)
+    created = "created_at" if "created_at" in columns else "NULL"
+    rows = conn.execute(text(f"SELECT id, status, logs, {created} FROM jobs WHERE logs IS NOT NULL")).all()
+    for job_id, status, logs, created_at in rows:
+        message = logs if len(logs) <= LOG_MAX_CHARS else logs[: LOG_MAX_CHARS - 1] + "…"
+        level = "error" if str(status).endswith("failed") else "info"
+        conn.execute(insert(events).values(job_id=job_id, stage="log", created_at=created_at,
+                                           data={"level": level, "message": message}))
+    conn.execute(text("ALTER TABLE jobs DROP COLUMN logs"))
+
+
+def _job_queue_columns(conn: Connection) -> None:
+    # jobs tables from before the queue: add its columns, let project-less (/ai/*) jobs in
+    jobs = models.Job.__table__
+    insp = inspect(conn)
+    current = {c["name"]: c for c in insp.get_columns("jobs")}
+    for col in jobs.columns:
+        if col.name in current:
+            continue
+        conn.execute(text(f'ALTER TABLE jobs ADD COLUMN "{col.name}" {col.type.compile(dialect=conn.dialect)}'))
+        if col.default is not None and col.default.is_scalar:
+            conn.execute(update(jobs).values({col.name: col.default.arg}))
+
+    if current["project_id"]["nullable"]:
+        return
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE jobs ALTER COLUMN project_id DROP NOT NULL"))
+        return
+    # SQLite cannot drop NOT NULL in place: rebuild the table from the model, copy the
+    # rows, then put the model's indexes back under their usual names
+    for ix in insp.get_indexes("jobs"):
+        conn.execute(text(f'DROP INDEX "{ix["name"]}"'))
+    scratch = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(scratch)
+    jobs.to_metadata(scratch, name="jobs_new").create(bind=conn)
+    names = ", ".join(f'"{c.name}"' for c in jobs.columns)
+    conn.execute(text(f"INSERT INTO jobs_new ({names}) SELECT {names} FROM jobs"))
+    conn.execute(text("DROP TABLE jobs"))
+    conn.execute(text("ALTER TABLE jobs_new RENAME TO jobs"))
+    for ix in inspect(conn).get_indexes("jobs"):
+        conn.execute(text(f'DROP INDEX "{ix["name"]}"'))
+    for ix in jobs.indexes:
+        ix.create(bind=conn)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _create_tables),
+    (2, "project / queue listing indexes", _list_indexes),
+    (3, "JSONB columns on Postgres", _jsonb),
+    (4, "job logs to the job event log", _job_logs_to_events),
+    (5, "queue columns on pre-queue jobs tables", _job_queue_columns),
+]
+
+
+def applied_versions(conn: Connection) -> set:
+    schema_migrations.create(bind=conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending(eng: Engine | None = None) -> List[Tuple[int, str]]:
+    with (eng or app_engine).begin() as conn:
+        done = applied_versions(conn)
+    return [(v, name) for v, name, _ in MIGRATIONS if v not in done]
+
+
+def migrate(eng: Engine | None = None) -> List[Tuple[int, str]]:
+    """Apply every pending migration in order; returns the (version, name) pairs applied."""
+    eng = eng or app_engine
+    applied = []
+    with eng.connect() as lock_conn:
+        if eng.dialect.name == "postgresql":
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": LOCK_ID})
+            lock_conn.commit()
+        try:
+            for version, name, apply in MIGRATIONS:
+                with eng.begin() as conn:
+                    if version in applied_versions(conn):
+                        continue
+                    apply(conn)
+                    conn.execute(schema_migrations.insert().values(
+                        version=version, name=name,
+                        applied_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                    ))
+                applied.append((version, name))
+        finally:
+            if eng.dialect.name == "postgresql":
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": LOCK_ID})
+                lock_conn.commit()
+    return applied
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--check", action="store_true", help="only report pending migrations")
+    args = ap.parse_args()
+
+    if args.check:
+        todo = pending()
+        for version, name in todo:
+            print(f"pending  {version:4d}  {name}")
+        sys.exit(1 if todo else 0)
+    for version, name in migrate():
+        print(f"applied  {version:4d}  {name}")
+    print("schema up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,17 @@ from __future__ import annotations
 from sqlalchemy import JSON
 
 import enum
-from sqlalchemy import JSON, Column, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from .db import Base
 
+# JSONB on Postgres (binary, no re-parse on read), plain JSON text elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class JobStatus(str, enum.Enum):
     queued = "queued"
@@ -24,14 +28,16 @@ class Project(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     title = Column(String(255), nullable=True)
     product_url = Column(Text, nullable=True)
-    brief_json = Column(JSON, nullable=True)
-    brand_json = Column(JSON, nullable=True)
+    brief_json = Column(JSONType, nullable=True)
+    brand_json = Column(JSONType, nullable=True)
 
     variants = relationship("Variant", back_populates="project")
 
 
 class Variant(Base):
     __tablename__ = "variants"
+    # latest-variant / post-text lookups: newest first within a project (see app/migrations.py)
+    __table_args__ = (Index("ix_variants_project_id_id", "project_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -45,18 +51,76 @@ class Variant(Base):
 
     project = relationship("Project", back_populates="variants")
 
-    script_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
-    storyboard_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # full script / storyboard: only loaded on access or with undefer_group("json")
+    script_json: Mapped[dict | None] = mapped_column(JSONType, nullable=True, deferred=True, deferred_group="json")
+    storyboard_json: Mapped[dict | None] = mapped_column(JSONType, nullable=True, deferred=True,
+                                                         deferred_group="json")
 
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_project_id_id", "project_id", "id"),
+        # claim_next: oldest queued job
+        Index("ix_jobs_status_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    # render jobs from /ai/* have no project
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     kind = Column(String(64), nullable=False)
     status = Column(Enum(JobStatus), default=JobStatus.queued, nullable=False)
-    logs = Column(Text, nullable=True)
+
+    # queue bookkeeping (see app/jobqueue.py); messages go to the capped job_events log
+    payload = mapped_column(JSONType, nullable=True, deferred=True, deferred_group="json")
+    result_json = mapped_column(JSONType, nullable=True, deferred=True, deferred_group="json")
+    progress = Column(Float, default=0.0)
+    attempts = Column(Integer, default=0)
+    worker = Column(String(128), nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+
+class JobEvent(Base):
+    """Structured progress event of a running job (see app/progress.py)."""
+
+    __tablename__ = "job_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    stage = Column(String(32), nullable=False)
+    progress = Column(Float, nullable=True)
+    data = Column(JSONType, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+
+
+class RenderCache(Base):
+    """One rendered MP4 per canonical render key (see app/render_cache.py)."""
+
+    __tablename__ = "render_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(64), unique=True, index=True, nullable=False)
+    filename = Column(String(255), nullable=False)
+    url = Column(Text, nullable=False)
+    s3_key = Column(Text, nullable=True)
+    renderer = Column(String(32), nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    result_json = Column(JSONType, nullable=True)
+    # Variants currently showing this output; cleanup only removes refcount == 0
+    refcount = Column(Integer, default=0, nullable=False)
+    hits = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    last_used_at = Column(DateTime, nullable=True)
+
+
+class RenderLink(Base):
+    """Which cached render a Variant's mp4_url points at (drives RenderCache.refcount)."""
+
+    __tablename__ = "render_links"
+
+    variant_id = Column(Integer, ForeignKey("variants.id"), primary_key=True)
+    cache_key = Column(String(64), ForeignKey("render_cache.key"), nullable=False, index=True)
 
 
 class User(Base):
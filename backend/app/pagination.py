@@ -0,0 +1,42 @@
+# backend/app/pagination.py
+"""
+Keyset pagination for the list endpoints.
+
+Pages run newest first on the primary key: `before` is the last id of the
+previous page (its `next_before`), so every page is one index range scan
+(see the (project_id, id) / (status, id) indexes in app/migrations.py)
+however deep the client pages. Only the summary schema's columns are
+selected, so script/storyboard/payload JSON is never read.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = int(os.getenv("REELIXX_PAGE_MAX", "200"))
+
+
+def keyset_page(
+    db: Session,
+    schema: Type[BaseModel],
+    id_col: InstrumentedAttribute,
+    *where: Any,
+    limit: int = DEFAULT_LIMIT,
+    before: Optional[int] = None,
+) -> Dict[str, Any]:
+    """{"items": [...], "next_before": id | None} with the columns named by `schema`."""
+    model = id_col.class_
+    stmt = select(*(getattr(model, name) for name in schema.model_fields)).where(*where)
+    if before is not None:
+        stmt = stmt.where(id_col < before)
+    rows = db.execute(stmt.order_by(id_col.desc()).limit(limit + 1)).mappings().all()
+    items = [dict(r) for r in rows[:limit]]
+    return {"items": items, "next_before": items[-1]["id"] if len(rows) > limit else None}
+
+
+__all__ = ["DEFAULT_LIMIT", "MAX_LIMIT", "keyset_page"]
@@ -0,0 +1,175 @@
+# backend/app/progress.py
+"""
+Structured render progress.
+
+Renderers report through a Progress object, which turns (stage, percent of
+that stage, scene index) into an event with overall progress and an ETA:
+
+    {"stage": "encode", "scene": 2, "scenes": 5, "percent": 40.0,
+     "progress": 0.62, "eta_s": 7.5, "elapsed_s": 12.3}
+
+Stages are tts / images (the concurrent asset stage), mix, encode and upload.
+Encode percent and ETA come from the encoder's own counters (ffmpeg
+`-progress`, MoviePy's frame logger), never from a guess.
+
+In the worker, JobProgress persists a job's events: Job.progress / heartbeat
+plus a job_events row, at most once per REELIXX_PROGRESS_INTERVAL_S (stage
+changes and stage completions always go through), within the per-job event
+cap (see jobqueue.trim_events). /jobs/{id}/events streams
+those rows as Server-Sent Events.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import update
+
+from .db import SessionLocal
+from .jobqueue import trim_events
+from .models import Job, JobEvent
+
+INTERVAL_S = float(os.getenv("REELIXX_PROGRESS_INTERVAL_S", "1.0"))
+
+# share of the whole render each stage stands for
+WEIGHTS = {"assets": 0.35, "mix": 0.05, "encode": 0.55, "upload": 0.05}
+STAGE_GROUP = {"tts": "assets", "images": "assets", "mix": "mix", "encode": "encode", "upload": "upload"}
+
+Emit = Callable[[Dict[str, Any]], None]
+
+
+def _utcnow() -> datetime:
+    # naive UTC, like jobqueue
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Progress:
+    """Builds progress events for one render and hands them to `emit` (None: no-op)."""
+
+    def __init__(self, emit: Optional[Emit], *, scenes: int = 0):
+        self.emit = emit
+        self.scenes = scenes
+        self.t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self._assets_done = 0
+        self._assets_total = 0
+
+    def _overall(self, group: str, percent: float) -> float:
+        done = 0.0
+        for name, weight in WEIGHTS.items():
+            if name == group:
+                return min(1.0, done + weight * max(0.0, min(100.0, percent)) / 100.0)
+            done += weight
+        return done
+
+    def __call__(
+        self,
+        stage: str,
+        percent: float,
+        *,
+        scene: Optional[int] = None,
+        eta_s: Optional[float] = None,
+        **extra: Any,
+    ) -> None:
+        if self.emit is None:
+            return
+        overall = self._overall(STAGE_GROUP.get(stage, stage), percent)
+        elapsed = time.monotonic() - self.t0
+        if eta_s is None and stage != "encode" and overall > 0:
+            # encode ETAs only ever come from the encoder itself
+            eta_s = elapsed / overall - elapsed
+        event = {
+            "stage": stage,
+            "scene": scene,
+            "scenes": self.scenes,
+            "percent": round(float(percent), 1),
+            "progress": round(overall, 4),
+            "eta_s": round(eta_s, 1) if eta_s is not None else None,
+            "elapsed_s": round(elapsed, 1),
+            **extra,
+        }
+        try:
+            self.emit(event)
+        except Exception:
+            pass  # progress must never fail a render
+
+    def assets(self, total: int) -> Callable[[str, int], None]:
+        """Callback for asset_stage: one call per finished TTS line / image."""
+        with self._lock:
+            self._assets_done, self._assets_total = 0, max(1, total)
+
+        def done(kind: str, index: int) -> None:
+            with self._lock:
+                self._assets_done += 1
+                pct = 100.0 * self._assets_done / self._assets_total
+            self(kind, pct, scene=index)
+
+        return done
+
+    def encoder(self, stage: str = "encode") -> Callable[[float, Optional[float], Optional[int]], None]:
+        """Callback for the encoders: (percent, eta_s from the encoder, scene or None)."""
+
+        def report(percent: float, eta_s: Optional[float], scene: Optional[int] = None) -> None:
+            self(stage, percent, scene=scene, eta_s=eta_s)
+
+        return report
+
+
+class JobProgress:
+    """
+    Report callback for worker tasks: accepts the legacy float (0..1) or a
+    Progress event and persists it, throttled to one write per `interval_s`.
+    """
+
+    def __init__(self, job_id: int, interval_s: float = INTERVAL_S):
+        self.job_id = job_id
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._last_stage: Optional[str] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._progress = 0.0
+
+    def __call__(self, event: Any) -> None:
+        if not isinstance(event, dict):
+            event = {"stage": "job", "progress": max(0.0, min(1.0, float(event)))}
+        now = time.monotonic()
+        with self._lock:
+            stage = STAGE_GROUP.get(event.get("stage"), event.get("stage"))
+            urgent = stage != self._last_stage or event.get("percent") == 100.0
+            if not urgent and now - self._last_write < self.interval_s:
+                self._pending = event
+                return
+            self._pending = None
+            self._last_write = now
+            self._last_stage = stage
+            # overall progress never goes backwards, even if stages report out of order
+            self._progress = max(self._progress, float(event.get("progress") or 0.0))
+            progress = self._progress
+        self._write(event, progress)
+
+    def flush(self) -> None:
+        with self._lock:
+            event, self._pending = self._pending, None
+            progress = self._progress = max(self._progress, float((event or {}).get("progress") or 0.0))
+        if event is not None:
+            self._write(event, progress)
+
+    def _write(self, event: Dict[str, Any], progress: float) -> None:
+        try:
+            with SessionLocal() as db:
+                now = _utcnow()
+                db.add(JobEvent(job_id=self.job_id, stage=str(event.get("stage")), progress=progress,
+                                data=event, created_at=now))
+                db.execute(update(Job).where(Job.id == self.job_id).values(progress=progress, heartbeat_at=now))
+                db.flush()
+                trim_events(db, self.job_id)
+                db.commit()
+        except Exception:
+            pass  # best-effort, like the cache counters: never fail a render over it
+
+
+__all__ = ["Progress", "JobProgress", "WEIGHTS", "INTERVAL_S"]
@@ -0,0 +1,265 @@
+# backend/app/render_cache.py
+"""
+Storyboard-level render cache.
+
+A render is keyed by a canonical hash of everything that changes the output:
+storyboard JSON, caption, brand color, music mood, voice, renderer, the
+content of the scene images, whether paid APIs are in play, and
+RENDER_VERSION (bump it whenever the generators change what they encode).
+A hit hands back the MP4 that is already in local exports or on S3 (through
+StorageManager) without any TTS, image or encode work.
+
+The index lives in the DB (models.RenderCache). Variants that show a cached
+output are linked through models.RenderLink, which keeps
+RenderCache.refcount; cleanup() only ever deletes outputs nobody links to.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import RenderCache, RenderLink
+from .storage import storage
+
+RENDER_VERSION = "1"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(Path(__file__).resolve().parent / "exports")))
+MAX_AGE_HOURS = int(os.getenv("REELIXX_RENDER_CACHE_MAX_AGE_H", str(7 * 24)))
+ENABLED = os.getenv("REELIXX_RENDER_CACHE", "1") == "1"
+
+
+def _utcnow() -> datetime:
+    # naive UTC, like jobqueue: SQLite drops tzinfo
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _canonical(obj: Any) -> Any:
+    """Normalize JSON-ish values so equal storyboards hash equally (2 == 2.0, NFC text)."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, bool) or obj is None or isinstance(obj, int):
+        return obj
+    if isinstance(obj, float):
+        return int(obj) if obj.is_integer() else round(obj, 6)
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, str):
+        return unicodedata.normalize("NFC", obj)
+    return str(obj)
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def paid_mode() -> bool:
+    """Same switch as the generators: free mode renders silence and local slides."""
+    return os.getenv("REELIXX_FREE_MODE", "0") != "1" and bool(os.getenv("OPENAI_API_KEY"))
+
+
+def render_key(
+    *,
+    storyboard: Dict[str, Any],
+    caption: Any,
+    brand_color: Optional[str],
+    music_mood: Optional[str],
+    voice: Optional[str],
+    renderer: Optional[str],
+    images: Iterable[Path] = (),
+    local_only: bool = False,
+) -> str:
+    doc = {
+        "v": RENDER_VERSION,
+        "storyboard": storyboard,
+        "caption": caption,
+        "brand_color": (brand_color or "").strip().lower(),
+        "music_mood": (music_mood or "").strip().lower(),
+        "voice": (voice or "").strip().lower(),
+        "renderer": (renderer or os.getenv("REELIXX_RENDERER", "moviepy")).strip().lower(),
+        "images": [_file_digest(Path(p)) for p in images if Path(p).is_file()],
+        "paid": paid_mode() and not local_only,
+    }
+    blob = json.dumps(_canonical(doc), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _available(row: RenderCache) -> bool:
+    if row.s3_key:
+        return storage.use_s3
+    return (EXPORT_DIR / row.filename).is_file()
+
+
+def peek(db: Session, key: str) -> bool:
+    """Whether `key` would be a hit (no hit accounting)."""
+    row = db.execute(select(RenderCache).where(RenderCache.key == key)).scalars().first()
+    return ENABLED and row is not None and _available(row)
+
+
+def lookup(db: Session, key: str) -> Optional[Dict[str, Any]]:
+    """Stored result for `key` (with cache_hit=True) if its MP4 still exists."""
+    row = db.execute(select(RenderCache).where(RenderCache.key == key)).scalars().first()
+    if row is None or not _available(row):
+        return None
+    row.hits = (row.hits or 0) + 1
+    row.last_used_at = _utcnow()
+    db.commit()
+    return {**(row.result_json or {}), "url": row.url, "filename": row.filename, "cache_hit": True, "render_key": key}
+
+
+def store(db: Session, key: str, result: Dict[str, Any]) -> None:
+    """Index a fresh render (replaces a stale row for the same key, keeping its refcount)."""
+    filename = result.get("filename") or Path(result.get("url") or "").name
+    url = result.get("url") or f"/exports/{filename}"
+    local = EXPORT_DIR / filename
+    fields = {
+        "filename": filename,
+        "url": url,
+        "s3_key": f"videos/{filename}" if url.startswith("https://") else None,
+        "renderer": result.get("renderer"),
+        "size_bytes": local.stat().st_size if local.is_file() else None,
+        "result_json": {k: v for k, v in result.items() if k not in ("cache_hit", "render_key")},
+        "last_used_at": _utcnow(),
+    }
+    for _ in range(2):
+        row = db.execute(select(RenderCache).where(RenderCache.key == key)).scalars().first()
+        if row is None:
+            db.add(RenderCache(key=key, refcount=0, hits=0, created_at=_utcnow(), **fields))
+        else:
+            for k, v in fields.items():
+                setattr(row, k, v)
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()  # a concurrent identical render indexed it first; update that row
+
+
+def link_variant(db: Session, variant_id: int, key: str) -> None:
+    """Point a Variant at a cached render, moving its reference from any previous one."""
+    link = db.get(RenderLink, variant_id)
+    if link is not None and link.cache_key == key:
+        return
+    if link is not None:
+        old = db.execute(select(RenderCache).where(RenderCache.key == link.cache_key)).scalars().first()
+        if old is not None:
+            old.refcount = max(0, (old.refcount or 0) - 1)
+    row = db.execute(select(RenderCache).where(RenderCache.key == key)).scalars().first()
+    if row is None:
+        # not indexed (cache disabled): the variant holds no reference
+        if link is not None:
+            db.delete(link)
+        db.commit()
+        return
+    if link is not None:
+        link.cache_key = key
+    else:
+        db.add(RenderLink(variant_id=variant_id, cache_key=key))
+    row.refcount = (row.refcount or 0) + 1
+    db.commit()
+
+
+def get_or_render(key: str, render: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Cached result for `key`, or run render() and index what it produced."""
+    if ENABLED:
+        with SessionLocal() as db:
+            hit = lookup(db, key)
+        if hit is not None:
+            return hit
+    result = dict(render())
+    if ENABLED:
+        with SessionLocal() as db:
+            store(db, key, result)
+    result.update(cache_hit=False, render_key=key)
+    return result
+
+
+def linked_scenes(db: Session, variant_id: int, mp4_url: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Scene start/duration of the render a Variant links to, as timed in the MP4
+    ({"index", "start", "duration"} per scene); None when unknown.
+    """
+    row = db.execute(
+        select(RenderCache.url, RenderCache.result_json)
+        .join(RenderLink, RenderLink.cache_key == RenderCache.key)
+        .where(RenderLink.variant_id == variant_id)
+    ).first()
+    if row is None or row.url != mp4_url:
+        return None
+    return (row.result_json or {}).get("scenes") or None
+
+
+def _files(row: RenderCache) -> Set[str]:
+    """The primary MP4 plus any further export profiles rendered with it."""
+    extra = [e.get("filename") for e in (row.result_json or {}).get("exports") or [] if isinstance(e, dict)]
+    return {row.filename, *filter(None, extra)}
+
+
+def protected_s3_keys(db: Session) -> Set[str]:
+    """S3 objects that storage-level cleanup must keep (still linked to a Variant)."""
+    rows = db.execute(select(RenderCache).where(RenderCache.refcount > 0, RenderCache.s3_key.is_not(None)))
+    return {f"videos/{name}" for row in rows.scalars() for name in _files(row)}
+
+
+def cleanup(db: Session, max_age_hours: int = MAX_AGE_HOURS) -> List[str]:
+    """
+    Delete cached renders that no Variant references and that have not been
+    used for `max_age_hours`. Returns the removed keys.
+    """
+    cutoff = _utcnow() - timedelta(hours=max_age_hours)
+    rows = (
+        db.execute(
+            select(RenderCache).where(
+                RenderCache.refcount <= 0,
+                (RenderCache.last_used_at.is_(None)) | (RenderCache.last_used_at < cutoff),
+            )
+        )
+        .scalars()
+        .all()
+    )
+    # a batch plan can index one shared output under several keys: keep files another row still needs
+    in_use: Set[str] = set()
+    for row in db.execute(select(RenderCache).where(RenderCache.refcount > 0)).scalars():
+        in_use |= _files(row)
+    removed: List[str] = []
+    for row in rows:
+        for name in _files(row) - in_use:
+            if row.s3_key:
+                storage.delete_file(f"videos/{name}")
+            (EXPORT_DIR / name).unlink(missing_ok=True)
+        removed.append(row.key)
+        db.delete(row)
+    db.commit()
+    return removed
+
+
+def stats(db: Session) -> Dict[str, Any]:
+    entries, referenced, hits, size = db.execute(
+        select(
+            func.count(RenderCache.id),
+            func.count(RenderCache.id).filter(RenderCache.refcount > 0),
+            func.coalesce(func.sum(RenderCache.hits), 0),
+            func.coalesce(func.sum(RenderCache.size_bytes), 0),
+        )
+    ).one()
+    return {"entries": entries, "referenced": referenced, "hits": int(hits), "bytes": int(size)}
+
+
+__all__ = [
+    "RENDER_VERSION", "render_key", "peek", "lookup", "store", "link_variant", "get_or_render",
+    "linked_scenes", "protected_s3_keys", "cleanup", "stats",
+]
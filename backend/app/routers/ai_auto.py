@@ -2,28 +2,39 @@
 from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Request
 from typing import Dict, Any
-import requests, re, random, time
-from bs4 import BeautifulSoup
+import os, re, random, time, uuid
 from pathlib import Path
 
+from ..utils import html_extract
+from ..utils.scrape_cache import cached_parse
+
 router = APIRouter()
 
-EXPORT_DIR = Path(__file__).resolve().parents[1] / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(Path(__file__).resolve().parents[1] / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-def scrape_product_data(url: str) -> Dict[str, Any]:
+def _title_and_desc(doc: html_extract.Document):
+    desc_tag = next((m for m in doc.metas() if m[1] == "description"), None)
+    return doc.title(), desc_tag
+
+
+def _parse_product(html: bytes, url: str, encoding: str | None = None) -> Dict[str, Any]:
+    # everything needed lives in <head>; only parse the rest when it doesn't
+    head = html_extract.head_document(html, encoding)
+    title, desc_tag = _title_and_desc(head) if head is not None else (None, None)
+    if title is None or desc_tag is None:
+        title, desc_tag = _title_and_desc(html_extract.parse(html, encoding))
+    title = title.strip() if title is not None else "Untitled Product"
+    desc = (
+        desc_tag[2].strip()
+        if desc_tag and desc_tag[2]
+        else "A great product with amazing quality and design."
+    )
+    return {"title": title, "description": desc}
+
+async def scrape_product_data(url: str, *, force_refresh: bool = False) -> Dict[str, Any]:
     try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        title = soup.title.text.strip() if soup.title else "Untitled Product"
-        desc_tag = soup.find("meta", {"name": "description"})
-        desc = (
-            desc_tag["content"].strip()
-            if desc_tag and desc_tag.get("content")
-            else "A great product with amazing quality and design."
-        )
-        return {"title": title, "description": desc}
+        return await cached_parse(url, "product", _parse_product, force_refresh=force_refresh)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"scrape_failed: {e}")
 
@@ -71,20 +82,20 @@ def offline_caption(brief: Dict[str, Any]) -> str:
 
 
 @router.post("/ai/auto")
-def auto_generate(request: Request, data: Dict[str, str]):
+async def auto_generate(request: Request, data: Dict[str, Any], force_refresh: bool = False):
     try:
         url = data.get("url")
         if not url:
             raise HTTPException(status_code=400, detail="Missing URL")
 
-        scraped = scrape_product_data(url)
+        scraped = await scrape_product_data(url, force_refresh=force_refresh or bool(data.get("force_refresh")))
         text = f"{scraped['title']} — {scraped['description']}"
         brief = offline_brief(text)
         storyboard = offline_storyboard(brief)
         caption = offline_caption(brief)
 
         
-        filename = f"auto_ad_{int(time.time()*1000)}.mp4"
+        filename = f"auto_ad_{int(time.time()*1000)}_{uuid.uuid4().hex[:6]}.mp4"
         out_path = EXPORT_DIR / filename
         out_path.write_text("FAKE_VIDEO_PLACEHOLDER")
 
@@ -1,5 +1,6 @@
 # backend/app/routers/ai_generate.py
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body
+from sqlalchemy.orm import Session
 from typing import Any, Dict, List
 import math, os
 from dotenv import load_dotenv
@@ -7,7 +8,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from app.generators.video_ai import generate_ai_ad  
+from app import tasks
+from app.db import get_db
+from app.generators.preview import preview_format
+from app.jobqueue import enqueue, job_response
 
 router = APIRouter()
 
@@ -53,10 +57,15 @@ def _mk_caption(product_title: str) -> Dict[str, Any]:
 
 
 @router.post("/ai/generate")
-def ai_generate(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
-    
+def ai_generate(payload: Dict[str, Any] = Body(...), db: Session = Depends(get_db)) -> Dict[str, Any]:
+    try:
+        preview = preview_format(payload.get("preview"))  # "mp4" | "webp" | "sprite"
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        if not os.getenv("OPENAI_API_KEY"):
+        # previews are local-only, so they work without a key
+        if not preview and not os.getenv("OPENAI_API_KEY"):
             raise HTTPException(
                 status_code=400,
                 detail="Missing OPENAI_API_KEY. Add it to backend/.env and restart the server."
@@ -66,6 +75,7 @@ def ai_generate(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
         description   = (payload.get("description") or "").strip()
         brand_color   = (payload.get("brand_color") or "#111111").strip()
         duration_sec  = int(payload.get("duration_sec") or 15)
+        renderer      = payload.get("renderer")  # "moviepy" | "ffmpeg" | "segments"
 
         storyboard = payload.get("storyboard")
         if not storyboard or not storyboard.get("scenes"):
@@ -73,14 +83,25 @@ def ai_generate(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
 
         caption = payload.get("caption") or _mk_caption(product_title)
 
-        video_info = generate_ai_ad(storyboard, caption, brand_color=brand_color)
-
-        return {
-            "ok": True,
+        job_payload = {
             "storyboard": storyboard,
             "caption": caption,
-            "video": video_info, 
+            "brand_color": brand_color,
+            "renderer": renderer,
+            "local_only": payload.get("local_only"),
         }
 
+        # drafts are cheap: always rendered inline, never queued or cached
+        if preview:
+            result = tasks.preview({**job_payload, "preview": preview}, lambda _p: None)
+            return {"ok": True, "storyboard": storyboard, "caption": caption, "video": result}
+
+        # "wait": true keeps the old synchronous behaviour; cached renders return inline
+        if payload.get("wait") or tasks.is_cached("ai-generate", job_payload):
+            return tasks.ai_generate(job_payload, lambda _p: None)
+
+        job = enqueue(db, "ai-generate", job_payload)
+        return {**job_response(job), "storyboard": storyboard, "caption": caption}
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"render_failed: {e}")
\ No newline at end of file
@@ -1,10 +1,14 @@
 # backend/app/routers/ai_pro.py
 from __future__ import annotations
 from typing import Any, Dict
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy.orm import Session
 
+from app import tasks
+from app.db import get_db
+from app.generators.preview import preview_format
 from app.generators.script_ai import generate_script_storyboard
-from app.generators.video_ai_pro import generate_ai_video
+from app.jobqueue import enqueue, job_response
 
 router = APIRouter()
 
@@ -22,26 +26,35 @@ def ai_script(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
     return {"ok": True, "storyboard": storyboard}
 
 @router.post("/ai/generate_pro")
-def ai_generate_pro(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+def ai_generate_pro(payload: Dict[str, Any] = Body(...), db: Session = Depends(get_db)) -> Dict[str, Any]:
     try:
-        title = (payload.get("title") or "").strip()
-        description = (payload.get("description") or "").strip()
-        tone = (payload.get("tone") or "neutral").strip()
-        duration_sec = int(payload.get("duration_sec") or 15)
-        voice = (payload.get("voice") or "alloy").strip()
-        music_mood = (payload.get("music_mood") or "upbeat").strip()
+        preview = preview_format(payload.get("preview"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if preview:
+        # scripting a storyboard is a paid LLM call, which a draft must not make
+        if not (payload.get("storyboard") or {}).get("scenes"):
+            raise HTTPException(status_code=400, detail="preview needs a storyboard with scenes")
+        return tasks.preview({"storyboard": payload["storyboard"], "preview": preview}, lambda _p: None)
 
-        storyboard = payload.get("storyboard")
-        if not storyboard:
-            storyboard = generate_script_storyboard(
-                title=title, description=description, tone=tone, duration_sec=duration_sec
-            )
-
-        video_info = generate_ai_video(
-            storyboard, voice=voice, music_mood=music_mood
-        )
-
-        return {"ok": True, "video": video_info, "storyboard": storyboard}
+    try:
+        job_payload = {
+            "title": (payload.get("title") or "").strip(),
+            "description": (payload.get("description") or "").strip(),
+            "tone": (payload.get("tone") or "neutral").strip(),
+            "duration_sec": int(payload.get("duration_sec") or 15),
+            "voice": (payload.get("voice") or "alloy").strip(),
+            "music_mood": (payload.get("music_mood") or "upbeat").strip(),
+            # scripted by the worker when missing
+            "storyboard": payload.get("storyboard"),
+            "local_only": payload.get("local_only"),
+        }
+
+        if payload.get("wait"):
+            return tasks.ai_generate_pro(job_payload, lambda _p: None)
+
+        job = enqueue(db, "ai-generate-pro", job_payload)
+        return job_response(job)
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"generate_pro_failed: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"generate_pro_failed: {e}")
@@ -1,14 +1,15 @@
 # backend/app/routers/assemble.py
 from __future__ import annotations
-from pathlib import Path
-from typing import Any
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from .. import models
-from ..generators.video_ai import generate_ai_ad
+from .. import models, tasks
+from ..generators.preview import preview_format
+from ..generators.script_template import script_caption
+from ..jobqueue import enqueue, job_response
 
 router = APIRouter()
 
@@ -21,20 +22,17 @@ def _brand_color(project: models.Project) -> str | None:
     return None
 
 def _script_caption(v: models.Variant) -> str:
-
-    s = v.script_json or {}
-    if isinstance(s, dict) and isinstance(s.get("beats"), list):
-        try:
-            return " ".join(
-                (b.get("vo") or b.get("text") or "").strip()
-                for b in s["beats"]
-            ).strip() or " "
-        except Exception:
-            pass
-    return " "
+    return script_caption(v.script_json)
 
 @router.post("/variants/{variant_id}/assemble")
-def assemble_variant(variant_id: int, db: Session = Depends(get_db)):
+def assemble_variant(
+    variant_id: int,
+    renderer: Optional[str] = Query(None, description="moviepy | ffmpeg | segments"),
+    wait: bool = Query(False, description="render inline instead of queueing a job"),
+    local_only: Optional[bool] = Query(None, description="never call a paid image API"),
+    preview: Optional[str] = Query(None, description="quick local draft instead: mp4 | webp | sprite"),
+    db: Session = Depends(get_db),
+):
     v = db.get(models.Variant, variant_id)
     if not v:
         raise HTTPException(status_code=404, detail="Variant not found")
@@ -52,36 +50,32 @@ def assemble_variant(variant_id: int, db: Session = Depends(get_db)):
 
     color = _brand_color(project) or "#111111"
     caption = _script_caption(v)
+    payload = {
+        "variant_id": v.id,
+        "caption": caption,
+        "brand_color": color,
+        "renderer": renderer,
+        "local_only": local_only,
+    }
+
+    if preview:
+        # drafts render inline and leave the variant's mp4_url alone
+        try:
+            fmt = preview_format(preview)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            return tasks.preview({**payload, "preview": fmt}, lambda _p: None)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Preview failed: {e}")
 
-    try:
-        result: dict[str, Any] = generate_ai_ad(
-            storyboard=sb,
-            caption=caption,
-            brand_color=color,
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI assemble failed: {e}")
-
-    filename = (result or {}).get("filename")
-    url = (result or {}).get("url")
-
-    if not (filename or url):
-        raise HTTPException(status_code=500, detail="AI generator returned no filename/url")
-
-    if not url and filename:
-        url = f"/exports/{filename}"
-
-
-    if filename:
-        download = f"/exports/download/{filename}"
-    else:
-        name = Path(url).name
-        download = f"/exports/download/{name}" if name else url
+    # Legacy inline render for clients that can't poll /jobs yet; a cached
+    # render is answered inline too (nothing to encode, nothing to queue)
+    if wait or tasks.is_cached("assemble-variant", payload):
+        try:
+            return tasks.assemble_variant(payload, lambda _p: None)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"AI assemble failed: {e}")
 
-    return {
-        "ok": True,
-        "ai": True,
-        "mp4_url": url,
-        "download": download,
-        "filename": filename,
-    }
\ No newline at end of file
+    job = enqueue(db, "assemble-variant", payload, project_id=project.id)
+    return job_response(job)
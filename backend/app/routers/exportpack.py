@@ -1,69 +1,52 @@
 # backend/app/routers/exportpack.py
 from __future__ import annotations
 
-import io
-import json
-import zipfile
-from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
-from ..models import Variant  
+from .. import export_pack, render_cache
+from ..db import get_db
+from ..models import Project, Variant
 
 router = APIRouter()
 
 
-EXPORT_DIR = Path(__file__).resolve().parents[1] / "exports"
-EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+def _pack_inputs(db: Session, variant_id: int):
+    v: Variant | None = db.get(Variant, variant_id)
+    if not v:
+        raise HTTPException(status_code=404, detail="Variant not found")
+    video = export_pack.variant_video(v)
+    if video is None:
+        raise HTTPException(status_code=404, detail="MP4 not found. Assemble the variant first.")
+    project = db.get(Project, v.project_id)
+    scenes = render_cache.linked_scenes(db, v.id, v.mp4_url)
+    packed = export_pack.pack_entries(v, project, video, scenes)
+    # the pack is written (or streamed) from plain values; hand the connection back first
+    db.close()
+    return packed
 
 
 @router.post("/variants/{variant_id}/export_zip")
-def export_zip(variant_id: int):
-    
-    db = SessionLocal()
-    try:
-        v: Variant | None = db.query(Variant).filter(Variant.id == variant_id).first()
-        if not v:
-            raise HTTPException(status_code=404, detail="Variant not found")
-
-        mp4_name = f"variant_{variant_id}.mp4"
-        mp4_path = EXPORT_DIR / mp4_name
-        if not mp4_path.exists():
-    
-            raise HTTPException(status_code=404, detail="MP4 not found. Assemble the variant first.")
-
-        zip_name = f"variant_{variant_id}.zip"
-        zip_path = EXPORT_DIR / zip_name
-
-        
-        mem = io.BytesIO()
-        with zipfile.ZipFile(mem, mode="w", compression=zipfile.ZIP_DEFLATED) as z:
-            
-            z.write(mp4_path, arcname=mp4_name)
-
-          
-            storyboard = v.storyboard_json or {}
-            z.writestr("storyboard.json", json.dumps(storyboard, ensure_ascii=False, indent=2))
-
-            
-            script = getattr(v, "script_json", None) or {}
-            z.writestr("script.json", json.dumps(script, ensure_ascii=False, indent=2))
-
-        mem.seek(0)
-        with open(zip_path, "wb") as f:
-            f.write(mem.read())
-
-      
-        return {"download": f"/exports/{zip_name}"}
-
-    finally:
-        db.close()
-
-
-@router.get("/exports/download/{filename}")
-def download(filename: str):
-    file_path = EXPORT_DIR / filename
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Not Found")
-    return FileResponse(path=str(file_path), media_type="application/octet-stream", filename=filename)
\ No newline at end of file
+def export_zip(variant_id: int, db: Session = Depends(get_db)):
+    """Build (or reuse) the variant's export pack and return its download link."""
+    key, entries = _pack_inputs(db, variant_id)
+    pack, cached = export_pack.build_pack(key, entries)
+    zip_name = f"variant_{variant_id}.zip"
+    export_pack.publish(pack, zip_name)
+    return {"download": f"/exports/download/{zip_name}", "bytes": pack.stat().st_size, "cached": cached}
+
+
+@router.get("/variants/{variant_id}/export_zip")
+def stream_export_zip(variant_id: int, db: Session = Depends(get_db)):
+    """The export pack as a download: the cached pack if built, else streamed while it is written."""
+    key, entries = _pack_inputs(db, variant_id)
+    zip_name = f"variant_{variant_id}.zip"
+    cached = export_pack.pack_cache.get(key, ".zip")
+    if cached is not None:
+        return FileResponse(cached, media_type="application/zip", filename=zip_name)
+    return StreamingResponse(
+        export_pack.iter_pack(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{zip_name}"'},
+    )
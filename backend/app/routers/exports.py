@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request
+
+from ..downloads import serve_export
+
+router = APIRouter()
+
+
+@router.api_route("/download/{filename}", methods=["GET", "HEAD"])
+def download(filename: str, request: Request):
+    """Export as an attachment (Range, ETag/304, presigned S3 redirect; see app/downloads.py)."""
+    return serve_export(request, filename, attachment=True)
+
+
+@router.api_route("/{filename}", methods=["GET", "HEAD"])
+def inline(filename: str, request: Request):
+    """Export inline, e.g. for a <video> element that seeks with Range requests."""
+    return serve_export(request, filename, attachment=False)
@@ -1,16 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer
+from starlette.concurrency import run_in_threadpool
 
 from .. import models, schemas
-from ..db import get_db
+from ..db import SessionLocal, get_db
+from ..jobqueue import last_message
+from ..pagination import DEFAULT_LIMIT, MAX_LIMIT, keyset_page
 
 router = APIRouter()
 
+POLL_S = 0.5
+KEEPALIVE_S = 15.0
+TERMINAL = (models.JobStatus.completed, models.JobStatus.failed)
+
+
+@router.get("/", response_model=schemas.JobPage)
+def list_jobs(
+    project_id: Optional[int] = None,
+    status: Optional[models.JobStatus] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    before: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Jobs newest first, without payloads/results; pass `next_before` back as `before` for the next page."""
+    J = models.Job
+    where = [c for c in (
+        J.project_id == project_id if project_id is not None else None,
+        J.status == status if status is not None else None,
+        J.kind == kind if kind else None,
+    ) if c is not None]
+    return keyset_page(db, schemas.JobSummary, J.id, *where, limit=limit, before=before)
+
 
 @router.get("/{job_id}", response_model=schemas.JobOut)
 def get_job(job_id: int, db: Session = Depends(get_db)):
-    """Return job status and logs."""
-    job = db.get(models.Job, job_id)
+    """Return job status, progress, result and last log message; poll this for queued renders."""
+    job = db.get(models.Job, job_id, options=[undefer(models.Job.result_json)])
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    out = schemas.JobOut.model_validate(job)
+    out.logs = last_message(db, job_id)
+    return out
+
+
+def _poll(job_id: int, after: int):
+    """New events after id `after`, plus the job's final state once it has one."""
+    with SessionLocal() as db:
+        job = db.get(models.Job, job_id)
+        if job is None:
+            return {"status": "failed", "logs": "Job not found"}, []
+        events = db.execute(
+            select(models.JobEvent)
+            .where(models.JobEvent.job_id == job_id, models.JobEvent.id > after)
+            .order_by(models.JobEvent.id)
+        ).scalars().all()
+        rows = [(e.id, e.stage, {**(e.data or {}), "progress": e.progress}) for e in events]
+        final = None
+        if job.status in TERMINAL:
+            final = {"status": job.status.value, "progress": job.progress, "result": job.result_json,
+                     "logs": last_message(db, job_id)}
+        return final, rows
+
+
+def _sse(event: str, data, event_id=None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: int, request: Request):
+    """
+    Server-Sent Events stream of a job's progress events (stage, scene,
+    percent, overall progress, ETA; see app/progress.py) and `log` messages,
+    ending with a `done` or `failed` event. Reconnecting clients resume after Last-Event-ID.
+    """
+    with SessionLocal() as db:
+        if db.get(models.Job, job_id) is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        last = int(request.headers.get("last-event-id") or 0)
+    except ValueError:
+        last = 0
+
+    async def stream():
+        nonlocal last
+        quiet_since = time.monotonic()
+        while True:
+            final, rows = await run_in_threadpool(_poll, job_id, last)
+            for event_id, stage, data in rows:
+                last = event_id
+                yield _sse("log" if stage == "log" else "progress", data, event_id)
+                quiet_since = time.monotonic()
+            if final is not None:
+                yield _sse("done" if final["status"] == "completed" else "failed", final)
+                return
+            if await request.is_disconnected():
+                return
+            if time.monotonic() - quiet_since >= KEEPALIVE_S:
+                yield ": keep-alive\n\n"
+                quiet_since = time.monotonic()
+            await asyncio.sleep(POLL_S)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from ..db import get_db
 from .. import models, schemas
@@ -17,6 +17,7 @@ def get_post_text(project_id: int, db: Session = Depends(get_db)):
   
     v = (
         db.query(models.Variant)
+        .options(undefer(models.Variant.script_json))
         .filter(models.Variant.project_id == project_id)
         .order_by(models.Variant.id.desc())
         .first()
@@ -1,38 +1,26 @@
 # app/routers/projects.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import json
-from typing import Any, Dict, Optional
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer_group
 
-from ..generators.storyboard import compose_storyboard  
 from .. import models, schemas
+from ..batch import create_batch
 from ..db import get_db
-from ..models import Variant, Job, JobStatus
+from ..pagination import DEFAULT_LIMIT, MAX_LIMIT, keyset_page
 
 router = APIRouter()
 
 
-def generate_script(brief: Dict[str, Any], *, tone: Optional[str] = None, persona: Optional[str] = None) -> Dict[str, Any]:
-    title = (
-        brief.get("title")
-        or brief.get("product_title")
-        or (brief.get("product") or {}).get("title")
-        or "Your product"
-    )
-    desc = (
-        brief.get("description")
-        or (brief.get("product") or {}).get("description")
-        or ""
-    )
-
-    beats = [
-        {"time": 0.0,  "vo": f"Meet {title}."},
-        {"time": 2.5,  "vo": (desc[:140] or "Built for daily use.")},
-        {"time": 5.0,  "vo": "See how it works."},
-        {"time": 8.0,  "vo": "Tap to get yours now."},
-    ]
-    return {"beats": beats, "meta": {"tone": tone, "persona": persona}}
-
+@router.get("/", response_model=schemas.ProjectPage)
+def list_projects(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    before: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Projects newest first; pass `next_before` back as `before` for the next page."""
+    return keyset_page(db, schemas.ProjectSummary, models.Project.id, limit=limit, before=before)
 
 
 @router.post("/", response_model=schemas.ProjectOut)
@@ -56,46 +44,40 @@ def generate_variant(
     payload: schemas.GenerateRequest,
     db: Session = Depends(get_db),
 ):
-   
+    """
+    Create `n_variants` variants across tones x personas (see app/batch.py);
+    the job's result_json lists the new variant ids and any queued renders.
+    """
     project = db.get(models.Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-
-    tone = payload.tones[0] if payload.tones else None
-    variant = Variant(
-        project_id=project.id,
-        tone=tone,
-        persona=payload.persona,
-        status="draft",
+    personas = payload.personas or ([payload.persona] if payload.persona else None)
+    return create_batch(
+        db,
+        project,
+        n=payload.n_variants,
+        tones=payload.tones,
+        personas=personas,
+        render=payload.render,
+        renderer=payload.renderer,
+        local_only=payload.local_only,
+        plan=payload.plan,
     )
-    db.add(variant)
-
-
-    job = Job(project_id=project.id, kind="generate-variant", status=JobStatus.running)
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-
-    
-    brief = project.brief_json or {}
-    script_json = generate_script(brief, tone=tone, persona=payload.persona)
-    storyboard_json = compose_storyboard(script_json, brief)
 
-   
-    variant.script_json = script_json
-    variant.storyboard_json = storyboard_json
-    variant.status = "ready"
-    db.add(variant)
-
-    
-    job.status = JobStatus.completed
-    job.logs = json.dumps({"script": script_json, "storyboard": storyboard_json}, indent=2)
-    db.add(job)
-    db.commit()
-    db.refresh(job)
 
-    return job
+@router.get("/{project_id}/variants", response_model=schemas.VariantPage)
+def list_variants(
+    project_id: int,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    before: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """A project's variants newest first, without scripts/storyboards."""
+    if db.scalar(select(models.Project.id).where(models.Project.id == project_id)) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    V = models.Variant
+    return keyset_page(db, schemas.VariantSummary, V.id, V.project_id == project_id, limit=limit, before=before)
 
 
 @router.get("/{project_id}/variants/latest", response_model=schemas.VariantOut)
@@ -107,6 +89,7 @@ def get_latest_variant(project_id: int, db: Session = Depends(get_db)):
 
     v = (
         db.query(models.Variant)
+        .options(undefer_group("json"))
         .filter(models.Variant.project_id == project_id)
         .order_by(models.Variant.id.desc())
         .first()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from ..schemas import ScrapeIn, ScrapeOut, Brief
 from ..utils_scrape import scrape_brief
 
@@ -6,9 +6,9 @@ router = APIRouter()
 
 
 @router.post("/", response_model=ScrapeOut)
-async def scrape(inb: ScrapeIn) -> ScrapeOut:
+async def scrape(inb: ScrapeIn, force_refresh: bool = Query(False)) -> ScrapeOut:
     try:
-        data = await scrape_brief(str(inb.url))
+        data = await scrape_brief(str(inb.url), force_refresh=force_refresh)
         if not data:
             return ScrapeOut(ok=False, reason="No product data found")
         return ScrapeOut(ok=True, brief=Brief(**data))
@@ -1,7 +1,12 @@
-from pydantic import BaseModel, HttpUrl, ConfigDict
+import os
+from datetime import datetime
+
+from pydantic import BaseModel, HttpUrl, ConfigDict, Field
 from typing import Optional, List
 from typing import Any, Optional
 
+MAX_BATCH = int(os.getenv("REELIXX_BATCH_MAX", "100"))
+
 
 class Brief(BaseModel):
     title: Optional[str] = None
@@ -35,19 +40,57 @@ class ProjectOut(BaseModel):
 
 
 class GenerateRequest(BaseModel):
-    n_variants: int = 1
+    # variants cycle through tones x personas (persona alone = one persona)
+    n_variants: int = Field(1, ge=1, le=MAX_BATCH)
     tones: Optional[List[str]] = None
     persona: Optional[str] = None
+    personas: Optional[List[str]] = None
     voice_id: Optional[str] = None
+    # queue an assemble-variant render for every new variant
+    render: bool = False
+    renderer: Optional[str] = None
+    local_only: Optional[bool] = None
+    # with render: one render-batch job that renders shared assets once (segment renderer)
+    plan: bool = False
+
+
+class ProjectSummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    product_url: Optional[str] = None
+
+
+class ProjectPage(BaseModel):
+    items: List[ProjectSummary]
+    next_before: Optional[int] = None
 
 
 class JobOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
-    project_id: int
+    project_id: Optional[int] = None
     kind: str
     status: str
     logs: Optional[str] = None
+    progress: Optional[float] = None
+    result_json: Optional[dict[str, Any]] = None
+
+
+# list rows: plain columns only, never the JSON blobs
+class JobSummary(BaseModel):
+    id: int
+    project_id: Optional[int] = None
+    kind: str
+    status: str
+    progress: Optional[float] = None
+    attempts: Optional[int] = None
+    created_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+
+class JobPage(BaseModel):
+    items: List[JobSummary]
+    next_before: Optional[int] = None
 
 
 class VariantOut(BaseModel):
@@ -60,6 +103,21 @@ class VariantOut(BaseModel):
     storyboard_json: Optional[dict[str, Any]] = None
 
 
+class VariantSummary(BaseModel):
+    id: int
+    project_id: int
+    status: Optional[str] = None
+    tone: Optional[str] = None
+    persona: Optional[str] = None
+    duration_s: Optional[int] = None
+    mp4_url: Optional[str] = None
+
+
+class VariantPage(BaseModel):
+    items: List[VariantSummary]
+    next_before: Optional[int] = None
+
+
 class PostTextOut(BaseModel):
     caption: str
     hashtags: list[str]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 # Optional AWS imports
 try:
@@ -32,7 +32,7 @@ class StorageManager:
             self.s3_client = None
         
         # Local storage fallback
-        self.local_storage_dir = Path(__file__).resolve().parent / "exports"
+        self.local_storage_dir = Path(os.getenv("REELIXX_EXPORT_DIR", str(Path(__file__).resolve().parent / "exports")))
         self.local_storage_dir.mkdir(parents=True, exist_ok=True)
     
     def save_file(self, file_path: str, content: bytes) -> str:
@@ -76,6 +76,17 @@ class StorageManager:
             shutil.copy2(local_path, dest_path)
             return f"/exports/{local_path.name}"
     
+    def download_file(self, s3_key: str, local_path: Path) -> bool:
+        """Fetch an object from S3 into local_path; False if missing or S3 is off"""
+        if not (self.use_s3 and self.s3_client):
+            return False
+        try:
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            self.s3_client.download_file(self.bucket_name, s3_key, str(local_path))
+            return True
+        except Exception:
+            return False
+
     def get_file_url(self, file_path: str) -> str:
         """Get the public URL for a file"""
         if self.use_s3 and self.s3_client:
@@ -83,6 +94,21 @@ class StorageManager:
         else:
             return f"/exports/{file_path}"
     
+    def presigned_url(
+        self, s3_key: str, *, download_name: Optional[str] = None, expires_s: int = 900
+    ) -> Optional[str]:
+        """Short-lived GET URL for an S3 object; None if S3 is off"""
+        if not (self.use_s3 and self.s3_client):
+            return None
+        params = {"Bucket": self.bucket_name, "Key": s3_key}
+        if download_name:
+            params["ResponseContentDisposition"] = f'attachment; filename="{download_name}"'
+        try:
+            return self.s3_client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_s)
+        except Exception as e:
+            print(f"S3 presign failed: {e}")
+            return None
+
     def delete_file(self, file_path: str) -> bool:
         """Delete a file from storage"""
         if self.use_s3 and self.s3_client:
@@ -112,8 +138,10 @@ class StorageManager:
         
         return f"/exports/{file_path}"
     
-    def cleanup_old_files(self, max_age_hours: int = 24):
-        """Clean up old files to stay within free tier limits"""
+    def cleanup_old_files(self, max_age_hours: int = 24, keep: Optional[Iterable[str]] = None):
+        """Clean up old files to stay within free tier limits; keys in `keep` are never deleted
+        (pass render_cache.protected_s3_keys() so outputs linked to a Variant survive)"""
+        keep = set(keep or ())
         if not self.use_s3 or not self.s3_client:
             return  # Only needed for S3 free tier
         
@@ -128,6 +156,8 @@ class StorageManager:
             cutoff_time = datetime.datetime.now() - datetime.timedelta(hours=max_age_hours)
             
             for obj in response['Contents']:
+                if obj['Key'] in keep:
+                    continue
                 if obj['LastModified'].replace(tzinfo=None) < cutoff_time:
                     self.s3_client.delete_object(Bucket=self.bucket_name, Key=obj['Key'])
                     print(f"Deleted old file: {obj['Key']}")
@@ -0,0 +1,296 @@
+# backend/app/tasks.py
+"""
+Render tasks executed by app.worker. Each task takes the job payload and a
+`report(progress)` callback and returns the JSON stored in Job.result_json.
+`report` takes a 0..1 float or a structured progress event (app/progress.py).
+Generators are imported lazily so the API process never loads MoviePy/OpenAI
+just to enqueue.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .db import SessionLocal
+from . import models, render_cache
+
+Report = Callable[[Any], None]
+
+
+def _download_for(filename: str | None, url: str | None) -> str | None:
+    if filename:
+        return f"/exports/download/{filename}"
+    name = Path(url or "").name
+    return f"/exports/download/{name}" if name else url
+
+
+def _project_images(
+    project_id: int | None, product_url: str | None, local_only: bool, *, scrape: bool = True
+) -> List[Path]:
+    """
+    The project's image pool: images already on disk, else (network allowed)
+    the product page's images, scraped once into the project's directory.
+    """
+    from .generators import image_pool
+
+    if project_id is None:
+        return []
+    images = image_pool.project_images(project_id)
+    if images or local_only or not product_url or not scrape:
+        return images
+    from .utils.image_scrape import scrape_product_images
+
+    try:
+        return asyncio.run(scrape_product_images(product_url, out_dir=image_pool.project_dir(project_id)))
+    except Exception:
+        return []  # renders never fail over the image pool
+
+
+def _local_only(payload: Dict[str, Any]) -> bool:
+    flag = payload.get("local_only")
+    return os.getenv("REELIXX_LOCAL_IMAGES_ONLY", "0") == "1" if flag is None else bool(flag)
+
+
+def _ad_key(storyboard: Dict[str, Any], payload: Dict[str, Any], images: List[Path], local_only: bool) -> str:
+    # music mood / voice are generate_ai_ad's defaults; they are part of the output
+    return render_cache.render_key(
+        storyboard=storyboard,
+        caption=payload.get("caption") or "",
+        brand_color=payload.get("brand_color") or "#111111",
+        music_mood="upbeat",
+        voice="alloy",
+        renderer=payload.get("renderer"),
+        images=images,
+        local_only=local_only,
+    )
+
+
+def _endcard(payload: Dict[str, Any]) -> Path | None:
+    """Prerendered end card a batch shares between its renders (see app/batch.py)."""
+    path = Path(payload["endcard"]) if payload.get("endcard") else None
+    return path if path is not None and path.is_file() else None
+
+
+def _assemble_inputs(payload: Dict[str, Any], *, scrape: bool = True):
+    variant_id = int(payload["variant_id"])
+    with SessionLocal() as db:
+        v = db.get(models.Variant, variant_id)
+        if not v or not isinstance(v.storyboard_json, dict):
+            raise ValueError(f"Variant {variant_id} has no storyboard")
+        sb = v.storyboard_json
+        project = db.get(models.Project, v.project_id)
+        project_id, product_url = (project.id, project.product_url) if project else (None, None)
+
+    local_only = _local_only(payload)
+    scene_images = _project_images(project_id, product_url, local_only, scrape=scrape)
+    return variant_id, sb, scene_images, local_only
+
+
+def is_cached(kind: str, payload: Dict[str, Any]) -> bool:
+    """
+    True when the render this job would do is already in the render cache, so
+    the API can answer inline instead of queueing (never scrapes or renders).
+    """
+    try:
+        if kind == "assemble-variant":
+            _, sb, images, local_only = _assemble_inputs(payload, scrape=False)
+            endcard = _endcard(payload)
+            images = images + ([endcard] if endcard else [])
+        elif kind == "ai-generate":
+            sb, images, local_only = payload["storyboard"], [], _local_only(payload)
+        else:
+            return False
+        with SessionLocal() as db:
+            return render_cache.peek(db, _ad_key(sb, payload, images, local_only))
+    except Exception:
+        return False
+
+
+def assemble_variant(payload: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    from .generators.video_ai import generate_ai_ad
+
+    variant_id, sb, scene_images, local_only = _assemble_inputs(payload)
+    endcard = _endcard(payload)
+    key = _ad_key(sb, payload, scene_images + ([endcard] if endcard else []), local_only)
+
+    report(0.05)
+    result = render_cache.get_or_render(
+        key,
+        lambda: generate_ai_ad(
+            storyboard=sb,
+            caption=payload.get("caption") or " ",
+            brand_color=payload.get("brand_color") or "#111111",
+            renderer=payload.get("renderer"),
+            scene_images=scene_images,
+            local_only=local_only,
+            progress=report,
+            endcard=endcard,
+        ),
+    )
+    filename = (result or {}).get("filename")
+    url = (result or {}).get("url")
+    if not (filename or url):
+        raise RuntimeError("AI generator returned no filename/url")
+    if not url and filename:
+        url = f"/exports/{filename}"
+
+    with SessionLocal() as db:
+        v = db.get(models.Variant, variant_id)
+        if v:
+            v.mp4_url = url
+            db.commit()
+            render_cache.link_variant(db, variant_id, key)
+
+    return {
+        "ok": True,
+        "ai": True,
+        "mp4_url": url,
+        "download": _download_for(filename, url),
+        "filename": filename,
+        "cache_hit": result["cache_hit"],
+    }
+
+
+def ai_generate(payload: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    from .generators.video_ai import generate_ai_ad
+
+    local_only = _local_only(payload)
+    key = _ad_key(payload["storyboard"], payload, [], local_only)
+
+    report(0.05)
+    video_info = render_cache.get_or_render(
+        key,
+        lambda: generate_ai_ad(
+            payload["storyboard"],
+            payload.get("caption") or "",
+            brand_color=payload.get("brand_color") or "#111111",
+            renderer=payload.get("renderer"),
+            local_only=local_only,
+            progress=report,
+        ),
+    )
+    return {
+        "ok": True,
+        "storyboard": payload["storyboard"],
+        "caption": payload.get("caption"),
+        "video": video_info,
+        "cache_hit": video_info["cache_hit"],
+    }
+
+
+def ai_generate_pro(payload: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    from .generators.script_ai import generate_script_storyboard
+    from .generators.video_ai_pro import generate_ai_video
+
+    storyboard = payload.get("storyboard")
+    if not storyboard:
+        storyboard = generate_script_storyboard(
+            title=payload.get("title") or "",
+            description=payload.get("description") or "",
+            tone=payload.get("tone") or "neutral",
+            duration_sec=int(payload.get("duration_sec") or 15),
+        )
+    report(0.1)
+    video_info = generate_ai_video(
+        storyboard,
+        voice=payload.get("voice") or "alloy",
+        music_mood=payload.get("music_mood") or "upbeat",
+        local_only=payload.get("local_only"),
+        progress=report,
+    )
+    return {"ok": True, "video": video_info, "storyboard": storyboard}
+
+
+def render_batch(payload: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    """
+    Render a batch's variants (`variant_ids`) as one shared asset graph, so
+    voice lines, images and encoded scenes common to several variants are
+    produced once. Never served from the per-ad render cache (the segment and
+    TTS caches still apply), but every output is indexed there and linked to
+    its variants, so cleanup keeps it and the export pack can time captions.
+    Returns the planner's reuse report.
+    """
+    from .generators.script_template import script_caption
+    from .generators.video_ai import render_storyboards
+
+    variant_ids = [int(v) for v in payload["variant_ids"]]
+    with SessionLocal() as db:
+        variants = [db.get(models.Variant, vid) for vid in variant_ids]
+        missing = [vid for vid, v in zip(variant_ids, variants) if not v or not isinstance(v.storyboard_json, dict)]
+        if missing:
+            raise ValueError(f"Variants {missing} have no storyboard")
+        items = [{"storyboard": v.storyboard_json, "caption": script_caption(v.script_json)} for v in variants]
+        project = db.get(models.Project, variants[0].project_id) if variants else None
+        project_id, product_url = (project.id, project.product_url) if project else (None, None)
+
+    local_only = _local_only(payload)
+    scene_images, endcard = _project_images(project_id, product_url, local_only), _endcard(payload)
+    report(0.05)
+    result = render_storyboards(
+        items,
+        brand_color=payload.get("brand_color") or "#111111",
+        scene_images=scene_images,
+        endcard=endcard,
+        local_only=local_only,
+        on_node=lambda done, total: report(0.05 + 0.9 * done / total),
+    )
+
+    images = scene_images + ([endcard] if endcard else [])
+    plan_payload = {**payload, "renderer": "plan"}
+    with SessionLocal() as db:
+        for vid, item, ad in zip(variant_ids, items, result["ads"]):
+            v = db.get(models.Variant, vid)
+            if not v:
+                continue
+            v.mp4_url = ad["url"]
+            db.commit()
+            if render_cache.ENABLED:
+                key = _ad_key(item["storyboard"], {**plan_payload, "caption": item["caption"]}, images, local_only)
+                render_cache.store(db, key, {**ad, "renderer": "plan"})
+                render_cache.link_variant(db, vid, key)
+
+    return {
+        "ok": True,
+        "variants": [
+            {"variant_id": vid, "mp4_url": ad["url"], "download": _download_for(ad["filename"], ad["url"])}
+            for vid, ad in zip(variant_ids, result["ads"])
+        ],
+        "report": result["report"],
+    }
+
+
+def preview(payload: Dict[str, Any], report: Report) -> Dict[str, Any]:
+    """
+    Draft render of a variant's storyboard (`variant_id`) or a raw `storyboard`.
+    Uses only images already on disk, never touches Variant.mp4_url and skips
+    the render cache: previews are cheap and their voice depends on what the
+    TTS cache holds at the time.
+    """
+    from .generators.video_ai import generate_ai_ad
+
+    if payload.get("variant_id") is not None:
+        _, sb, scene_images, _ = _assemble_inputs(payload, scrape=False)
+    else:
+        sb, scene_images = payload["storyboard"], []
+    report(0.05)
+    return generate_ai_ad(
+        sb,
+        payload.get("caption") or "",
+        brand_color=payload.get("brand_color") or "#111111",
+        renderer=payload.get("renderer"),
+        scene_images=scene_images,
+        local_only=True,
+        preview=payload.get("preview") or "mp4",
+        progress=report,
+    )
+
+
+TASKS: Dict[str, Callable[[Dict[str, Any], Report], Dict[str, Any]]] = {
+    "assemble-variant": assemble_variant,
+    "ai-generate": ai_generate,
+    "ai-generate-pro": ai_generate_pro,
+    "preview": preview,
+    "render-batch": render_batch,
+}
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from app.generators import asset_stage
+from app.generators.asset_stage import Provider, run_asset_stage, stub_provider
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(asset_stage, "BACKOFF_BASE_S", 0.001)
+
+
+def test_fans_out_and_keeps_scene_order(tmp_path):
+    texts = [f"scene {i}" for i in range(5)]
+    provider = stub_provider(tmp_path, latency_s=0.2, image_size=(8, 8))
+
+    t0 = time.perf_counter()
+    out = run_asset_stage(texts, provider, max_workers=10)
+    elapsed = time.perf_counter() - t0
+
+    assert [a["index"] for a in out] == list(range(5))
+    assert all(a["voice"].exists() and a["image"].exists() for a in out)
+    # 10 calls x 0.2s serially would take 2s
+    assert elapsed < 1.0
+    assert all(a["timings"]["tts"]["call_s"] >= 0.19 for a in out)
+
+
+def test_retries_transient_errors(tmp_path):
+    provider = stub_provider(tmp_path, fail_first=3, fail_status=429, image_size=(8, 8))
+    out = run_asset_stage(["a", "b"], provider, max_workers=1)
+
+    attempts = sum(a["timings"]["tts"]["attempts"] + a["timings"]["image"]["attempts"] for a in out)
+    assert attempts == 4 + 3
+
+
+def test_non_retryable_error_propagates(tmp_path):
+    provider = stub_provider(tmp_path, fail_first=1, fail_status=400, image_size=(8, 8))
+    with pytest.raises(Exception, match="stub 400"):
+        run_asset_stage(["a"], provider, max_workers=1)
+
+
+def test_skips_images_when_provider_has_none(tmp_path):
+    stub = stub_provider(tmp_path)
+    out = run_asset_stage(["a", "b"], Provider("stub", stub.tts, None))
+    assert [a["image"] for a in out] == [None, None]
+
+
+def test_rate_limiter_spaces_calls():
+    lim = asset_stage.RateLimiter(rate_per_s=20, burst=1)
+    t0 = time.perf_counter()
+    for _ in range(5):
+        lim.acquire()
+    assert time.perf_counter() - t0 >= 0.18
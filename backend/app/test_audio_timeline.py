@@ -0,0 +1,54 @@
+import wave
+
+import numpy as np
+
+from app.generators.audio_timeline import SAMPLE_RATE, build_timeline, decode_pcm, write_wav
+
+
+def _tone(path, seconds, level):
+    n = int(SAMPLE_RATE * seconds)
+    write_wav(np.full((n, 2), level, dtype=np.float32), path)
+    return path
+
+
+def test_voices_are_laid_end_to_end_over_one_music_bed(tmp_path):
+    voices = [_tone(tmp_path / f"v{i}.wav", s, 0.0) for i, s in enumerate((0.5, 1.0, 0.25))]
+    music = _tone(tmp_path / "bed.wav", 0.4, 0.5)  # shorter than the ad, so it must loop
+
+    track = build_timeline(voices, music, music_gain_db=0.0, out=tmp_path / "mix.wav")
+
+    assert track["durations"] == [0.5, 1.0, 0.25]
+    assert track["offsets"] == [0.0, 0.5, 1.5]
+    with wave.open(str(track["path"])) as w:
+        assert w.getnframes() == int(SAMPLE_RATE * 1.75)
+    pcm = decode_pcm(track["path"])
+    # music runs through every scene boundary without gaps
+    assert np.allclose(pcm, 0.5, atol=1e-3)
+
+
+def test_min_scene_length_pads_short_voices(tmp_path):
+    voices = [_tone(tmp_path / "v.wav", 0.2, 0.1)]
+    track = build_timeline(voices, None, min_scene_s=1.0, out=tmp_path / "mix.wav")
+    assert track["durations"] == [1.0]
+    pcm = decode_pcm(track["path"])
+    assert np.allclose(pcm[: int(0.2 * SAMPLE_RATE) - 10], 0.1, atol=1e-3)
+    assert np.allclose(pcm[int(0.2 * SAMPLE_RATE) + 10:], 0.0, atol=1e-3)
+
+
+def test_music_bed_is_decoded_once_then_mapped(tmp_path):
+    from app.generators.music_bed import BedCache
+
+    bed = _tone(tmp_path / "bed.wav", 0.5, 0.25)
+    cache = BedCache(tmp_path / "beds", max_bytes=10 * 1024 * 1024)
+    pcm, saved = cache.load(bed)
+    assert saved == 0.0 and cache.stats()["decodes"] == 1
+    assert isinstance(pcm, np.memmap) and not pcm.flags.writeable
+
+    again, _ = cache.load(bed)
+    assert again is pcm and cache.stats()["hits"] == 1
+
+    # a fresh process (new cache object) maps the sidecar instead of decoding
+    other = BedCache(tmp_path / "beds", max_bytes=10 * 1024 * 1024)
+    mapped, saved = other.load(bed)
+    assert other.stats()["decodes"] == 0 and other.stats()["sidecar_loads"] == 1
+    assert saved > 0 and np.array_equal(mapped, pcm)
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import batch, models
+from app.db import Base
+from app.diskcache import DiskCache
+from app.generators import image_pool
+
+
+@pytest.fixture()
+def db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'b.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(image_pool, "image_cache", DiskCache(tmp_path / "images", max_bytes=1 << 26))
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2].split()[0].upper()))
+    with sessionmaker(bind=engine, future=True)() as session:
+        session.statements = statements
+        yield session
+    engine.dispose()
+
+
+def _project(db):
+    p = models.Project(title="Mug", brief_json={"title": "Mug", "description": "Keeps coffee hot"},
+                       brand_json={"color": "#224488"})
+    db.add(p)
+    db.commit()
+    return p
+
+
+def test_matrix_cycles_tones_and_personas():
+    assert batch.variant_matrix(5, ["fun", "pro"], ["mom", "dev"]) == [
+        ("fun", "mom"), ("fun", "dev"), ("pro", "mom"), ("pro", "dev"), ("fun", "mom"),
+    ]
+    assert batch.variant_matrix(2, None, None) == [(None, None), (None, None)]
+
+
+def test_batch_is_one_transaction_with_bulk_inserts(db):
+    project = _project(db)
+    db.statements.clear()
+
+    job = batch.create_batch(db, project, n=6, tones=["fun", "pro", "lux"], personas=["mom", "dev"], render=True,
+                             local_only=True)
+
+    # batch job, all variants, all render jobs: three INSERTs and one COMMIT
+    assert db.statements.count("INSERT") == 3
+    ids, render_jobs = job.result_json["variant_ids"], job.result_json["render_jobs"]
+    assert len(ids) == 6 and len(render_jobs) == 6
+
+    variants = [db.get(models.Variant, i) for i in ids]
+    assert [(v.tone, v.persona) for v in variants][:3] == [("fun", "mom"), ("fun", "dev"), ("pro", "mom")]
+    assert all(v.status == "ready" and v.storyboard_json["scenes"] for v in variants)
+
+    jobs = [db.get(models.Job, j) for j in render_jobs]
+    assert all(j.kind == "assemble-variant" and j.status == models.JobStatus.queued for j in jobs)
+    assert [j.payload["variant_id"] for j in jobs] == ids
+    endcards = {j.payload["endcard"] for j in jobs}
+    assert len(endcards) == 1  # one end card shared by the whole batch
+    pool = image_pool.ImagePool([], canvas=(1080, 1920), endcard=endcards.pop())
+    assert pool.resolve({"type": "endcard"}) is not None
+
+
+def test_process_pool_matches_inline():
+    combos = batch.variant_matrix(8, ["fun", "pro"], ["mom"])
+    brief = {"title": "Mug"}
+    assert batch.compose_all(brief, combos, pool_min=1) == batch.compose_all(brief, combos, pool_min=10**6)
+
+
+def test_planned_batch_queues_one_render(db):
+    job = batch.create_batch(db, _project(db), n=4, tones=["fun", "pro"], render=True, local_only=True, plan=True)
+    (render_job,) = [db.get(models.Job, j) for j in job.result_json["render_jobs"]]
+    assert render_job.kind == "render-batch"
+    assert render_job.payload["variant_ids"] == job.result_json["variant_ids"]
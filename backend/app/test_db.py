@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app import db as dbmod
+from app import models
+from app.db import Base, engine_kwargs, make_engine, pool_metrics
+
+
+def test_sqlite_connections_use_wal(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'w.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == dbmod.SQLITE_BUSY_TIMEOUT_MS
+    engine.dispose()
+
+
+def test_postgres_gets_pre_ping_and_recycle():
+    kwargs = engine_kwargs("postgresql+psycopg2://u:p@db/reelixx")
+    assert kwargs["pool_pre_ping"] is True and kwargs["pool_recycle"] == dbmod.POOL_RECYCLE_S
+    assert kwargs["pool_size"] == dbmod.POOL_SIZE and kwargs["max_overflow"] == dbmod.MAX_OVERFLOW
+    assert "pool_pre_ping" not in engine_kwargs("sqlite:///x.db")
+    assert "poolclass" not in engine_kwargs("sqlite://")
+
+
+def test_many_concurrent_polls_share_a_small_pool(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'p.db'}", pool_size=4, max_overflow=4, pool_timeout=30)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, future=True)
+    with factory() as s:
+        job = models.Job(kind="assemble-variant", status=models.JobStatus.running, progress=0.5)
+        s.add(job)
+        s.commit()
+        job_id = job.id
+
+    def poll(_):
+        with factory() as s:
+            return s.get(models.Job, job_id).progress
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        assert list(pool.map(poll, range(400))) == [0.5] * 400
+
+    m = pool_metrics(engine)
+    assert m["timeouts"] == 0 and m["checked_out"] == 0
+    assert m["checkouts"] >= 400 and m["checked_in"] <= 8
+    engine.dispose()
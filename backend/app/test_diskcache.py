@@ -0,0 +1,66 @@
+import os
+
+from app.diskcache import DiskCache, content_key
+from app.generators.tts_cache import normalize_text
+
+
+def _writer(payload: bytes, calls: list):
+    def produce(out):
+        calls.append(out)
+        out.write_bytes(payload)
+    return produce
+
+
+def test_hit_skips_producer_and_counts(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1 << 20)
+    calls: list = []
+    key = content_key("speech", "gpt-4o-mini-tts", "alloy", normalize_text("Tap  to get\nyours today →"))
+
+    first = cache.get_or_create(key, _writer(b"mp3", calls), suffix=".mp3")
+    second = cache.get_or_create(key, _writer(b"other", calls), suffix=".mp3")
+
+    assert first == second and first.read_bytes() == b"mp3"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=250)
+    keys = [content_key("k", i) for i in range(3)]
+    paths = [cache.get_or_create(k, _writer(b"x" * 100, []), suffix=".mp3") for k in keys[:2]]
+    os.utime(paths[0], (1, 1))
+    os.utime(paths[1], (2, 2))
+    cache.get(keys[0], ".mp3")  # touch: keys[1] is now least recently used
+
+    cache.get_or_create(keys[2], _writer(b"x" * 100, []), suffix=".mp3")
+
+    assert cache.path_for(keys[0], ".mp3").exists()
+    assert not cache.path_for(keys[1], ".mp3").exists()
+    assert cache.stats()["evictions"] == 1
+
+
+def test_single_flight_produces_once(tmp_path):
+    import threading
+    import time
+
+    cache = DiskCache(tmp_path, max_bytes=1 << 20)
+    calls: list = []
+
+    def slow(out):
+        calls.append(out)
+        time.sleep(0.2)
+        out.write_bytes(b"line")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_create("k" * 8, slow, ".mp3", single_flight=True)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and len(set(results)) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (3, 1)
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import downloads
+from app.main import app
+
+
+@pytest.fixture()
+def exports(tmp_path, monkeypatch):
+    root = tmp_path / "exports"
+    root.mkdir()
+    monkeypatch.setattr(downloads, "EXPORT_DIR", root)
+    (tmp_path / "secret.txt").write_text("nope")
+    return root
+
+
+client = TestClient(app)
+
+
+def test_range_and_etag(exports):
+    body = bytes(range(256)) * 40
+    (exports / "ad.mp4").write_bytes(body)
+
+    full = client.get("/exports/download/ad.mp4")
+    assert full.status_code == 200 and full.content == body
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["content-disposition"] == 'attachment; filename="ad.mp4"'
+    etag = full.headers["etag"]
+    assert not etag.startswith("W/") and etag == downloads.file_etag(exports / "ad.mp4")
+
+    part = client.get("/exports/ad.mp4", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206 and part.content == body[100:200]
+    assert part.headers["content-range"] == f"bytes 100-199/{len(body)}"
+    assert "content-disposition" not in part.headers
+
+    assert client.get("/exports/ad.mp4", headers={"Range": "bytes=99999-"}).status_code == 416
+    assert client.get("/exports/ad.mp4", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/exports/ad.mp4", headers={"If-None-Match": '"other"'}).status_code == 200
+
+    # a changed file gets a new ETag, and a stale If-Range falls back to the full body
+    (exports / "ad.mp4").write_bytes(body[::-1])
+    stale = client.get("/exports/ad.mp4", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert stale.status_code == 200 and stale.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("name", ["..%2Fsecret.txt", "%2E%2E", ".hidden", "a%5Cb.mp4", "a%00.mp4"])
+def test_path_traversal_is_rejected(exports, name):
+    (exports / ".hidden").write_text("x")
+    assert client.get(f"/exports/download/{name}").status_code == 404
+    with pytest.raises(Exception):
+        downloads.safe_export_path("../secret.txt")
+
+
+def test_missing_file_redirects_to_s3(exports, monkeypatch):
+    assert client.get("/exports/download/gone.mp4").status_code == 404
+
+    seen = {}
+
+    def presign(key, *, download_name=None, expires_s=900):
+        seen.update(key=key, name=download_name)
+        return f"https://bucket.example/{key}?sig=1"
+
+    monkeypatch.setattr(downloads.storage, "presigned_url", presign)
+    r = client.get("/exports/download/gone.mp4", follow_redirects=False)
+    assert r.status_code == 307 and r.headers["location"] == "https://bucket.example/videos/gone.mp4?sig=1"
+    assert seen == {"key": "videos/gone.mp4", "name": "gone.mp4"}
@@ -0,0 +1,131 @@
+import io
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import downloads, export_pack, models
+from app.db import Base, get_db
+from app.diskcache import DiskCache
+from app.main import app
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture()
+def env(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'x.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, future=True)
+    exports = tmp_path / "exports"
+    exports.mkdir()
+
+    def session():
+        with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    monkeypatch.setattr(export_pack, "EXPORT_DIR", exports)
+    monkeypatch.setattr(downloads, "EXPORT_DIR", exports)
+    monkeypatch.setattr(export_pack, "pack_cache", DiskCache(tmp_path / "packs", max_bytes=1 << 30))
+    with factory() as db:
+        p = models.Project(title="Mug", brief_json={"title": "Mug"}, brand_json={"color": "#224488"})
+        db.add(p)
+        db.flush()
+        v = models.Variant(
+            project_id=p.id, tone="playful", mp4_url=None, script_json={"beats": [{"vo": "Hot coffee"}]},
+            storyboard_json={"canvas": {"w": 108, "h": 192},
+                             "scenes": [{"start": 0, "end": 1.5, "text": "Hot coffee"},
+                                        {"start": 1.5, "end": 62.25, "text": "Buy now"}]},
+        )
+        db.add(v)
+        db.commit()
+        vid = v.id
+    (exports / f"variant_{vid}.mp4").write_bytes(b"\0mp4" * 5000)
+    yield vid, exports, factory
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
+def test_pack_contents_and_cache(env):
+    vid, exports, _ = env
+    client = TestClient(app)
+    first = client.post(f"/variants/{vid}/export_zip").json()
+    assert first["download"] == f"/exports/download/variant_{vid}.zip" and first["cached"] is False
+    assert client.post(f"/variants/{vid}/export_zip").json()["cached"] is True
+
+    data = client.get(first["download"]).content
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        info = {i.filename: i for i in z.infolist()}
+        assert set(info) == {f"variant_{vid}.mp4", "endcard.png", "captions.srt", "post.txt",
+                             "storyboard.json", "script.json"}
+        assert info[f"variant_{vid}.mp4"].compress_type == zipfile.ZIP_STORED
+        assert info["endcard.png"].compress_type == zipfile.ZIP_STORED
+        assert info["captions.srt"].compress_type == zipfile.ZIP_DEFLATED
+        assert z.read("captions.srt").decode() == (
+            "1\n00:00:00,000 --> 00:00:01,500\nHot coffee\n\n2\n00:00:01,500 --> 00:01:02,250\nBuy now\n"
+        )
+        assert z.read("endcard.png").startswith(b"\x89PNG")
+        assert "#" in z.read("post.txt").decode()
+
+    # streamed while written: a valid zip with the same entries
+    streamed = client.get(f"/variants/{vid}/export_zip").content
+    with zipfile.ZipFile(io.BytesIO(streamed)) as z:
+        assert z.testzip() is None and len(z.namelist()) == 6
+
+    assert client.post("/variants/999999/export_zip").status_code == 404
+
+
+def test_captions_follow_the_rendered_scene_times(env):
+    from app import render_cache
+
+    vid, _, factory = env
+    with factory() as db:
+        # the render's voice lines ran 2.0 s and 3.25 s, not the storyboard's 1.5 s / 60.75 s
+        render_cache.store(db, "k1", {"filename": f"variant_{vid}.mp4", "url": f"/exports/variant_{vid}.mp4",
+                                      "scenes": [{"index": 0, "start": 0.0, "duration": 2.0},
+                                                 {"index": 1, "start": 2.0, "duration": 3.25}]})
+        render_cache.link_variant(db, vid, "k1")
+        db.get(models.Variant, vid).mp4_url = f"/exports/variant_{vid}.mp4"
+        db.commit()
+
+    client = TestClient(app)
+    with zipfile.ZipFile(io.BytesIO(client.get(f"/variants/{vid}/export_zip").content)) as z:
+        assert z.read("captions.srt").decode() == (
+            "1\n00:00:00,000 --> 00:00:02,000\nHot coffee\n\n2\n00:00:02,000 --> 00:00:05,250\nBuy now\n"
+        )
+
+
+_PEAK = """
+import resource, sys
+from pathlib import Path
+from app.export_pack import iter_pack, write_pack
+video = Path(sys.argv[1])
+if sys.argv[2] == "file":
+    write_pack(video.with_suffix(".zip"), [("v.mp4", video), ("post.txt", b"hi")])
+else:
+    for _ in iter_pack([("v.mp4", video), ("post.txt", b"hi")]):
+        pass
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _peak_kb(video, mode):
+    out = subprocess.run([sys.executable, "-c", _PEAK, str(video), mode], cwd=BACKEND,
+                         capture_output=True, text=True, check=True)
+    return int(out.stdout.split()[-1])
+
+
+@pytest.mark.parametrize("mode", ["file", "stream"])
+def test_peak_rss_is_flat_in_video_size(tmp_path, mode):
+    small, large = tmp_path / "small.mp4", tmp_path / "large.mp4"
+    for path, mb in ((small, 4), (large, 96)):
+        with open(path, "wb") as fh:
+            fh.truncate(mb << 20)
+    grown = _peak_kb(large, mode) - _peak_kb(small, mode)
+    assert grown < 16 * 1024  # 92 MB more video, well under 16 MB more memory
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.generators import export_profiles
+from app.generators.export_profiles import ExportProfile, resolve_exports
+from app.generators.ffmpeg_render import render_exports
+
+
+def _size(path):
+    from moviepy.editor import VideoFileClip
+
+    clip = VideoFileClip(str(path))
+    try:
+        return tuple(clip.size), clip.duration
+    finally:
+        clip.close()
+
+
+def test_exports_resolve_to_named_profiles():
+    sb = {"exports": [{"preset": "vertical_1080p"}, "square_1080", {"preset": "vertical_1080p"}]}
+    assert [p.name for p in resolve_exports(sb)] == ["vertical_1080p", "square_1080"]
+    assert resolve_exports({}) == [export_profiles.SOURCE]
+
+    fast = export_profiles.get_profile("preview_540p_ultrafast")
+    assert fast.size == (540, 960)
+    assert fast.x264_args(30)[:6] == ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "30"]
+    assert "stillimage" in fast.x264_args(30) and fast.gop(30) == 30
+
+    with pytest.raises(ValueError, match="Unknown export preset"):
+        resolve_exports({"exports": [{"preset": "imax"}]})
+
+
+def test_letterbox_fits_and_centres():
+    frame = np.full((320, 180, 3), 255, dtype=np.uint8)
+    out = export_profiles.letterbox(frame, (320, 180))
+    assert out.shape == (180, 320, 3)
+    assert out[90, 160].tolist() == [255, 255, 255] and out[90, 5].tolist() == [0, 0, 0]
+    assert export_profiles.letterbox(frame, None) is frame
+
+
+def test_vertical_profiles_cover_crop_and_source_keeps_old_settings():
+    # a 2:3 still (gpt-image-1's 1024x1536) fills a 9:16 frame, no bars
+    frame = np.full((300, 200, 3), 255, dtype=np.uint8)
+    vertical = export_profiles.get_profile("vertical_1080p")
+    out = vertical.sized((90, 160)).fit_frame(frame)
+    assert out.shape == (160, 90, 3)
+    assert out[2, 45].tolist() == [255, 255, 255] and out[157, 45].tolist() == [255, 255, 255]
+    assert "crop=1080:1920" in vertical.video_filter(30)
+    assert "pad=" in export_profiles.get_profile("square_1080").video_filter(30)
+
+    assert export_profiles.SOURCE.tune is None
+    assert "-tune" not in export_profiles.SOURCE.x264_args(30)
+
+
+def test_one_ffmpeg_run_writes_every_export(tmp_path):
+    slides = []
+    for i, color in enumerate([(200, 0, 0), (0, 0, 200)]):
+        p = tmp_path / f"s{i}.png"
+        Image.new("RGB", (180, 320), color).save(p)
+        slides.append((p, 0.5))
+    outputs = [
+        (ExportProfile("tall", (90, 160), preset="ultrafast"), tmp_path / "tall.mp4"),
+        (ExportProfile("wide", (160, 90), preset="ultrafast"), tmp_path / "wide.mp4"),
+        (ExportProfile("cover", (160, 90), preset="ultrafast", fit="crop"), tmp_path / "cover.mp4"),
+    ]
+
+    render_exports(slides, None, outputs, fps=10)
+
+    for (profile, out) in outputs:
+        size, duration = _size(out)
+        assert size == profile.size
+        assert duration == pytest.approx(1.0, abs=0.15)
+
+    from moviepy.editor import VideoFileClip
+
+    for name, corner_is_black in (("wide.mp4", True), ("cover.mp4", False)):
+        clip = VideoFileClip(str(tmp_path / name))
+        try:
+            assert (clip.get_frame(0.1)[45, 2].max() < 30) == corner_is_black
+        finally:
+            clip.close()
+
+
+def test_moviepy_writes_every_export_with_shared_audio(tmp_path):
+    import wave
+
+    from moviepy.editor import AudioFileClip, VideoFileClip
+
+    track = tmp_path / "track.wav"
+    with wave.open(str(track), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(22050)
+        w.writeframes((np.sin(np.arange(22050) * 0.05) * 8000).astype("<i2").tobytes())
+    frames = [np.full((320, 180, 3), c, dtype=np.uint8) for c in (200, 40)]
+    outputs = [
+        (ExportProfile("tall", (90, 160), preset="ultrafast"), tmp_path / "tall.mp4"),
+        (ExportProfile("wide", (160, 90), preset="ultrafast"), tmp_path / "wide.mp4"),
+    ]
+
+    audio = AudioFileClip(str(track))
+    try:
+        timings = export_profiles.write_clip_exports(frames, [0.5, 0.5], audio, outputs, fps=10)
+    finally:
+        audio.close()
+
+    assert set(timings) == {"tall.mp4", "wide.mp4"}
+    for profile, out in outputs:
+        clip = VideoFileClip(str(out))
+        try:
+            assert tuple(clip.size) == profile.size and clip.audio is not None
+        finally:
+            clip.close()
+
+
+def test_odd_sized_scenes_pad_up_to_an_even_canvas(tmp_path):
+    slides = []
+    for i, size in enumerate([(91, 161), (85, 150)]):
+        p = tmp_path / f"odd{i}.png"
+        Image.new("RGB", size, (0, 120, 0)).save(p)
+        slides.append((p, 0.3))
+    out = tmp_path / "odd.mp4"
+
+    render_exports(slides, None, [(ExportProfile("source", None, preset="ultrafast"), out)], fps=10)
+    assert _size(out)[0] == (92, 162)
@@ -0,0 +1,87 @@
+import pytest
+from PIL import Image
+
+from app.diskcache import DiskCache
+from app.generators import image_pool
+from app.generators.asset_stage import Provider, stub_provider
+from app.generators.storyboard import compose_storyboard
+
+CANVAS = (540, 960)
+
+
+@pytest.fixture(autouse=True)
+def image_cache(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / "cache", max_bytes=64 * 1024 * 1024)
+    monkeypatch.setattr(image_pool, "image_cache", cache)
+    return cache
+
+
+def _img(path, color, size=(1200, 1200)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+def _storyboard(images):
+    beats = [{"id": b, "vo": f"{b} line"} for b in ("hook", "value", "proof", "cta")]
+    sb = compose_storyboard({"beats": beats}, {"title": "Hydra Bottle", "images": images})
+    sb["canvas"] = {"w": CANVAS[0], "h": CANVAS[1], "fps": 30}
+    return sb
+
+
+def _color(path):
+    # JPEG round-trip: compare to the nearest 50
+    return tuple(round(c / 50) * 50 for c in Image.open(path).getpixel((CANVAS[0] // 2, CANVAS[1] // 2)))
+
+
+def test_visual_specs_resolve_to_project_stock_then_nothing(tmp_path, image_cache):
+    hero = _img(tmp_path / "p" / "img_00.png", (200, 0, 0))
+    side = _img(tmp_path / "p" / "img_01.png", (0, 200, 0))
+    _img(tmp_path / "stock" / "happy_customer_reaction_lifestyle.png", (0, 0, 200))
+    _img(tmp_path / "stock" / "ocean_waves.png", (90, 90, 90))
+
+    sb = _storyboard(["https://cdn.example/hero.jpg"])
+    pool = image_pool.ImagePool([hero, side], stock_dir=tmp_path / "stock", canvas=CANVAS)
+    out = pool.resolve_scenes(sb["scenes"], [""] * len(sb["scenes"]))
+
+    # hook -> hero, value -> next project shot, proof -> stock by keywords, cta/endcard -> generated
+    assert [_color(p) if p else None for p in out] == [(200, 0, 0), (0, 200, 0), (0, 0, 200), None, None]
+    assert all(Image.open(p).size == CANVAS for p in out if p)
+    assert (pool.resolved, pool.missed) == (3, 2)
+
+    # same content again: served from the content-hash cache, no re-crop
+    again = image_pool.ImagePool([hero, side], stock_dir=tmp_path / "stock", canvas=CANVAS)
+    assert again.resolve_scenes(sb["scenes"], [""] * 5)[:3] == out[:3]
+    assert image_cache.stats()["hits"] == 3
+
+
+def test_prefer_never_reads_paths_outside_the_pool(tmp_path):
+    hero = _img(tmp_path / "p" / "hero.png", (200, 0, 0))
+    secret = _img(tmp_path / "elsewhere.png", (1, 2, 3))
+    pool = image_pool.ImagePool([hero], stock_dir=tmp_path / "none", canvas=CANVAS)
+    got = pool.resolve({"type": "image_or_stock", "prefer": str(secret)})
+    assert _color(got) == (200, 0, 0)
+
+
+def test_renderer_only_generates_images_the_pool_cannot_serve(tmp_path, monkeypatch):
+    from app.generators import video_ai
+
+    monkeypatch.setattr(video_ai, "EXPORT_DIR", tmp_path / "exports")
+    (tmp_path / "exports").mkdir()
+    stub = stub_provider(tmp_path / "stub", image_size=CANVAS, voice_s=0.3)
+    prompts = []
+
+    def image(prompt):
+        prompts.append(prompt)
+        return stub.image(prompt)
+
+    hero = _img(tmp_path / "p" / "img_00.png", (200, 0, 0))
+    result = video_ai.generate_ai_ad(
+        _storyboard([]),
+        "caption",
+        renderer="ffmpeg",
+        asset_provider=Provider("stub", stub.tts, image),
+        scene_images=[hero],
+    )
+    assert (result["images_from_pool"], result["images_generated"]) == (3, 2)
+    assert len(prompts) == 2
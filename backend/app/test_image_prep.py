@@ -0,0 +1,59 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageOps
+
+from app.utils.image_prep import CANVAS, _inspect, dedup, hamming, phash, prepare_images
+
+
+def _shot(seed: int, size) -> Image.Image:
+    """Deterministic 'product shot': gradient background plus a few shapes."""
+    rng = np.random.default_rng(seed)
+    w, h = 400, 400
+    grad = np.linspace(0, 255, w, dtype=np.float32)[None, :, None] * rng.uniform(0.3, 1.0, 3)
+    img = Image.fromarray(np.broadcast_to(grad, (h, w, 3)).astype(np.uint8))
+    d = ImageDraw.Draw(img)
+    for _ in range(6):
+        x0, y0 = rng.integers(0, 300, 2)
+        d.ellipse((x0, y0, x0 + rng.integers(40, 100), y0 + rng.integers(40, 100)), fill=tuple(rng.integers(0, 255, 3)))
+    return img.resize(size, Image.LANCZOS)
+
+
+def _bytes(img: Image.Image, fmt: str = "JPEG") -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=85)
+    return buf.getvalue()
+
+
+def test_phash_is_stable_across_sizes_and_formats():
+    a = phash(_shot(1, (1600, 1600)))
+    assert hamming(a, phash(Image.open(io.BytesIO(_bytes(_shot(1, (700, 700))))))) <= 4
+    assert hamming(a, phash(Image.open(io.BytesIO(_bytes(_shot(1, (1200, 1200)), "PNG"))))) <= 4
+    assert hamming(a, phash(_shot(2, (1600, 1600)))) > 16
+
+
+def test_dedup_keeps_best_rank_slot_and_largest_copy():
+    bodies = [_bytes(_shot(1, (800, 800))), _bytes(_shot(2, (1500, 2000))), _bytes(_shot(1, (1600, 1600)))]
+    kept = dedup([_inspect(i, b) for i, b in enumerate(bodies)])
+    assert [c.size for c in kept] == [(1600, 1600), (1500, 2000)]
+
+
+def test_prepare_images_dedups_filters_and_fits(tmp_path):
+    hero = _bytes(_shot(1, (1600, 1600)))
+    bodies = [
+        _bytes(_shot(1, (900, 900))),       # smaller copy of the hero, listed first
+        hero,
+        hero,                               # byte-identical
+        None,                               # failed download
+        b"<html>not an image</html>",
+        _bytes(_shot(3, (200, 200))),       # distinct but far too small for 1080x1920
+        _bytes(_shot(4, (1080, 1920)), "PNG"),
+    ]
+    paths = prepare_images(bodies, tmp_path, limit=6)
+
+    assert [p.name for p in paths] == ["img_00.jpg", "img_01.jpg"]
+    for p in paths:
+        assert Image.open(p).size == CANVAS
+    # the 900px copy alone needs >2x upscaling; the hero survives via its 1600px duplicate
+    assert hamming(phash(Image.open(paths[0])), phash(ImageOps.fit(_shot(1, (1600, 1600)), CANVAS))) <= 4
+    assert prepare_images(bodies, tmp_path / "one", limit=1)[0].name == "img_00.jpg"
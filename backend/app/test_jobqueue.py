@@ -0,0 +1,81 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import jobqueue
+from app.db import Base
+from app.models import Job, JobStatus
+
+
+@pytest.fixture()
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobqueue, "SQLITE_LOCK_PATH", tmp_path / "queue.lock")
+    engine = create_engine(f"sqlite:///{tmp_path / 'q.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, future=True)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_claim_is_fifo_and_exclusive(db):
+    a = jobqueue.enqueue(db, "ai-generate", {"n": 1})
+    b = jobqueue.enqueue(db, "ai-generate", {"n": 2})
+
+    first = jobqueue.claim_next(db, "w1")
+    second = jobqueue.claim_next(db, "w2")
+    assert (first.id, second.id) == (a.id, b.id)
+    assert first.status == JobStatus.running and first.attempts == 1
+    assert jobqueue.claim_next(db, "w3") is None
+
+
+def test_stale_running_jobs_are_requeued_then_failed(db, monkeypatch):
+    monkeypatch.setattr(jobqueue, "MAX_ATTEMPTS", 2)
+    job = jobqueue.enqueue(db, "assemble-variant", {"variant_id": 1})
+
+    for attempt in (1, 2):
+        claimed = jobqueue.claim_next(db, "w1")
+        assert claimed.id == job.id and claimed.attempts == attempt
+        claimed.heartbeat_at = jobqueue._utcnow() - timedelta(hours=1)
+        db.commit()
+        assert jobqueue.requeue_stale(db, stale_after_s=60) == 1
+
+    db.refresh(job)
+    assert job.status == JobStatus.failed
+
+
+def test_finish_records_result(db):
+    job = jobqueue.enqueue(db, "ai-generate", {})
+    jobqueue.claim_next(db, "w1")
+    jobqueue.finish(db, job.id, result={"url": "/exports/x.mp4"})
+    job = db.get(Job, job.id)
+    assert job.status == JobStatus.completed
+    assert job.progress == 1.0 and job.result_json == {"url": "/exports/x.mp4"}
+
+
+def test_embedded_worker_drains_the_queue(db, monkeypatch):
+    from app import progress, worker
+
+    Session = sessionmaker(bind=db.get_bind(), future=True)
+    for mod in (worker, progress):
+        monkeypatch.setattr(mod, "SessionLocal", Session)
+    monkeypatch.setitem(worker.TASKS, "echo", lambda payload, report: {"echo": payload["n"]})
+    job = jobqueue.enqueue(db, "echo", {"n": 7})
+
+    w = worker.start_embedded(concurrency=1)
+    try:
+        for _ in range(200):
+            db.expire_all()
+            if db.get(Job, job.id).status == JobStatus.completed:
+                break
+            time.sleep(0.05)
+    finally:
+        w.stop()
+        for t in threading.enumerate():
+            if t.name == "reelixx-worker":
+                t.join(timeout=10)
+    assert db.get(Job, job.id).result_json == {"echo": 7}
@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import jobqueue, models
+from app.db import Base, get_db
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture()
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'l.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, future=True)
+    factory.sql = []
+    event.listen(engine, "before_cursor_execute", lambda *a: factory.sql.append(a[2]))
+
+    def session():
+        with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    yield factory
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+
+def _seed(Session):
+    big = {"scenes": [{"text": "x" * 500}] * 20}
+    with Session() as db:
+        p = models.Project(title="Mug")
+        db.add(p)
+        db.flush()
+        db.add_all(models.Variant(project_id=p.id, tone=f"t{i}", status="ready", script_json=big,
+                                  storyboard_json=big) for i in range(5))
+        db.add_all(models.Job(project_id=p.id, kind="assemble-variant", status=s, payload=big, result_json=big)
+                   for s in (models.JobStatus.completed, models.JobStatus.failed, models.JobStatus.queued))
+        db.commit()
+        return p.id
+
+
+def test_variant_pages_never_read_blobs(Session):
+    pid = _seed(Session)
+    Session.sql.clear()
+
+    seen, before = [], None
+    while True:
+        params = {"limit": 2, **({"before": before} if before else {})}
+        page = client.get(f"/projects/{pid}/variants", params=params).json()
+        assert all(set(item) == {"id", "project_id", "status", "tone", "persona", "duration_s", "mp4_url"}
+                   for item in page["items"])
+        seen += [item["id"] for item in page["items"]]
+        before = page["next_before"]
+        if before is None:
+            break
+    assert seen == sorted(seen, reverse=True) and len(seen) == 5
+    assert not any("script_json" in s or "storyboard_json" in s for s in Session.sql)
+
+    assert client.get("/projects/999/variants").status_code == 404
+    assert client.get(f"/projects/{pid}/variants", params={"limit": 10_000}).status_code == 422
+    assert client.get("/projects/").json()["items"] == [{"id": pid, "title": "Mug", "product_url": None}]
+
+
+def test_job_list_filters_and_skips_payloads(Session):
+    pid = _seed(Session)
+    Session.sql.clear()
+    failed = client.get("/jobs/", params={"project_id": pid, "status": "failed"}).json()["items"]
+    assert [j["status"] for j in failed] == ["failed"]
+    assert len(client.get("/jobs/", params={"project_id": pid}).json()["items"]) == 3
+    assert not any("payload" in s or "result_json" in s for s in Session.sql)
+
+
+def test_job_log_is_capped(Session, monkeypatch):
+    monkeypatch.setattr(jobqueue, "LOG_MAX_CHARS", 50)
+    with Session() as db:
+        job = models.Job(kind="preview", status=models.JobStatus.running)
+        db.add(job)
+        db.commit()
+        for i in range(jobqueue.EVENTS_MAX + 30):
+            jobqueue.log_event(db, job.id, f"line {i}")
+        jobqueue.finish(db, job.id, error="boom " * 40)
+        db.commit()
+        count = db.scalar(select(func.count()).select_from(models.JobEvent).where(models.JobEvent.job_id == job.id))
+        job_id = job.id
+    assert count == jobqueue.EVENTS_MAX
+
+    body = client.get(f"/jobs/{job_id}").json()
+    assert body["status"] == "failed" and body["logs"].startswith("boom") and len(body["logs"]) == 50
@@ -0,0 +1,74 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app import jobqueue, migrations, models
+from app.db import make_engine
+
+
+def _indexes(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+
+def test_fresh_database_migrates_once(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'm.db'}")
+    assert migrations.pending(engine) == [(v, n) for v, n, _ in migrations.MIGRATIONS]
+    assert [v for v, _ in migrations.migrate(engine)] == [v for v, _, _ in migrations.MIGRATIONS]
+    assert migrations.migrate(engine) == [] and migrations.pending(engine) == []
+
+    assert {"projects", "variants", "jobs", "job_events"} <= set(inspect(engine).get_table_names())
+    assert {"ix_jobs_project_id_id", "ix_jobs_status_id"} <= _indexes(engine, "jobs")
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT * FROM variants WHERE project_id = 1 ORDER BY id DESC LIMIT 1"
+        )).all()
+    assert "ix_variants_project_id_id" in str(plan) and "TEMP B-TREE" not in str(plan)
+    engine.dispose()
+
+
+# schema of a database made by the old import-time create_all() (the committed reelixx.db)
+BASELINE = (
+    "CREATE TABLE users (id INTEGER NOT NULL, email VARCHAR(255), name VARCHAR(255), PRIMARY KEY (id))",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE TABLE projects (id INTEGER NOT NULL, user_id INTEGER, title VARCHAR(255), product_url TEXT, "
+    "brief_json JSON, brand_json JSON, PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))",
+    "CREATE INDEX ix_projects_id ON projects (id)",
+    "CREATE TABLE variants (id INTEGER NOT NULL, project_id INTEGER NOT NULL, tone VARCHAR(64), "
+    "persona VARCHAR(128), status VARCHAR(32), duration_s INTEGER, mp4_url TEXT, srt_url TEXT, post_text TEXT, "
+    "script_json JSON, storyboard_json JSON, PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES projects (id))",
+    "CREATE INDEX ix_variants_id ON variants (id)",
+    "CREATE TABLE jobs (id INTEGER NOT NULL, project_id INTEGER NOT NULL, kind VARCHAR(64) NOT NULL, "
+    "status VARCHAR(9) NOT NULL, logs TEXT, PRIMARY KEY (id), FOREIGN KEY(project_id) REFERENCES projects (id))",
+    "CREATE INDEX ix_jobs_id ON jobs (id)",
+)
+
+
+def test_legacy_database_is_brought_up_to_date(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for stmt in BASELINE:
+            conn.execute(text(stmt))
+        conn.execute(text("INSERT INTO projects (id, title) VALUES (1, 'kept')"))
+        conn.execute(text("INSERT INTO jobs (project_id, kind, status, logs) VALUES (1, 'preview', 'failed', :logs)"),
+                     {"logs": "x" * 10_000})
+
+    assert [v for v, _ in migrations.migrate(engine)] == [v for v, _, _ in migrations.MIGRATIONS]
+    assert "ix_variants_project_id_id" in _indexes(engine, "variants")
+    assert {"ix_jobs_id", "ix_jobs_project_id_id", "ix_jobs_status_id"} == _indexes(engine, "jobs")
+    columns = {c["name"]: c for c in inspect(engine).get_columns("jobs")}
+    assert set(columns) == {c.name for c in models.Job.__table__.columns}
+    assert columns["project_id"]["nullable"]
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT title FROM projects")).scalar() == "kept"
+        (data,) = conn.execute(text("SELECT data FROM job_events WHERE stage = 'log'")).scalars().all()
+    assert '"level": "error"' in data and len(data) < 2100  # capped at REELIXX_JOB_LOG_MAX_CHARS
+
+    # the queue works on the migrated table, including project-less /ai/* jobs
+    Session = sessionmaker(bind=engine, future=True)
+    with Session() as db:
+        old = db.get(models.Job, 1)
+        assert (old.project_id, old.status, old.attempts) == (1, models.JobStatus.failed, 0)
+        job_id = jobqueue.enqueue(db, "preview", {"prompt": "mug"}).id
+        assert jobqueue.claim_next(db, "w1").id == job_id
+    engine.dispose()
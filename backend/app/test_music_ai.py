@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from app.generators.music_ai import duck_gain, duck_params, sidechain_duck
+
+SR = 48000
+
+
+def _voice_with_gaps(seconds, sr=SR, seed=0):
+    """Noise 'speech' for 2 s, silence for 1 s, repeated; stereo float32."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    voice = rng.uniform(-0.3, 0.3, size=(n, 2)).astype(np.float32)
+    t = np.arange(n) / sr
+    voice[(t % 3.0) >= 2.0] = 0.0
+    return voice
+
+
+def test_music_is_ducked_only_while_voice_is_speaking():
+    voice = _voice_with_gaps(6.0)
+    gain = duck_gain(voice, SR, depth_db=-9.0, attack_ms=40, release_ms=300)
+    db = 20 * np.log10(gain)
+
+    assert db[int(1.0 * SR)] < -8.5             # mid-phrase: fully ducked
+    assert db[int(2.9 * SR)] > -0.1             # long after release: back to unity
+    # release ramps back up over ~300 ms instead of jumping
+    assert -8.5 < db[int(2.15 * SR)] < -0.5
+    # look-ahead attack: already on the way down just before the next phrase
+    assert -9.0 < db[int(2.98 * SR)] < -0.5
+    assert np.all(np.abs(np.diff(db)) < 0.1)     # no zipper steps between hops
+
+
+def test_duck_params_from_storyboard_flag():
+    assert duck_params(None) is None and duck_params(False) is None
+    assert duck_params(True) == {}
+    assert duck_params({"depth_db": -6, "bogus": 1}) == {"depth_db": -6.0}
+
+
+def test_sidechain_duck_60s_48k_stereo_is_milliseconds():
+    voice = _voice_with_gaps(60.0)
+    music = np.random.default_rng(1).uniform(-0.5, 0.5, size=voice.shape).astype(np.float32)
+
+    best = float("inf")
+    for _ in range(3):
+        t0 = time.perf_counter()
+        out = sidechain_duck(music, voice, SR)
+        best = min(best, time.perf_counter() - t0)
+
+    assert out.shape == music.shape and out.dtype == np.float32
+    assert best < 0.1, f"sidechain_duck took {best * 1000:.1f} ms for 60 s of 48 kHz stereo"
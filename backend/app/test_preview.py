@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from PIL import Image
+
+from app.diskcache import DiskCache
+from app.generators import tts_cache, video_ai
+from app.generators.asset_stage import Provider, stub_provider
+from app.generators.preview import preview_format
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_ai, "EXPORT_DIR", tmp_path / "exports")
+    monkeypatch.setattr(tts_cache, "tts_cache", DiskCache(tmp_path / "tts", max_bytes=1 << 26))
+    (tmp_path / "exports").mkdir()
+
+
+def _storyboard(n=5):
+    return {
+        "canvas": {"w": 1080, "h": 1920, "fps": 30},
+        "scenes": [{"text": f"Scene {i}", "visual": {"type": "endcard"}} for i in range(n)],
+        "exports": [{"preset": "vertical_1080p"}, {"preset": "square_1080"}],
+    }
+
+
+def _provider(tmp_path, calls):
+    stub = stub_provider(tmp_path / "stub", voice_s=0.5)
+
+    def paid_image(prompt):
+        calls.append(prompt)
+        return stub.image(prompt)
+
+    return Provider("stub", stub.tts, paid_image)
+
+
+def test_preview_format_values():
+    assert preview_format(None) is None and preview_format(False) is None
+    assert preview_format(True) == "mp4" and preview_format("WebP") == "webp"
+    with pytest.raises(ValueError):
+        preview_format("gif")
+
+
+def test_mp4_preview_is_small_fast_and_local(tmp_path):
+    from moviepy.editor import VideoFileClip
+
+    calls = []
+    t0 = time.perf_counter()
+    out = video_ai.generate_ai_ad(
+        _storyboard(), "", renderer="ffmpeg", asset_provider=_provider(tmp_path, calls), preview="mp4"
+    )
+    assert time.perf_counter() - t0 < 5 * 1.0  # well under a second per scene
+    assert calls == []  # the provider's image backend is never called
+    assert [e["preset"] for e in out["exports"]] == ["preview_360p"]
+
+    clip = VideoFileClip(out["path"])
+    try:
+        assert clip.size == [360, 640]
+        assert clip.fps == 12
+        assert clip.duration == pytest.approx(2.5, abs=0.2)
+    finally:
+        clip.close()
+
+
+def test_webp_and_sprite_previews(tmp_path):
+    provider = _provider(tmp_path, [])
+    webp = video_ai.generate_ai_ad(_storyboard(3), "", asset_provider=provider, preview="webp")
+    with Image.open(webp["path"]) as im:
+        assert im.format == "WEBP" and im.n_frames == 3 and im.size == (360, 640)
+    assert [s["start"] for s in webp["scenes"]] == [0.0, 0.5, 1.0]
+
+    sprite = video_ai.generate_ai_ad(_storyboard(7), "", asset_provider=provider, preview="sprite")
+    assert sprite["sprite"] == {"cols": 5, "rows": 2, "tile": [180, 320]}
+    with Image.open(sprite["path"]) as im:
+        assert im.size == (900, 640)
+
+
+def test_preview_voice_is_cached_line_or_silence(tmp_path):
+    line = tts_cache.cached_speech("Hello there", "alloy", video_ai.TTS_MODEL, lambda p: p.write_bytes(b"mp3"))
+    assert video_ai.preview_tts("Hello  there") == line
+    silent = video_ai.preview_tts("Never synthesized")
+    assert silent != line and silent.exists()
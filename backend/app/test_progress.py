@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models, progress
+from app.db import Base
+from app.generators.export_profiles import ExportProfile
+from app.generators.ffmpeg_render import render_exports
+from app.routers import jobs as jobs_router
+
+
+@pytest.fixture()
+def Session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'p.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(progress, "SessionLocal", factory)
+    monkeypatch.setattr(jobs_router, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def _job(Session, status=models.JobStatus.running):
+    with Session() as db:
+        job = models.Job(kind="ai-generate", status=status, progress=0.0)
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def _events(Session, job_id):
+    with Session() as db:
+        return db.execute(
+            select(models.JobEvent).where(models.JobEvent.job_id == job_id).order_by(models.JobEvent.id)
+        ).scalars().all()
+
+
+def test_job_progress_is_throttled_and_monotonic(Session):
+    job_id = _job(Session)
+    events = []
+    reporter = progress.JobProgress(job_id, interval_s=60)
+    prog = progress.Progress(lambda e: (events.append(e), reporter(e)), scenes=4)
+
+    done = prog.assets(8)
+    for i in range(8):
+        done("tts" if i % 2 else "images", i // 2)
+    prog("mix", 100)
+    encode = prog.encoder()
+    for pct in range(1, 60):
+        encode(float(pct), 10.0, None)
+    reporter(0.05)  # a late legacy float must not move progress backwards
+    reporter.flush()
+
+    assert len(events) == 8 + 1 + 59
+    rows = _events(Session, job_id)
+    # first asset, assets at 100%, mix, first encode, the legacy float
+    assert [r.stage for r in rows] == ["images", "tts", "mix", "encode", "job"]
+    assert rows[1].data["percent"] == 100.0 and rows[1].data["scenes"] == 4
+    assert rows[3].data["eta_s"] == 10.0
+    assert [r.progress for r in rows] == sorted(r.progress for r in rows)
+    with Session() as db:
+        assert db.get(models.Job, job_id).progress == rows[-1].progress
+
+
+def test_ffmpeg_progress_comes_from_the_encoder(tmp_path):
+    slides = []
+    for i in range(3):
+        p = tmp_path / f"s{i}.png"
+        Image.new("RGB", (90, 160), (60 * i, 0, 0)).save(p)
+        slides.append((p, 0.5))
+    seen = []
+    render_exports(
+        slides, None, [(ExportProfile("t", (90, 160), preset="ultrafast"), tmp_path / "o.mp4")], fps=10,
+        on_progress=lambda pct, eta, scene: seen.append(pct),
+    )
+    assert seen and seen[-1] == 100.0
+    assert seen == sorted(seen)
+
+
+def test_sse_stream_replays_events_and_ends(Session):
+    from app.main import app
+
+    job_id = _job(Session)
+    reporter = progress.JobProgress(job_id, interval_s=0)
+    prog = progress.Progress(reporter, scenes=2)
+    prog("mix", 100)
+    prog.encoder()(50.0, 3.0, None)
+    with Session() as db:
+        job = db.get(models.Job, job_id)
+        job.status, job.result_json = models.JobStatus.completed, {"ok": True}
+        db.commit()
+
+    client = TestClient(app)
+    r = client.get(f"/jobs/{job_id}/events")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/event-stream")
+    assert r.text.count("event: progress") == 2
+    assert '"stage": "encode"' in r.text and "event: done" in r.text and '"ok": true' in r.text
+
+    first = _events(Session, job_id)[0].id
+    resumed = client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": str(first)})
+    assert resumed.text.count("event: progress") == 1
+
+    assert client.get("/jobs/999999/events").status_code == 404
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models, render_cache
+from app.db import Base
+from app.models import RenderCache
+
+
+@pytest.fixture()
+def Session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, future=True)
+    monkeypatch.setattr(render_cache, "SessionLocal", factory)
+    monkeypatch.setattr(render_cache, "EXPORT_DIR", tmp_path / "exports")
+    monkeypatch.setattr(render_cache, "ENABLED", True)
+    (tmp_path / "exports").mkdir()
+    yield factory
+    engine.dispose()
+
+
+def _key(**over):
+    args = dict(
+        storyboard={"scenes": [{"start": 0, "end": 2.5, "text": "Hi"}], "canvas": {"w": 1080, "h": 1920}},
+        caption="Buy now", brand_color="#111111", music_mood="upbeat", voice="alloy", renderer="moviepy",
+    )
+    args.update(over)
+    return render_cache.render_key(**args)
+
+
+def _render(exports, calls, name="ad_1.mp4"):
+    def render():
+        calls.append(name)
+        (exports / name).write_bytes(b"mp4")
+        return {"filename": name, "url": f"/exports/{name}", "renderer": "moviepy"}
+    return render
+
+
+def test_key_is_canonical_and_covers_inputs(tmp_path):
+    same = _key(storyboard={"canvas": {"h": 1920.0, "w": 1080}, "scenes": [{"text": "Hi", "end": 2.5, "start": 0.0}]})
+    assert same == _key()
+    assert _key(brand_color=" #111111 ") == _key()
+    assert _key(caption="Buy today") != _key()
+    assert _key(renderer="ffmpeg") != _key()
+
+    img = tmp_path / "a.jpg"
+    img.write_bytes(b"one")
+    before = _key(images=[img])
+    img.write_bytes(b"two")
+    assert _key(images=[img]) != before
+
+
+def test_second_render_is_a_hit(Session):
+    calls = []
+    exports = render_cache.EXPORT_DIR
+    first = render_cache.get_or_render(_key(), _render(exports, calls))
+    second = render_cache.get_or_render(_key(), _render(exports, calls, "ad_2.mp4"))
+
+    assert calls == ["ad_1.mp4"]
+    assert first["cache_hit"] is False and second["cache_hit"] is True
+    assert second["filename"] == "ad_1.mp4" and second["url"] == "/exports/ad_1.mp4"
+
+    # output gone from disk: render again instead of returning a dead link
+    (exports / "ad_1.mp4").unlink()
+    third = render_cache.get_or_render(_key(), _render(exports, calls, "ad_3.mp4"))
+    assert third["cache_hit"] is False and calls[-1] == "ad_3.mp4"
+
+
+def test_cleanup_keeps_outputs_linked_to_variants(Session):
+    exports = render_cache.EXPORT_DIR
+    k1, k2 = _key(caption="one"), _key(caption="two")
+    render_cache.get_or_render(k1, _render(exports, [], "one.mp4"))
+    render_cache.get_or_render(k2, _render(exports, [], "two.mp4"))
+
+    with Session() as db:
+        project = models.Project(title="p")
+        db.add(project)
+        db.flush()
+        variant = models.Variant(project_id=project.id)
+        db.add(variant)
+        db.commit()
+
+        render_cache.link_variant(db, variant.id, k1)
+        render_cache.link_variant(db, variant.id, k1)  # re-link is a no-op
+        for row in db.query(RenderCache):
+            row.last_used_at = render_cache._utcnow() - timedelta(days=30)
+        db.commit()
+
+        assert db.query(RenderCache).filter_by(key=k1).one().refcount == 1
+        assert render_cache.cleanup(db, max_age_hours=1) == [k2]
+        assert (exports / "one.mp4").is_file() and not (exports / "two.mp4").exists()
+
+        # the variant moves on to a new render: the old one becomes collectable
+        k3 = _key(caption="three")
+        render_cache.get_or_render(k3, _render(exports, [], "three.mp4"))
+        render_cache.link_variant(db, variant.id, k3)
+        db.query(RenderCache).filter_by(key=k1).one().last_used_at -= timedelta(days=30)
+        db.commit()
+        assert render_cache.cleanup(db, max_age_hours=1) == [k1]
+        assert render_cache.stats(db)["referenced"] == 1
+
+
+def test_worker_runs_cleanup_periodically(Session, monkeypatch):
+    from app import jobqueue, worker
+
+    exports = render_cache.EXPORT_DIR
+    render_cache.get_or_render(_key(caption="old"), _render(exports, [], "old.mp4"))
+    with Session() as db:
+        row = db.query(RenderCache).one()
+        row.last_used_at -= timedelta(days=30)
+        row.s3_key = None
+        db.commit()
+
+    swept = []
+    monkeypatch.setattr(worker, "SessionLocal", Session)
+    monkeypatch.setattr(worker, "S3_MAX_AGE_H", 12)
+    monkeypatch.setattr(jobqueue, "SQLITE_LOCK_PATH", exports / "queue.lock")
+    monkeypatch.setattr(worker.storage, "cleanup_old_files", lambda hours, keep: swept.append((hours, keep)))
+
+    w = worker.Worker(concurrency=1)
+    w._tick(pool=None)
+    w._tick(pool=None)  # within REELIXX_CLEANUP_S: no second pass
+    assert not (exports / "old.mp4").exists()
+    assert swept == [(12, set())]
+    with Session() as db:
+        assert render_cache.stats(db)["entries"] == 0
+
+
+def test_cleanup_keeps_files_shared_with_a_referenced_key(Session):
+    exports = render_cache.EXPORT_DIR
+    (exports / "shared.mp4").write_bytes(b"mp4")
+    # a batch plan deduped two storyboards (different keys) onto one final
+    with Session() as db:
+        project = models.Project(title="p")
+        db.add(project)
+        db.flush()
+        variant = models.Variant(project_id=project.id)
+        db.add(variant)
+        db.commit()
+        for key in ("k-old", "k-live"):
+            render_cache.store(db, key, {"filename": "shared.mp4", "url": "/exports/shared.mp4"})
+        render_cache.link_variant(db, variant.id, "k-live")
+        for row in db.query(RenderCache):
+            row.last_used_at = render_cache._utcnow() - timedelta(days=30)
+        db.commit()
+
+        assert render_cache.cleanup(db, max_age_hours=1) == ["k-old"]
+        assert (exports / "shared.mp4").is_file()
+        assert render_cache.lookup(db, "k-live")["filename"] == "shared.mp4"
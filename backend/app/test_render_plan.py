@@ -0,0 +1,100 @@
+import pytest
+from PIL import Image
+
+from app.diskcache import DiskCache
+from app.generators import image_pool, render_plan
+from app.generators.asset_stage import Provider, stub_provider
+from app.generators.export_profiles import ExportProfile
+
+PROFILE = ExportProfile("t", (90, 160), preset="ultrafast")
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_plan, "segment_cache", DiskCache(tmp_path / "segments", max_bytes=1 << 26))
+    monkeypatch.setattr(image_pool, "image_cache", DiskCache(tmp_path / "images", max_bytes=1 << 26))
+
+
+def _provider(tmp_path, calls):
+    stub = stub_provider(tmp_path / "stub", voice_s=0.3, image_size=(90, 160))
+
+    def tts(text, voice):
+        calls.append(("tts", text))
+        return stub.tts(text, voice)
+
+    def image(prompt):
+        calls.append(("image", prompt))
+        return stub.image(prompt)
+
+    return Provider("stub", tts, image)
+
+
+def _storyboard(hook):
+    return {
+        "canvas": {"w": 90, "h": 160, "fps": 10},
+        "scenes": [{"text": hook, "visual": {"type": "stock", "query": "zzqx"}},
+                   {"text": "Buy now", "visual": {"type": "endcard"}}],
+    }
+
+
+def test_shared_assets_run_once(tmp_path):
+    endcard = tmp_path / "endcard.png"
+    Image.new("RGB", (90, 160), (200, 40, 40)).save(endcard)
+    calls = []
+    plan = render_plan.RenderPlan(_provider(tmp_path, calls), profile=PROFILE, out_dir=tmp_path, workers=3)
+    for hook in ("Hot coffee", "Cold brew", "Hot coffee"):
+        plan.add(_storyboard(hook), endcard=endcard)
+    plan.run()
+
+    # three distinct voice lines, two generated hooks (the end card is a file)
+    assert sorted(calls) == [("image", "Cold brew"), ("image", "Hot coffee"),
+                             ("tts", "Buy now"), ("tts", "Cold brew"), ("tts", "Hot coffee")]
+    report = plan.report()
+    assert {k: v["nodes"] for k, v in report["by_kind"].items()} == {
+        "tts": 3, "image": 2, "segment": 3, "mix": 2, "final": 2}
+    assert report["requested"] == 21 and report["reused"] == 9
+    assert report["saved_s"] > 0 and report["by_kind"]["segment"]["reused"] == 3
+
+    first, second, third = (r["t"] for r in plan.results())
+    assert first == third and first != second
+    assert first.stat().st_size > 0 and second.stat().st_size > 0
+    assert not list(tmp_path.glob("*.wav"))  # mixes are cleaned up
+
+
+def test_failure_stops_the_plan(tmp_path):
+    def broken(prompt):
+        raise RuntimeError("image backend down")
+
+    stub = stub_provider(tmp_path / "stub", voice_s=0.3)
+    plan = render_plan.RenderPlan(Provider("stub", stub.tts, broken), profile=PROFILE, out_dir=tmp_path)
+    plan.add(_storyboard("Hot coffee"))
+    with pytest.raises(RuntimeError, match="backend down"):
+        plan.run()
+    assert not list(tmp_path.glob("*.mp4"))
+
+
+def test_shared_finals_upload_once(tmp_path, monkeypatch):
+    from app.generators import video_ai
+
+    uploads = []
+
+    def upload(path, key):
+        assert path.exists()
+        uploads.append(key)
+        return f"https://bucket.s3.amazonaws.com/{key}"
+
+    monkeypatch.setattr(video_ai, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(video_ai.storage, "use_s3", True)
+    monkeypatch.setattr(video_ai.storage, "save_file_from_path", upload)
+    stub = stub_provider(tmp_path / "stub", voice_s=0.3, image_size=(90, 160))
+    out = video_ai.render_storyboards([{"storyboard": _storyboard("Hot coffee")}] * 3 +
+                                      [{"storyboard": _storyboard("Cold brew")}],
+                                      music_mood=None, asset_provider=stub)
+
+    assert len(uploads) == 2
+    urls = [ad["url"] for ad in out["ads"]]
+    assert urls[0] == urls[1] == urls[2] != urls[3]
+    assert all(ad["exports"][0]["bytes"] > 0 for ad in out["ads"])
+    # scene timing as rendered (the stub's 0.3 s voice lines), for the captions
+    assert [s["duration"] for s in out["ads"][0]["scenes"]] == pytest.approx([0.3, 0.3], abs=0.01)
+    assert not list(tmp_path.glob("*.mp4"))  # local copies dropped after upload
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from PIL import Image
+
+from app.diskcache import DiskCache
+from app.generators import image_pool, segment_render, video_ai
+from app.generators.asset_stage import Provider, stub_provider
+
+CANVAS = (180, 320)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(segment_render, "segment_cache", DiskCache(tmp_path / "segments", max_bytes=64 * 1024 * 1024))
+    monkeypatch.setattr(image_pool, "image_cache", DiskCache(tmp_path / "images", max_bytes=64 * 1024 * 1024))
+    monkeypatch.setattr(video_ai, "EXPORT_DIR", tmp_path / "exports")
+    (tmp_path / "exports").mkdir()
+
+
+def _storyboard(texts):
+    return {
+        "canvas": {"w": CANVAS[0], "h": CANVAS[1], "fps": 30},
+        "scenes": [{"text": t, "visual": {"type": "endcard"}} for t in texts],
+    }
+
+
+def _render(tmp_path, texts):
+    stub = stub_provider(tmp_path / "stub", voice_s=0.4)
+    # local slides are a pure function of their text, like cached pool images
+    provider = Provider("stub", stub.tts, lambda p: video_ai.local_scene_image(p, "#222222", CANVAS))
+    return video_ai.generate_ai_ad(_storyboard(texts), "", renderer="segments", asset_provider=provider)
+
+
+def test_editing_one_scene_reencodes_only_that_segment(tmp_path):
+    from moviepy.editor import VideoFileClip
+
+    texts = ["Hook", "Value", "Proof", "Offer", "Buy now"]
+    first = _render(tmp_path, texts)
+    assert first["segments_encoded"] == [0, 1, 2, 3, 4]
+
+    texts[2] = "Proof, rewritten"
+    second = _render(tmp_path, texts)
+    assert second["segments_encoded"] == [2]
+    assert second["segments_reused"] == 4
+
+    clip = VideoFileClip(second["path"])
+    try:
+        assert clip.size == list(CANVAS)
+        assert clip.audio is not None
+        assert clip.duration == pytest.approx(5 * 0.4, abs=0.1)
+    finally:
+        clip.close()
+
+
+def test_paid_style_images_are_keyed_on_scene_inputs(tmp_path):
+    # like gpt-image-1: a new, different image for every call with the same prompt
+    calls = []
+
+    def noisy_image(prompt):
+        calls.append(prompt)
+        out = tmp_path / f"gen_{len(calls)}.png"
+        Image.frombytes("RGB", CANVAS, os.urandom(CANVAS[0] * CANVAS[1] * 3)).save(out)
+        return out
+
+    stub = stub_provider(tmp_path / "stub", voice_s=0.4)
+    provider = Provider("noisy", stub.tts, noisy_image)
+    texts = ["Hook", "Value", "Offer"]
+    first = video_ai.generate_ai_ad(_storyboard(texts), "", renderer="segments", asset_provider=provider)
+    assert first["segments_encoded"] == [0, 1, 2] and len(calls) == 3
+
+    texts[1] = "Value, rewritten"
+    second = video_ai.generate_ai_ad(_storyboard(texts), "", renderer="segments", asset_provider=provider)
+    assert calls[3:] == ["Value, rewritten"]
+    assert second["segments_encoded"] == [1] and second["segments_reused"] == 2
+
+
+def test_segment_frames_cover_the_scene_audio():
+    assert segment_render.frames_for(0.4, 30) == 12
+    assert segment_render.frames_for(0.41, 30) == 13
+    assert segment_render.frames_for(0.0, 30) == 1
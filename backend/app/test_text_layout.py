@@ -0,0 +1,57 @@
+from PIL import Image, ImageDraw
+
+from app.generators.fonts import get_font
+from app.generators.text_layout import ELLIPSIS, fit_text, layout_text, metrics_for
+
+TEXT = "Keeps drinks cold for 24 hours with a leak-proof lid that survives every hike and gym session"
+
+
+def test_memoized_widths_match_pillow():
+    font = get_font(64)
+    m = metrics_for(font)
+    for s in ("AVATAR Toyota", "Keeps drinks cold", "WAVE • 24h →"):
+        assert abs(m.width(s, font) - font.getlength(s)) < 1.0
+
+
+def test_wrap_is_greedy_and_every_line_fits():
+    font = get_font(64)
+    draw = ImageDraw.Draw(Image.new("RGB", (10, 10)))
+    lay = layout_text(TEXT, font, 600)
+
+    assert " ".join(lay.lines) == TEXT
+    for i, line in enumerate(lay.lines):
+        assert draw.textlength(line, font=font) <= 600 + 1
+        if i + 1 < len(lay.lines):
+            # the next word would not have fit (greedy)
+            nxt = lay.lines[i + 1].split()[0]
+            assert draw.textlength(f"{line} {nxt}", font=font) > 600
+
+
+def test_max_lines_truncates_with_ellipsis():
+    font = get_font(64)
+    lay = layout_text(TEXT, font, 600, max_lines=2)
+    assert lay.truncated and len(lay.lines) == 2
+    assert lay.lines[-1].endswith(ELLIPSIS)
+    assert max(lay.widths) <= 600
+
+
+def test_long_word_is_broken_by_character():
+    font = get_font(64)
+    lay = layout_text("Supercalifragilisticexpialidocious", font, 300)
+    assert len(lay.lines) > 1 and "".join(lay.lines) == "Supercalifragilisticexpialidocious"
+    assert max(lay.widths) <= 300
+
+
+def test_fit_text_picks_largest_size_that_fits():
+    lay = fit_text(TEXT, 800, 400, max_size=120, min_size=12, max_lines=4)
+    assert not lay.truncated and lay.height <= 400 and lay.width <= 800
+    size = lay.font.size
+    bigger = layout_text(TEXT, get_font(size + 1), 800, max_lines=4)
+    assert bigger.truncated or bigger.height > 400
+
+
+def test_layout_draws_onto_image():
+    img = Image.new("RGB", (400, 200), (0, 0, 0))
+    lay = layout_text("Hello there", get_font(40), 380)
+    lay.draw(ImageDraw.Draw(img), (200, 100), anchor="mm", shadow=(2, (50, 50, 50)))
+    assert img.getbbox() is not None
@@ -0,0 +1,156 @@
+# backend/app/utils/fetch.py
+"""
+Async HTTP layer for scraping.
+
+One pooled httpx.AsyncClient per event loop (keep-alive; HTTP/2 when the `h2`
+package is installed), a per-host concurrency cap shared by every caller on
+that loop, bodies streamed with a hard size limit, and an overall deadline
+for batch downloads.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import weakref
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+TIMEOUT_S = float(os.getenv("REELIXX_SCRAPE_TIMEOUT_S", "15"))
+DEADLINE_S = float(os.getenv("REELIXX_SCRAPE_DEADLINE_S", "30"))
+PER_HOST = int(os.getenv("REELIXX_SCRAPE_PER_HOST", "4"))
+MAX_CONNECTIONS = int(os.getenv("REELIXX_SCRAPE_MAX_CONNECTIONS", "32"))
+MAX_PAGE_BYTES = int(float(os.getenv("REELIXX_SCRAPE_MAX_PAGE_MB", "5")) * 1024 * 1024)
+MAX_IMAGE_BYTES = int(float(os.getenv("REELIXX_SCRAPE_MAX_IMAGE_MB", "15")) * 1024 * 1024)
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/126.0 Safari/537.36"
+    ),
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+class TooLarge(Exception):
+    """Body exceeded the caller's byte limit."""
+
+
+class _LoopState:
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            http2=HTTP2,
+            follow_redirects=True,
+            timeout=httpx.Timeout(TIMEOUT_S, connect=min(TIMEOUT_S, 5.0)),
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        sem = self.hosts.get(host)
+        if sem is None:
+            sem = self.hosts[host] = asyncio.Semaphore(PER_HOST)
+        return sem
+
+
+# clients are bound to the loop that created them
+_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    st = _states.get(loop)
+    if st is None or st.client.is_closed:
+        st = _states[loop] = _LoopState()
+    return st
+
+
+async def aclose() -> None:
+    """Close this loop's client (app shutdown)."""
+    st = _states.pop(asyncio.get_running_loop(), None)
+    if st is not None:
+        await st.client.aclose()
+
+
+async def fetch(
+    url: str,
+    *,
+    max_bytes: int = MAX_PAGE_BYTES,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[bytes, httpx.Response]:
+    """
+    GET `url` under the per-host cap and return (body, response). A 304 (for
+    conditional `headers`) comes back with an empty body. Raises
+    httpx.HTTPStatusError on other non-2xx and TooLarge past max_bytes.
+    """
+    st = _state()
+    async with st.host_slot(url):
+        async with st.client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304:
+                return b"", resp
+            resp.raise_for_status()
+            declared = resp.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise TooLarge(f"{url}: {declared} bytes > {max_bytes}")
+            chunks: List[bytes] = []
+            size = 0
+            async for chunk in resp.aiter_bytes():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise TooLarge(f"{url}: more than {max_bytes} bytes")
+                chunks.append(chunk)
+    return b"".join(chunks), resp
+
+
+async def fetch_page(
+    url: str,
+    *,
+    max_bytes: int = MAX_PAGE_BYTES,
+    deadline_s: float = DEADLINE_S,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    HTML body plus the declared charset (None lets the parser sniff it). The
+    client timeout is per read, so a slow-drip server is cut off by the
+    overall deadline instead (asyncio.TimeoutError).
+    """
+    body, resp = await asyncio.wait_for(fetch(url, max_bytes=max_bytes), deadline_s)
+    return body, resp.charset_encoding
+
+
+async def fetch_many(
+    urls: Sequence[str],
+    *,
+    max_bytes: int = MAX_IMAGE_BYTES,
+    deadline_s: float = DEADLINE_S,
+) -> List[Optional[bytes]]:
+    """
+    Fetch every URL concurrently (still bounded per host). Results are in input
+    order; failures, oversized bodies and anything unfinished at the deadline
+    come back as None.
+    """
+    async def _one(u: str) -> Optional[bytes]:
+        try:
+            body, resp = await fetch(u, max_bytes=max_bytes)
+            return body or None
+        except (httpx.HTTPError, httpx.InvalidURL, TooLarge):
+            return None
+
+    tasks = [asyncio.ensure_future(_one(u)) for u in urls]
+    if not tasks:
+        return []
+    await asyncio.wait(tasks, timeout=deadline_s)
+    out: List[Optional[bytes]] = []
+    for t in tasks:
+        if t.done() and not t.cancelled():
+            out.append(t.result())
+        else:
+            t.cancel()
+            out.append(None)
+    return out
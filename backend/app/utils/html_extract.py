@@ -0,0 +1,299 @@
+# backend/app/utils/html_extract.py
+"""
+HTML extraction engine for the scrapers.
+
+Pages are parsed with lxml when it is installed (C parser, compiled XPath)
+and with BeautifulSoup's html.parser otherwise; REELIXX_HTML_PARSER=html.parser
+forces the fallback. Both engines expose the same small Document surface
+(metas, title, JSON-LD blocks, images, candidate bullet lists, first <p>), so
+the field logic in utils_scrape / image_scrape / ai_auto is written once and
+gives the same answers on either engine.
+
+Work is targeted rather than whole-tree: metas/title/JSON-LD are collected in
+one pass, bullet selectors are evaluated lazily in priority order and stop as
+soon as enough bullets are found, and `head_document` parses only up to
+</head> for callers that need nothing else.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+try:
+    import lxml.etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+ENGINE = os.getenv("REELIXX_HTML_PARSER", "lxml").strip().lower()
+
+# priority order of the bullet containers (same as the original CSS selectors)
+BULLET_SELECTORS = [
+    ".features ul",
+    ".feature-list ul",
+    ".specs ul",
+    ".specifications ul",
+    "ul[role='list']",
+    "ul",
+]
+
+_WS = re.compile(r"\s+")
+_HEAD_END = re.compile(rb"</head\s*>", re.I)
+_HEAD_END_STR = re.compile(r"</head\s*>", re.I)
+_SKIP_TEXT = {"script", "style"}
+
+Meta = Tuple[Optional[str], Optional[str], Optional[str]]  # (property, name, content)
+Img = Tuple[str, str]                                       # (src, data-src)
+
+
+def collapse(s: str) -> str:
+    return _WS.sub(" ", s or "").strip()
+
+
+def engine() -> str:
+    return "lxml" if ENGINE == "lxml" and HAS_LXML else "html.parser"
+
+
+class Document(ABC):
+    """Engine-neutral view of a parsed page."""
+
+    @abstractmethod
+    def metas(self) -> List[Meta]:
+        ...
+
+    @abstractmethod
+    def title(self) -> Optional[str]:
+        """Raw text of the first <title>, None when there is none."""
+
+    @abstractmethod
+    def jsonld(self) -> List[str]:
+        """Bodies of <script type="application/ld+json"> blocks."""
+
+    @abstractmethod
+    def images(self) -> List[Img]:
+        ...
+
+    @abstractmethod
+    def bullet_lists(self) -> Iterator[List[str]]:
+        """<li> texts of each candidate list, in BULLET_SELECTORS order."""
+
+    @abstractmethod
+    def first_paragraph(self) -> Optional[str]:
+        ...
+
+    # shared lookups
+
+    def meta(self, *names: str) -> str:
+        """
+        First non-empty content among `names`; per name the first
+        meta[property] wins over meta[name], even when it is empty.
+        """
+        metas = self.metas()
+        for n in names:
+            found = next((m for m in metas if m[0] == n), None) or next((m for m in metas if m[1] == n), None)
+            if found:
+                val = (found[2] or "").strip()
+                if val:
+                    return val
+        return ""
+
+    def meta_all(self, prop: str) -> List[str]:
+        return [(m[2] or "").strip() for m in self.metas() if m[0] == prop]
+
+
+class SoupDocument(Document):
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self._metas: Optional[List[Meta]] = None
+
+    @staticmethod
+    def _text(el) -> str:
+        return collapse(el.get_text(" ", strip=True) if el else "")
+
+    def metas(self) -> List[Meta]:
+        if self._metas is None:
+            self._metas = [(t.get("property"), t.get("name"), t.get("content")) for t in self.soup.find_all("meta")]
+        return self._metas
+
+    def title(self) -> Optional[str]:
+        return self.soup.title.text if self.soup.title else None
+
+    def jsonld(self) -> List[str]:
+        return [t.string or "" for t in self.soup.find_all("script", {"type": "application/ld+json"})]
+
+    def images(self) -> List[Img]:
+        return [((img.get("src") or ""), (img.get("data-src") or "")) for img in self.soup.find_all("img")]
+
+    def bullet_lists(self) -> Iterator[List[str]]:
+        for sel in BULLET_SELECTORS:
+            for ul in self.soup.select(sel):
+                yield [self._text(li) for li in ul.find_all("li")]
+
+    def first_paragraph(self) -> Optional[str]:
+        p = self.soup.find("p")
+        return self._text(p) if p else None
+
+
+if HAS_LXML:
+    def _class_xpath(cls: str) -> str:
+        return f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]//ul"
+
+    _BULLET_XPATHS = [
+        lxml.etree.XPath(_class_xpath("features")),
+        lxml.etree.XPath(_class_xpath("feature-list")),
+        lxml.etree.XPath(_class_xpath("specs")),
+        lxml.etree.XPath(_class_xpath("specifications")),
+        lxml.etree.XPath("//ul[@role='list']"),
+        lxml.etree.XPath("//ul"),
+    ]
+
+
+class LxmlDocument(Document):
+    def __init__(self, root):
+        self.root = root
+        self._metas: Optional[List[Meta]] = None
+
+    @staticmethod
+    def _text(el) -> str:
+        # get_text(" ", strip=True) semantics: no comments, no script/style bodies
+        parts: List[str] = []
+
+        def walk(node) -> None:
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+                    walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+
+        walk(el)
+        return collapse(" ".join(s.strip() for s in parts if s.strip()))
+
+    def metas(self) -> List[Meta]:
+        if self._metas is None:
+            self._metas = [(m.get("property"), m.get("name"), m.get("content")) for m in self.root.iter("meta")]
+        return self._metas
+
+    def title(self) -> Optional[str]:
+        el = next(self.root.iter("title"), None)
+        return el.text_content() if el is not None else None
+
+    def jsonld(self) -> List[str]:
+        return [s.text or "" for s in self.root.iter("script") if s.get("type") == "application/ld+json"]
+
+    def images(self) -> List[Img]:
+        return [((img.get("src") or ""), (img.get("data-src") or "")) for img in self.root.iter("img")]
+
+    def bullet_lists(self) -> Iterator[List[str]]:
+        for xp in _BULLET_XPATHS:
+            for ul in xp(self.root):
+                yield [self._text(li) for li in ul.iter("li")]
+
+    def first_paragraph(self) -> Optional[str]:
+        p = next(self.root.iter("p"), None)
+        return self._text(p) if p is not None else None
+
+
+def parse(html: bytes | str, encoding: Optional[str] = None, *, engine_name: Optional[str] = None) -> Document:
+    """Parse a page with the configured engine (or `engine_name`)."""
+    use = engine_name or engine()
+    if use == "lxml" and HAS_LXML:
+        if isinstance(html, bytes):
+            # decode exactly like BeautifulSoup would, so both engines see the same text
+            html = UnicodeDammit(html, [encoding] if encoding else [], is_html=True).unicode_markup or ""
+        try:
+            return LxmlDocument(lxml.html.document_fromstring(html))
+        except (lxml.etree.ParserError, ValueError):
+            pass
+    return SoupDocument(
+        BeautifulSoup(html, "html.parser", from_encoding=encoding if isinstance(html, bytes) else None)
+    )
+
+
+def head_document(
+    html: bytes | str, encoding: Optional[str] = None, *, engine_name: Optional[str] = None
+) -> Optional[Document]:
+    """Parse only the <head> section; None when the page has no </head>."""
+    m = (_HEAD_END if isinstance(html, bytes) else _HEAD_END_STR).search(html)
+    if not m:
+        return None
+    return parse(html[: m.end()], encoding, engine_name=engine_name)
+
+
+def _walk_ld(node: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(node, list):
+        for n in node:
+            yield from _walk_ld(n)
+    elif isinstance(node, dict):
+        yield node
+        if "@graph" in node:
+            yield from _walk_ld(node["@graph"])
+
+
+def _is_product(node: Dict[str, Any]) -> bool:
+    t = node.get("@type")
+    types = t if isinstance(t, list) else [t]
+    return any(isinstance(x, str) and x.split("/")[-1] == "Product" for x in types)
+
+
+def _ld_images(val: Any) -> List[str]:
+    if isinstance(val, str):
+        return [val]
+    if isinstance(val, dict):
+        u = val.get("url") or val.get("contentUrl")
+        return [u] if isinstance(u, str) else []
+    if isinstance(val, list):
+        return [u for v in val for u in _ld_images(v)]
+    return []
+
+
+def jsonld_product(blocks: List[str]) -> Dict[str, Any]:
+    """
+    First schema.org Product among the JSON-LD blocks, flattened to
+    name / description / images / price / currency / brand (missing keys
+    omitted). Malformed blocks are skipped.
+    """
+    for raw in blocks:
+        try:
+            data = json.loads(raw, strict=False)
+        except ValueError:
+            continue
+        for node in _walk_ld(data):
+            if not _is_product(node):
+                continue
+            out: Dict[str, Any] = {}
+            for key in ("name", "description"):
+                if isinstance(node.get(key), str) and node[key].strip():
+                    out[key] = collapse(node[key])
+            images = _ld_images(node.get("image"))
+            if images:
+                out["images"] = images
+            brand = node.get("brand")
+            if isinstance(brand, dict):
+                brand = brand.get("name")
+            if isinstance(brand, str) and brand.strip():
+                out["brand"] = brand.strip()
+            offers = node.get("offers")
+            offer = offers[0] if isinstance(offers, list) and offers else offers
+            if isinstance(offer, dict):
+                price = offer.get("price", offer.get("lowPrice"))
+                if isinstance(price, (int, float, str)) and str(price).strip():
+                    out["price"] = str(price).strip()
+                if isinstance(offer.get("priceCurrency"), str):
+                    out["currency"] = offer["priceCurrency"]
+            return out
+    return {}
+
+
+__all__ = [
+    "HAS_LXML", "BULLET_SELECTORS", "Document", "parse", "head_document",
+    "jsonld_product", "collapse", "engine",
+]
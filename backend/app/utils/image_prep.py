@@ -0,0 +1,149 @@
+# backend/app/utils/image_prep.py
+"""
+Post-download stage for scraped product images.
+
+CDNs serve the same shot at many URLs and sizes, so URL dedup is not enough.
+Each body is opened in a thread pool (Pillow releases the GIL while decoding),
+reduced to a 32x32 grayscale thumbnail via JPEG draft mode, and hashed with a
+DCT perceptual hash in NumPy. Near-duplicates (small Hamming distance) are
+collapsed to their highest-resolution copy, images that would need too much
+upscaling to cover the canvas are rejected, and the survivors are cover-fit
+to the canvas once, so renderers only ever decode canvas-sized files.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+CANVAS = (1080, 1920)
+HASH_SIZE = 8
+HAMMING_THRESHOLD = int(os.getenv("REELIXX_IMAGE_DUP_BITS", "10"))
+MAX_UPSCALE = float(os.getenv("REELIXX_IMAGE_MAX_UPSCALE", "2.0"))
+WORKERS = int(os.getenv("REELIXX_IMAGE_WORKERS", str(min(8, (os.cpu_count() or 2) * 2))))
+JPEG_QUALITY = 90
+
+_SAMPLE = HASH_SIZE * 4
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * math.sqrt(2.0 / n)
+    m[0] /= math.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+_DCT = _dct_matrix(_SAMPLE)
+
+
+def phash(img: Image.Image) -> int:
+    """64-bit DCT hash: low-frequency coefficients above/below their median."""
+    small = img.convert("L").resize((_SAMPLE, _SAMPLE), Image.BILINEAR)
+    px = np.asarray(small, dtype=np.float32)
+    coeffs = (_DCT @ px @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = coeffs > np.median(coeffs[1:])  # DC term would dominate the median
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class _Candidate:
+    def __init__(self, rank: int, body: bytes, size: Tuple[int, int], hash_: int):
+        self.rank = rank
+        self.body = body
+        self.size = size
+        self.hash = hash_
+
+    @property
+    def area(self) -> int:
+        return self.size[0] * self.size[1]
+
+
+def _upscale_needed(size: Tuple[int, int], canvas: Tuple[int, int]) -> float:
+    return max(canvas[0] / size[0], canvas[1] / size[1])
+
+
+def _inspect(rank: int, body: bytes) -> Optional[_Candidate]:
+    try:
+        img = Image.open(io.BytesIO(body))
+        size = img.size
+        img.draft("L", (_SAMPLE, _SAMPLE))  # JPEG: decode at 1/8 scale or less
+        return _Candidate(rank, body, size, phash(img))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def fit_image(body: bytes, out: Path, canvas: Tuple[int, int] = CANVAS) -> Optional[Path]:
+    """Cover-fit an encoded image to `canvas` and write it to `out` as JPEG; None if undecodable."""
+    try:
+        img = Image.open(io.BytesIO(body))
+        scale = _upscale_needed(img.size, canvas)
+        # decode no larger than the cover size needs (JPEG DCT scaling)
+        img.draft("RGB", (math.ceil(img.size[0] * scale), math.ceil(img.size[1] * scale)))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        ImageOps.fit(img, canvas, Image.LANCZOS).save(out, format="JPEG", quality=JPEG_QUALITY)
+        return out
+    except (OSError, ValueError):
+        return None
+
+
+def dedup(cands: Sequence[_Candidate], threshold: int = HAMMING_THRESHOLD) -> List[_Candidate]:
+    """
+    Group near-duplicates greedily in priority order; each group keeps the
+    slot of its best-ranked member and the pixels of its largest one.
+    """
+    groups: List[List[_Candidate]] = []
+    for c in sorted(cands, key=lambda c: c.rank):
+        for g in groups:
+            if hamming(g[0].hash, c.hash) <= threshold:
+                g.append(c)
+                break
+        else:
+            groups.append([c])
+    return [max(g, key=lambda c: (c.area, -c.rank)) for g in groups]
+
+
+def prepare_images(
+    bodies: Sequence[Optional[bytes]],
+    out_dir: Path,
+    *,
+    limit: int,
+    canvas: Tuple[int, int] = CANVAS,
+    max_upscale: float = MAX_UPSCALE,
+) -> List[Path]:
+    """
+    Decode, dedup, filter and cover-fit downloaded image bodies (in priority
+    order; None entries are skipped). Writes at most `limit` canvas-sized
+    JPEGs to `out_dir` and returns their paths in priority order.
+    """
+    seen_digest = set()
+    jobs: List[Tuple[int, bytes]] = []
+    for rank, body in enumerate(bodies):
+        if not body:
+            continue
+        digest = hashlib.sha1(body).digest()
+        if digest not in seen_digest:  # byte-identical copies never reach the decoder
+            seen_digest.add(digest)
+            jobs.append((rank, body))
+    if not jobs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS, len(jobs)))) as pool:
+        inspected = [c for c in pool.map(lambda j: _inspect(*j), jobs) if c is not None]
+        keep = [c for c in dedup(inspected) if _upscale_needed(c.size, canvas) <= max_upscale][:limit]
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = pool.map(lambda ic: fit_image(ic[1].body, out_dir / f"img_{ic[0]:02d}.jpg", canvas), enumerate(keep))
+        return [p for p in written if p is not None]
+
+
+__all__ = ["CANVAS", "phash", "hamming", "dedup", "fit_image", "prepare_images"]
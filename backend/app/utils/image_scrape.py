@@ -2,14 +2,16 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import List, Tuple
-import re, os, time
+import asyncio, re, os, time
 from urllib.parse import urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
+from . import html_extract
+from .fetch import MAX_IMAGE_BYTES, fetch_many
+from .image_prep import CANVAS, prepare_images
+from .scrape_cache import cached_parse
 
 APP_DIR = Path(__file__).resolve().parents[1]
-EXPORT_DIR = APP_DIR / "exports"
+EXPORT_DIR = Path(os.getenv("REELIXX_EXPORT_DIR", str(APP_DIR / "exports")))
 EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
 VALID_EXT = (".jpg", ".jpeg", ".png", ".webp")
@@ -22,53 +24,78 @@ def _is_valid_img_url(u: str) -> bool:
         return False
     return any(p.path.lower().endswith(ext) for ext in VALID_EXT)
 
-def scrape_product_images(page_url: str, limit: int = 6) -> List[Path]:
+async def scrape_product_images(
+    page_url: str,
+    limit: int = 6,
+    *,
+    force_refresh: bool = False,
+    prepare: bool = True,
+    canvas: Tuple[int, int] = CANVAS,
+    out_dir: Path | None = None,
+) -> List[Path]:
     """
     Fetches likely product images from a product detail page.
     Priority:
       1) og:image
       2) product schema images (if present)
       3) <img> tags that look like product shots (size & name filters)
-    Saves to exports/scraped/<ts>/ and returns a list of local Paths.
+    Candidates are downloaded concurrently (per-host capped, size-limited,
+    one overall deadline) and kept in priority order. With `prepare`, the
+    bodies go through image_prep: near-duplicates collapse to their largest
+    copy, images too small for `canvas` are dropped and survivors are saved
+    cover-fit to `canvas`; otherwise bodies are saved as downloaded.
+    Saves to `out_dir` (default exports/scraped/<ts>/) and returns a list of local Paths.
     """
     try:
-        resp = requests.get(page_url, timeout=15, headers={"User-Agent": "Mozilla/5.0 ReelixxBot"})
-        resp.raise_for_status()
+        found = await cached_parse(page_url, "images", _candidate_urls, force_refresh=force_refresh)
     except Exception:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    uniq = found[: max(1, limit * 2)]  # collect a bit more, we’ll trim after downloads
+    bodies = await fetch_many(uniq, max_bytes=MAX_IMAGE_BYTES)
+
+    # Save to local folder
+    tsdir = out_dir or EXPORT_DIR / "scraped" / str(int(time.time()))
+    if prepare:
+        # decoding/hashing/resizing is CPU work; keep it off the event loop
+        return await asyncio.to_thread(prepare_images, bodies, tsdir, limit=limit, canvas=canvas)
+
+    tsdir.mkdir(parents=True, exist_ok=True)
+    out_paths: List[Path] = []
+    for u, body in zip(uniq, bodies):
+        if not body:
+            continue
+        ext = os.path.splitext(urlparse(u).path)[1].lower()
+        if ext not in VALID_EXT:
+            ext = ".jpg"
+        p = tsdir / f"img_{len(out_paths):02d}{ext}"
+        p.write_bytes(body)
+        out_paths.append(p)
+        if len(out_paths) >= limit:
+            break
+
+    return out_paths
+
+def _candidate_urls(html: bytes, page_url: str, encoding: str | None = None) -> List[str]:
+    doc = html_extract.parse(html, encoding)
     found: List[str] = []
 
     # 1) og:image
-    for tag in soup.select('meta[property="og:image"], meta[name="og:image"]'):
-        c = (tag.get("content") or "").strip()
-        if c:
+    for prop, name, content in doc.metas():
+        c = (content or "").strip()
+        if c and "og:image" in (prop, name):
             found.append(urljoin(page_url, c))
 
     # 2) JSON-LD Product images (simple heuristic)
-    for tag in soup.find_all("script", {"type": "application/ld+json"}):
-        try:
-            txt = tag.string or ""
-            imgs = re.findall(r'"image"\s*:\s*"(.*?)"', txt, flags=re.I)
-            for u in imgs:
-                found.append(urljoin(page_url, u))
-        except Exception:
-            pass
+    for txt in doc.jsonld():
+        for u in re.findall(r'"image"\s*:\s*"(.*?)"', txt, flags=re.I):
+            found.append(urljoin(page_url, u))
 
     # 3) <img> tags
-    for img in soup.find_all("img"):
-        src = (img.get("src") or img.get("data-src") or "").strip()
-        if not src:
-            continue
-        absu = urljoin(page_url, src)
-        alt = (img.get("alt") or "").lower()
-        cls = " ".join(img.get("class") or []).lower()
-        if any(k in alt + " " + cls for k in ["product", "hero", "gallery", "main", "primary"]):
-            found.append(absu)
-        else:
-            # generic fallback
-            found.append(absu)
+    for src, data_src in doc.images():
+        src = (src or data_src).strip()
+        if src:
+            found.append(urljoin(page_url, src))
 
     # Dedup + filter by extension and validity
     uniq = []
@@ -77,30 +104,5 @@ def scrape_product_images(page_url: str, limit: int = 6) -> List[Path]:
         if _is_valid_img_url(u) and u not in seen:
             seen.add(u)
             uniq.append(u)
-        if len(uniq) >= max(1, limit * 2):  # collect a bit more, we’ll trim after downloads
-            break
-
-    # Download to local folder
-    tsdir = EXPORT_DIR / "scraped" / str(int(time.time()))
-    tsdir.mkdir(parents=True, exist_ok=True)
-
-    out_paths: List[Path] = []
-    for u in uniq:
-        try:
-            r = requests.get(u, timeout=15, headers={"User-Agent": "Mozilla/5.0 ReelixxBot"})
-            if r.status_code != 200 or not r.content:
-                continue
-            ext = os.path.splitext(urlparse(u).path)[1].lower()
-            if ext not in VALID_EXT:
-                ext = ".jpg"
-            fname = f"img_{len(out_paths):02d}{ext}"
-            p = tsdir / fname
-            with open(p, "wb") as f:
-                f.write(r.content)
-            out_paths.append(p)
-            if len(out_paths) >= limit:
-                break
-        except Exception:
-            continue
 
-    return out_paths
\ No newline at end of file
+    return uniq
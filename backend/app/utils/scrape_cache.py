@@ -0,0 +1,191 @@
+# backend/app/utils/scrape_cache.py
+"""
+Scrape cache keyed by normalized product URL.
+
+One `pages` row per URL keeps the fetched document (zlib) with its ETag /
+Last-Modified; `parsed` keeps each parser's ("page", "product", "images")
+JSON output for that document version. Within TTL_S a page is served without
+touching the network; after that it is revalidated with a conditional GET,
+and a 304 refreshes it without downloading again. A parser runs once per
+page version, however many parsers read the page. Pages unused for MAX_AGE_S
+are dropped, and the table is trimmed LRU to MAX_ENTRIES. Lives in a local
+SQLite file next to the other caches so API and worker processes share it;
+every SQLite call runs in a worker thread, off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import fetch
+
+APP_DIR = Path(__file__).resolve().parents[1]
+DB_PATH = Path(os.getenv("REELIXX_SCRAPE_CACHE_DB", str(APP_DIR / "cache" / "scrape.sqlite")))
+TTL_S = float(os.getenv("REELIXX_SCRAPE_CACHE_TTL_S", "900"))
+MAX_AGE_S = float(os.getenv("REELIXX_SCRAPE_CACHE_MAX_AGE_S", str(7 * 24 * 3600)))
+MAX_ENTRIES = int(os.getenv("REELIXX_SCRAPE_CACHE_MAX_ENTRIES", "5000"))
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "_ga"}
+
+_local = threading.local()
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop default ports, fragments and tracking params, sort the query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith("utm_") or k.lower() in TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _db() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("DROP TABLE IF EXISTS scrape_cache")  # pre-page-store layout, one row per (url, kind)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, body BLOB NOT NULL, encoding TEXT, digest TEXT NOT NULL,"
+            " etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_pages_used ON pages (used_at)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            " url TEXT NOT NULL, kind TEXT NOT NULL, digest TEXT NOT NULL, data TEXT NOT NULL,"
+            " PRIMARY KEY (url, kind))"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+        _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def _bump(name: str, n: int = 1) -> None:
+    try:
+        _db().execute(
+            "INSERT INTO counters (name, n) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET n = n + excluded.n",
+            (name, n),
+        )
+    except sqlite3.Error:
+        pass
+
+
+# (body, encoding, digest, etag, last_modified, fetched_at)
+Page = Tuple[bytes, Optional[str], str, Optional[str], Optional[str], float]
+
+
+def _load_page(key: str) -> Optional[Page]:
+    row = _db().execute(
+        "SELECT body, encoding, digest, etag, last_modified, fetched_at FROM pages WHERE url = ?", (key,)
+    ).fetchone()
+    return (zlib.decompress(row[0]), *row[1:]) if row else None
+
+
+def _store_page(key: str, page: Page) -> None:
+    body, encoding, digest, etag, last_modified, now = page
+    db = _db()
+    db.execute(
+        "INSERT OR REPLACE INTO pages (url, body, encoding, digest, etag, last_modified, fetched_at, used_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, zlib.compress(body), encoding, digest, etag, last_modified, now, now),
+    )
+    evicted = db.execute("DELETE FROM pages WHERE used_at < ?", (now - MAX_AGE_S,)).rowcount
+    evicted += db.execute(
+        "DELETE FROM pages WHERE rowid IN (SELECT rowid FROM pages ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+        (MAX_ENTRIES,),
+    ).rowcount
+    if evicted:
+        db.execute("DELETE FROM parsed WHERE url NOT IN (SELECT url FROM pages)")
+        _bump("evictions", evicted)
+
+
+def _parse_cached(key: str, kind: str, parse: Callable, url: str, page: Page, outcome: str) -> Any:
+    """Record the lookup, then return `kind`'s parse of this page version (parsing it at most once)."""
+    db = _db()
+    now = time.time()
+    if outcome in ("misses", "refreshes"):
+        _store_page(key, page)
+        if outcome == "refreshes":  # a forced refresh re-runs every parser
+            db.execute("DELETE FROM parsed WHERE url = ?", (key,))
+    elif outcome == "revalidated":
+        db.execute("UPDATE pages SET fetched_at = ?, used_at = ? WHERE url = ?", (now, now, key))
+    else:
+        db.execute("UPDATE pages SET used_at = ? WHERE url = ?", (now, key))
+    _bump(outcome)
+
+    body, encoding, digest = page[:3]
+    row = db.execute("SELECT data FROM parsed WHERE url = ? AND kind = ? AND digest = ?",
+                     (key, kind, digest)).fetchone()
+    if row:
+        return json.loads(row[0])
+    data = parse(body, url, encoding)
+    db.execute("INSERT OR REPLACE INTO parsed (url, kind, digest, data) VALUES (?, ?, ?, ?)",
+               (key, kind, digest, json.dumps(data)))
+    _bump("parses")
+    return data
+
+
+async def cached_parse(
+    url: str,
+    kind: str,
+    parse: Callable[[bytes, str, Optional[str]], Any],
+    *,
+    force_refresh: bool = False,
+) -> Any:
+    """
+    Return parse(html, url, encoding) for `url`. The page is fetched at most
+    once per TTL (or revalidated with a 304) whatever the parser; `kind`
+    names the parser, and each kind parses a given page version once.
+    `force_refresh` skips both the TTL and the conditional headers.
+    """
+    key = normalize_url(url)
+    page = None if force_refresh else await asyncio.to_thread(_load_page, key)
+    if page and time.time() - page[5] < TTL_S:
+        outcome = "hits"
+    else:
+        headers: Dict[str, str] = {}
+        if page and page[3]:
+            headers["If-None-Match"] = page[3]
+        if page and page[4]:
+            headers["If-Modified-Since"] = page[4]
+        body, resp = await asyncio.wait_for(fetch.fetch(url, headers=headers), fetch.DEADLINE_S)
+        if resp.status_code == 304 and page:
+            outcome = "revalidated"
+        else:
+            outcome = "refreshes" if force_refresh else "misses"
+            page = (body, resp.charset_encoding, hashlib.sha1(body).hexdigest(),
+                    resp.headers.get("etag"), resp.headers.get("last-modified"), time.time())
+    # sqlite and the parser both block: keep them off the event loop
+    return await asyncio.to_thread(_parse_cached, key, kind, parse, url, page, outcome)
+
+
+def stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {"hits": 0, "revalidated": 0, "misses": 0, "refreshes": 0, "parses": 0, "evictions": 0}
+    try:
+        db = _db()
+        out.update(dict(db.execute("SELECT name, n FROM counters")))
+        out["entries"] = db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    except sqlite3.Error:
+        out["entries"] = 0
+    out["max_entries"] = MAX_ENTRIES
+    lookups = out["hits"] + out["revalidated"] + out["misses"] + out["refreshes"]
+    out["hit_rate"] = round((out["hits"] + out["revalidated"]) / lookups, 4) if lookups else 0.0
+    return out
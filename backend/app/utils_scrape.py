@@ -1,51 +1,19 @@
 # backend/app/utils_scrape.py
 from __future__ import annotations
 
-import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
+from .utils import html_extract
+from .utils.scrape_cache import cached_parse
 
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/126.0 Safari/537.36"
-    )
-}
-
-
-def _text(el) -> str:
-   
-    return re.sub(r"\s+", " ", (el.get_text(" ", strip=True) if el else "")).strip()
-
-
-def _meta(soup: BeautifulSoup, *names: str) -> str:
-    
-    for n in names:
-        tag = soup.find("meta", property=n) or soup.find("meta", attrs={"name": n})
-        if tag:
-            val = (tag.get("content") or "").strip()
-            if val:
-                return val
-    return ""
-
-
-def _pick_images(soup: BeautifulSoup, base_url: str) -> List[str]:
-   
-    urls: List[str] = []
-
+def _pick_images(doc: html_extract.Document, base_url: str) -> List[str]:
    
-    for tag in soup.find_all("meta", property="og:image"):
-        u = (tag.get("content") or "").strip()
-        if u:
-            urls.append(u)
+    urls: List[str] = [u for u in doc.meta_all("og:image") if u]
 
-    for img in soup.find_all("img"):
-        u = (img.get("src") or img.get("data-src") or "").strip()
+    for src, data_src in doc.images():
+        u = (src or data_src).strip()
         if not u:
             continue
         urls.append(urljoin(base_url, u))
@@ -63,23 +31,13 @@ def _pick_images(soup: BeautifulSoup, base_url: str) -> List[str]:
     return dedup[:12]
 
 
-def _pick_bullets(soup: BeautifulSoup) -> List[str]:
+def _pick_bullets(doc: html_extract.Document) -> List[str]:
     
+    # candidate lists arrive in selector priority order and are only
+    # evaluated until enough bullets are found
     bullets: List[str] = []
-    candidates = []
-    for sel in [
-        ".features ul",
-        ".feature-list ul",
-        ".specs ul",
-        ".specifications ul",
-        "ul[role='list']",
-        "ul",
-    ]:
-        candidates.extend(soup.select(sel))
-
-    for ul in candidates:
-        for li in ul.find_all("li"):
-            t = _text(li)
+    for items in doc.bullet_lists():
+        for t in items:
             if len(t) >= 6 and not t.lower().startswith(("add to cart", "learn more")):
                 bullets.append(t)
         if len(bullets) >= 12:
@@ -94,48 +52,56 @@ def _pick_bullets(soup: BeautifulSoup) -> List[str]:
             out.append(b)
     return out[:8]
 
-def scrape_url(url: str) -> Dict:
-
-    if not isinstance(url, str) or not url.strip():
-        raise ValueError("scrape_url: missing URL")
-
-    resp = requests.get(url, headers=HEADERS, timeout=15)
-    resp.raise_for_status()
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+def parse_page(html: bytes | str, url: str, encoding: Optional[str] = None, *, engine: Optional[str] = None) -> Dict:
+    doc = html_extract.parse(html, encoding, engine_name=engine)
+    product = html_extract.jsonld_product(doc.jsonld())
 
     title = (
-        _meta(soup, "og:title", "twitter:title") or
-        _text(soup.title) or
-        ""
+        doc.meta("og:title", "twitter:title") or
+        html_extract.collapse(doc.title() or "") or
+        product.get("name", "")
     )
 
     description = (
-        _meta(soup, "og:description", "description", "twitter:description") or
-        ""
+        doc.meta("og:description", "description", "twitter:description") or
+        product.get("description", "")
     )
 
-    images = _pick_images(soup, url)
-    bullets = _pick_bullets(soup)
+    images = _pick_images(doc, url)
+    bullets = _pick_bullets(doc)
 
     if not title:
         title = "Your Product"
     if not description:
-        p = soup.find("p")
-        description = _text(p)[:240] if p else "Great product that customers love."
+        p = doc.first_paragraph()
+        description = p[:240] if p is not None else "Great product that customers love."
 
-    return {
+    data = {
         "url": url,
         "title": title.strip(),
         "description": description.strip(),
         "images": images,
         "bullets": bullets,
     }
+    # structured extras from JSON-LD (price / currency / brand) when present
+    for key in ("price", "currency", "brand"):
+        if key in product:
+            data[key] = product[key]
+    return data
+
+
+async def scrape_url(url: str, *, force_refresh: bool = False) -> Dict:
+
+    if not isinstance(url, str) or not url.strip():
+        raise ValueError("scrape_url: missing URL")
+
+    # fetched/revalidated through the scrape cache; parsing runs off the event loop
+    return await cached_parse(url, "page", parse_page, force_refresh=force_refresh)
 
 
-def scrape_brief(url: str) -> Dict:
+async def scrape_brief(url: str, *, force_refresh: bool = False) -> Dict:
 
-    data = scrape_url(url)
+    data = await scrape_url(url, force_refresh=force_refresh)
 
     
     brief = {
@@ -150,4 +116,4 @@ def scrape_brief(url: str) -> Dict:
     return brief
 
 
-__all__ = ["scrape_url", "scrape_brief"]
\ No newline at end of file
+__all__ = ["scrape_url", "scrape_brief", "parse_page"]
\ No newline at end of file
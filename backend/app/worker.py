@@ -0,0 +1,184 @@
+# backend/app/worker.py
+"""
+Render worker service.
+
+    cd backend && python -m app.worker --concurrency 2
+
+Claims queued jobs (see app/jobqueue.py), runs them in a process pool and
+writes progress/results back to the Job row. Heartbeats keep running jobs
+alive; rows whose heartbeat goes stale (e.g. the node died) are requeued by
+whichever worker sweeps next. Every REELIXX_CLEANUP_S the worker also drops
+cached renders no Variant links to (render_cache.cleanup) and, when
+REELIXX_S3_MAX_AGE_H is set, S3 objects older than that which no Variant
+links to (storage.cleanup_old_files).
+
+Deployments that only run the API (the Docker image, Render, startup.sh) get
+an embedded worker instead: with REELIXX_EMBEDDED_WORKER=1 (the default) each
+API process starts one on a background thread at startup. Set it to 0 where a
+separate `python -m app.worker` service consumes the queue (docker-compose).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict
+
+from sqlalchemy.orm import undefer
+
+from . import render_cache
+from .db import SessionLocal, engine
+from .generators import music_bed
+from .jobqueue import claim_next, finish, heartbeat, release, requeue_stale
+from .progress import JobProgress
+from .models import Job
+from .storage import storage
+from .tasks import TASKS
+
+DEFAULT_CONCURRENCY = int(os.getenv("REELIXX_WORKER_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))))
+POLL_S = float(os.getenv("REELIXX_WORKER_POLL_S", "1.0"))
+SWEEP_S = float(os.getenv("REELIXX_WORKER_SWEEP_S", "30"))
+CLEANUP_S = float(os.getenv("REELIXX_CLEANUP_S", "3600"))
+# 0 = never delete from the bucket; only outputs still linked to a Variant are protected
+S3_MAX_AGE_H = int(os.getenv("REELIXX_S3_MAX_AGE_H", "0"))
+EMBEDDED = os.getenv("REELIXX_EMBEDDED_WORKER", "1") == "1"
+EMBEDDED_CONCURRENCY = int(os.getenv("REELIXX_EMBEDDED_WORKER_CONCURRENCY", "1"))
+
+
+def _init_child() -> None:
+    # never reuse pooled connections inherited from the parent process
+    engine.dispose(close=False)
+    # map the decoded music beds now rather than on the first render
+    music_bed.preload()
+
+
+def run_job(job_id: int) -> None:
+    """Executed inside a pool process."""
+    with SessionLocal() as db:
+        job = db.get(Job, job_id, options=[undefer(Job.payload)])
+        if job is None:
+            return
+        kind, payload = job.kind, dict(job.payload or {})
+
+    task = TASKS.get(kind)
+    reporter = JobProgress(job_id)
+    try:
+        if task is None:
+            raise ValueError(f"unknown job kind '{kind}'")
+        result = task(payload, reporter)
+    except Exception as e:
+        reporter.flush()
+        with SessionLocal() as db:
+            finish(db, job_id, error=f"{type(e).__name__}: {e}")
+        return
+
+    reporter.flush()
+    with SessionLocal() as db:
+        finish(db, job_id, result=result)
+
+
+class Worker:
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, poll_s: float = POLL_S):
+        self.concurrency = max(1, int(concurrency))
+        self.poll_s = poll_s
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.running: Dict[Future, int] = {}
+        self._stop = False
+        self._last_sweep = 0.0
+        self._last_cleanup = float("-inf")
+
+    def stop(self, *_: object) -> None:
+        self._stop = True
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_child)
+
+    def _cleanup(self, db) -> None:
+        try:
+            removed = render_cache.cleanup(db)
+            if removed:
+                print(f"[worker] removed {len(removed)} unreferenced cached render(s)")
+            if S3_MAX_AGE_H > 0:
+                storage.cleanup_old_files(S3_MAX_AGE_H, keep=render_cache.protected_s3_keys(db))
+        except Exception as e:  # another worker may be cleaning the same rows
+            db.rollback()
+            print(f"[worker] cleanup failed: {e!r}")
+
+    def _tick(self, pool: ProcessPoolExecutor) -> None:
+        with SessionLocal() as db:
+            now = time.monotonic()
+            if now - self._last_sweep >= SWEEP_S:
+                n = requeue_stale(db)
+                if n:
+                    print(f"[worker] requeued {n} stale job(s)")
+                self._last_sweep = now
+            if now - self._last_cleanup >= CLEANUP_S:
+                self._cleanup(db)
+                self._last_cleanup = now
+
+            heartbeat(db, list(self.running.values()))
+
+            while not self._stop and len(self.running) < self.concurrency:
+                job = claim_next(db, self.name)
+                if job is None:
+                    break
+                self.running[pool.submit(run_job, job.id)] = job.id
+
+    def _reap(self, done: set) -> bool:
+        """Handle finished futures; returns True if the pool broke."""
+        broken = False
+        for fut in done:
+            job_id = self.running.pop(fut)
+            exc = fut.exception()
+            if exc is None:
+                continue
+            broken = broken or isinstance(exc, BrokenProcessPool)
+            with SessionLocal() as db:
+                release(db, job_id, f"worker process died: {exc!r}")
+        return broken
+
+    def serve(self) -> None:
+        print(f"[worker] {self.name} starting with concurrency={self.concurrency}")
+        pool = self._new_pool()
+        try:
+            while not self._stop:
+                self._tick(pool)
+                if self.running:
+                    done, _ = wait(list(self.running), timeout=self.poll_s, return_when=FIRST_COMPLETED)
+                    if self._reap(done):
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = self._new_pool()
+                else:
+                    time.sleep(self.poll_s)
+        finally:
+            pool.shutdown(wait=True)
+
+
+def start_embedded(concurrency: int = EMBEDDED_CONCURRENCY) -> Worker:
+    """Serve the queue from a daemon thread of the calling (API) process; stop() ends it."""
+    w = Worker(concurrency=concurrency)
+    threading.Thread(target=w.serve, name="reelixx-worker", daemon=True).start()
+    return w
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Reelixx render worker")
+    ap.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    ap.add_argument("--poll", type=float, default=POLL_S)
+    args = ap.parse_args()
+
+    # decode missing PCM sidecars once, before the pool processes map them
+    print(f"[worker] preloaded {music_bed.preload()} music bed(s)")
+    w = Worker(concurrency=args.concurrency, poll_s=args.poll)
+    signal.signal(signal.SIGTERM, w.stop)
+    signal.signal(signal.SIGINT, w.stop)
+    w.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Per-variant cost of batch generation as the batch grows.
+
+Against a throwaway SQLite file (default journal/sync settings, so every
+commit is a real fsync) this times, for each N:
+
+- one-by-one: the previous /generate path, N times (three commits and a
+  refresh per variant)
+- batch:      batch.create_batch(n=N), one transaction with bulk INSERTs
+- batch+queue: the same with render=True (N queued renders, shared end card)
+
+    cd backend && python -m scripts.bench_batch [--sizes 1,4,16,64] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import batch, models
+from app.db import Base
+from app.diskcache import DiskCache
+from app.generators import image_pool
+from app.generators.script_template import generate_script
+from app.generators.storyboard import compose_storyboard
+
+BRIEF = {"title": "Thermo Mug", "description": "Keeps coffee hot for 12 hours, fits every cup holder."}
+TONES = ["playful", "expert", "luxury"]
+PERSONAS = ["busy parent", "gen z", "commuter"]
+
+
+def _one_by_one(db, project, n):
+    for tone, persona in batch.variant_matrix(n, TONES, PERSONAS):
+        variant = models.Variant(project_id=project.id, tone=tone, persona=persona, status="draft")
+        db.add(variant)
+        job = models.Job(project_id=project.id, kind="generate-variant", status=models.JobStatus.running)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        script = generate_script(BRIEF, tone=tone, persona=persona)
+        variant.script_json, variant.storyboard_json = script, compose_storyboard(script, BRIEF)
+        variant.status = "ready"
+        job.status = models.JobStatus.completed
+        db.commit()
+        db.refresh(job)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1,4,16,64")
+    ap.add_argument("--json", type=Path, default=None)
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bench_batch_"))
+    engine = create_engine(f"sqlite:///{work / 'bench.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, future=True)
+    image_pool.image_cache = DiskCache(work / "images", max_bytes=1 << 28)
+
+    modes = {
+        "one-by-one": lambda db, p, n: _one_by_one(db, p, n),
+        "batch": lambda db, p, n: batch.create_batch(db, p, n=n, tones=TONES, personas=PERSONAS),
+        "batch+queue": lambda db, p, n: batch.create_batch(db, p, n=n, tones=TONES, personas=PERSONAS,
+                                                           render=True, local_only=True),
+    }
+    rows = []
+    print(f"{'mode':12s} {'N':>5s} {'total ms':>10s} {'ms/variant':>11s}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        for mode, run in modes.items():
+            with Session() as db:
+                project = models.Project(title="bench", brief_json=BRIEF, brand_json={"color": "#224488"})
+                db.add(project)
+                db.commit()
+                t0 = time.perf_counter()
+                run(db, project, n)
+                wall = time.perf_counter() - t0
+            rows.append({"mode": mode, "n": n, "total_ms": round(wall * 1000, 2),
+                         "per_variant_ms": round(wall * 1000 / n, 3)})
+            print(f"{mode:12s} {n:5d} {wall * 1000:10.1f} {wall * 1000 / n:11.2f}")
+
+    engine.dispose()
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
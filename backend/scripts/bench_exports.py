@@ -0,0 +1,100 @@
+"""
+Encode time and file size per export profile and renderer.
+
+Scene assets (local slides at 1080x1920, stub voice clips, one audio track)
+are built once; each renderer then encodes every profile on its own, and the
+ffmpeg renderer additionally encodes all profiles in one shared-decode run.
+The segment renderer starts from an empty cache, so its numbers are a cold
+render.
+
+    cd backend && python -m scripts.bench_exports [--scenes 5] [--seconds 3] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from moviepy.editor import AudioFileClip
+import numpy as np
+from PIL import Image
+
+from app.diskcache import DiskCache
+from app.generators import segment_render
+from app.generators.asset_stage import stub_provider
+from app.generators.audio_timeline import build_timeline
+from app.generators.export_profiles import PROFILES, write_clip_exports
+from app.generators.ffmpeg_render import render_exports
+from app.generators.video_ai import local_scene_image
+
+FPS = 30
+
+
+def _moviepy(slides, audio, outputs):
+    frames = [np.array(Image.open(p).convert("RGB")) for p, _ in slides]
+    clip = AudioFileClip(str(audio))
+    try:
+        write_clip_exports(frames, [d for _, d in slides], clip, outputs, fps=FPS)
+    finally:
+        clip.close()
+
+
+def _ffmpeg(slides, audio, outputs):
+    render_exports(slides, audio, outputs, fps=FPS)
+
+
+def _segments(slides, audio, outputs):
+    for profile, out in outputs:
+        segment_render.render_segments(slides, audio, out, canvas=(1080, 1920), profile=profile, fps=FPS)
+
+
+RENDERERS = {"moviepy": _moviepy, "ffmpeg": _ffmpeg, "segments": _segments}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenes", type=int, default=5)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--json", type=Path, default=None)
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bench_exports_"))
+    stub = stub_provider(work / "stub", voice_s=args.seconds)
+    slides_img = [local_scene_image(f"Scene {i + 1}: benchmark slide", "#224488") for i in range(args.scenes)]
+    track = build_timeline([stub.tts(f"s{i}", "alloy") for i in range(args.scenes)], None)
+    slides = list(zip(slides_img, track["durations"]))
+    audio = track["path"]
+    print(f"{args.scenes} scenes x {args.seconds:.1f}s, fps={FPS}")
+
+    rows = []
+    for renderer, run in RENDERERS.items():
+        for name, profile in PROFILES.items():
+            segment_render.segment_cache = DiskCache(work / f"seg_{renderer}_{name}", max_bytes=1 << 32)
+            out = work / f"{renderer}_{name}.mp4"
+            t0 = time.perf_counter()
+            run(slides, audio, [(profile, out)])
+            wall = time.perf_counter() - t0
+            rows.append({"renderer": renderer, "profile": name, "encode_s": round(wall, 3),
+                         "bytes": out.stat().st_size})
+            print(f"{renderer:8s} {name:24s} {wall:7.2f}s {out.stat().st_size / 1e6:7.2f}MB")
+
+    outputs = [(p, work / f"all_{n}.mp4") for n, p in PROFILES.items()]
+    t0 = time.perf_counter()
+    _ffmpeg(slides, audio, outputs)
+    wall = time.perf_counter() - t0
+    single = sum(r["encode_s"] for r in rows if r["renderer"] == "ffmpeg")
+    rows.append({"renderer": "ffmpeg", "profile": "all (one run)", "encode_s": round(wall, 3),
+                 "bytes": sum(o.stat().st_size for _, o in outputs)})
+    print(f"ffmpeg   {'all profiles, one run':24s} {wall:7.2f}s  (separate runs: {single:.2f}s)")
+
+    Path(audio).unlink(missing_ok=True)
+    for p in slides_img:
+        p.unlink(missing_ok=True)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
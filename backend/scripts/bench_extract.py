@@ -0,0 +1,57 @@
+"""
+Scrape extraction throughput over the saved product-page corpus
+(app/fixtures/product_pages), html.parser versus lxml. Each page goes through
+all three scrape parsers (page brief, image candidates, head-only product).
+
+    cd backend && python -m scripts.bench_extract [--rounds 5]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from app.routers.ai_auto import _parse_product
+from app.utils import html_extract
+from app.utils.image_scrape import _candidate_urls
+from app.utils_scrape import parse_page
+
+CORPUS = Path(__file__).resolve().parents[1] / "app" / "fixtures" / "product_pages"
+
+
+def _run(pages, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for url, raw in pages:
+            parse_page(raw, url, "utf-8")
+            _candidate_urls(raw, url, "utf-8")
+            _parse_product(raw, url, "utf-8")
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    pages = [(f"https://shop.example/products/{p.stem}", p.read_bytes()) for p in sorted(CORPUS.glob("*.html"))]
+    total_mb = sum(len(raw) for _, raw in pages) / 1e6
+    print(f"corpus: {len(pages)} pages, {total_mb:.2f} MB, lxml={'yes' if html_extract.HAS_LXML else 'no'}")
+
+    results = {}
+    for engine in ("html.parser", "lxml"):
+        if engine == "lxml" and not html_extract.HAS_LXML:
+            continue
+        html_extract.ENGINE = engine
+        _run(pages, 1)  # warm imports / compiled XPaths
+        elapsed = _run(pages, args.rounds)
+        n = len(pages) * args.rounds
+        results[engine] = n / elapsed
+        print(f"{engine:12s} {n / elapsed:8.1f} pages/s  {total_mb * args.rounds / elapsed:7.2f} MB/s  "
+              f"{elapsed / n * 1000:7.2f} ms/page")
+    if len(results) == 2:
+        print(f"speedup: {results['lxml'] / results['html.parser']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-card render time with a cold font cache (every draw parses the font file,
+as the renderers did before app/generators/fonts.py) versus a warm one.
+
+    cd backend && python -m scripts.bench_fonts [--cards 50]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("REELIXX_FREE_MODE", "1")
+
+from app.generators import fonts  # noqa: E402
+from app.generators import static_endcard, video_ai, video_stub  # noqa: E402
+
+
+def _time(fn, cards: int, cold: bool) -> float:
+    fn()  # warm imports / first allocation
+    t0 = time.perf_counter()
+    for _ in range(cards):
+        if cold:
+            fonts.clear()
+        fn()
+    return (time.perf_counter() - t0) / cards * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cards", type=int, default=50)
+    args = ap.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    video_ai.EXPORT_DIR = tmp  # keep scene PNGs out of app/exports
+
+    renderers = {
+        "font_only": lambda: (fonts.get_font(115, "sans"), fonts.get_font(58, "rounded"), fonts.get_font(96, "card")),
+        "endcard": lambda: static_endcard.render_endcard({"title": "Hydra Bottle"}, {"color": "#0A84FF"}),
+        "stub_card": lambda: video_stub._render_card("Keeps drinks cold 24h • No leaks", (1080, 1920), "#111111"),
+        "scene_slide": lambda: video_ai.generate_scene_image("Loved by hikers & gym-goers").unlink(),
+    }
+    print(f"fonts: {fonts.FONT_PATHS}")
+    for name, fn in renderers.items():
+        cold = _time(fn, args.cards, cold=True)
+        warm = _time(fn, args.cards, cold=False)
+        print(f"{name:12s} cold={cold:7.2f}ms/card  cached={warm:7.2f}ms/card  saved={cold - warm:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Response size and latency of list / status reads: whole rows (every JSON
+column loaded, the pre-deferral behaviour) vs the summary projections the
+paginated endpoints use.
+
+Seeds a throwaway SQLite file with one project holding --variants template
+variants (real scripts/storyboards) and one finished render job per variant
+(payload + result), then for a 50-row page and for a single job poll times
+query + JSON serialization:
+
+- variants page: Variant rows as VariantOut  vs  /projects/{id}/variants
+- jobs page:     Job rows with payload/result vs  /jobs?project_id=
+- job poll:      whole Job row                 vs  /jobs/{id} (result only)
+
+    cd backend && python -m scripts.bench_lists [--variants 2000] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker, undefer, undefer_group
+
+from app import batch, models, schemas
+from app.db import Base, make_engine
+from app.pagination import keyset_page
+
+BRIEF = {"title": "Thermo Mug", "description": "Keeps coffee hot for 12 hours, fits every cup holder."}
+PAGE = 50
+
+
+def _seed(Session, n: int) -> int:
+    combos = batch.variant_matrix(n, ["playful", "expert", "luxury"], ["busy parent", "gen z", "commuter"])
+    composed = batch.compose_all(BRIEF, combos)
+    with Session() as db:
+        project = models.Project(title="bench", brief_json=BRIEF, brand_json={"color": "#224488"})
+        db.add(project)
+        db.flush()
+        db.execute(insert(models.Variant), [
+            {"project_id": project.id, "tone": t, "persona": p, "status": "ready", "mp4_url": f"/exports/v{i}.mp4",
+             "script_json": script, "storyboard_json": sb}
+            for i, ((t, p), (script, sb)) in enumerate(zip(combos, composed))
+        ])
+        db.execute(insert(models.Job), [
+            {"project_id": project.id, "kind": "assemble-variant", "status": models.JobStatus.completed,
+             "progress": 1.0, "attempts": 1,
+             "payload": {"variant_id": i, "caption": " ".join(b["vo"] for b in script["beats"]), "storyboard": sb},
+             "result_json": {"ok": True, "mp4_url": f"/exports/v{i}.mp4", "storyboard": sb}}
+            for i, (script, sb) in enumerate(composed)
+        ])
+        db.commit()
+        return project.id
+
+
+def _measure(fn, rounds: int):
+    samples, size = [], 0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        size = len(fn())
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=100)
+    ap.add_argument("--json", type=Path, default=None)
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bench_lists_"))
+    engine = make_engine(f"sqlite:///{work / 'bench.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, future=True)
+    pid = _seed(Session, args.variants)
+    V, J = models.Variant, models.Job
+    with Session() as db:
+        job_id = db.query(J.id).order_by(J.id.desc()).limit(1).scalar()
+
+    def full_variants() -> bytes:
+        with Session() as db:
+            rows = (db.query(V).options(undefer_group("json")).filter(V.project_id == pid)
+                    .order_by(V.id.desc()).limit(PAGE).all())
+            return json.dumps([schemas.VariantOut.model_validate(v).model_dump(mode="json") for v in rows]).encode()
+
+    def page_variants() -> bytes:
+        with Session() as db:
+            page = keyset_page(db, schemas.VariantSummary, V.id, V.project_id == pid, limit=PAGE)
+            return schemas.VariantPage.model_validate(page).model_dump_json().encode()
+
+    def full_jobs() -> bytes:
+        with Session() as db:
+            rows = (db.query(J).options(undefer_group("json")).filter(J.project_id == pid)
+                    .order_by(J.id.desc()).limit(PAGE).all())
+            return json.dumps([{**schemas.JobOut.model_validate(j).model_dump(mode="json"), "payload": j.payload}
+                               for j in rows]).encode()
+
+    def page_jobs() -> bytes:
+        with Session() as db:
+            page = keyset_page(db, schemas.JobSummary, J.id, J.project_id == pid, limit=PAGE)
+            return schemas.JobPage.model_validate(page).model_dump_json().encode()
+
+    def full_poll() -> bytes:
+        with Session() as db:
+            job = db.get(J, job_id, options=[undefer_group("json")])
+            return json.dumps({**schemas.JobOut.model_validate(job).model_dump(mode="json"),
+                               "payload": job.payload}).encode()
+
+    def poll() -> bytes:
+        with Session() as db:
+            job = db.get(J, job_id, options=[undefer(J.result_json)])
+            return schemas.JobOut.model_validate(job).model_dump_json().encode()
+
+    cases = {
+        "variants page": (full_variants, page_variants),
+        "jobs page": (full_jobs, page_jobs),
+        "job poll": (full_poll, poll),
+    }
+    rows = []
+    print(f"{'read':14s} {'full ms':>9s} {'new ms':>8s} {'full KB':>9s} {'new KB':>8s}")
+    for name, (old, new) in cases.items():
+        (old_ms, old_b), (new_ms, new_b) = _measure(old, args.rounds), _measure(new, args.rounds)
+        rows.append({"read": name, "full_ms": round(old_ms, 3), "new_ms": round(new_ms, 3),
+                     "full_bytes": old_b, "new_bytes": new_b})
+        print(f"{name:14s} {old_ms:9.2f} {new_ms:8.2f} {old_b / 1024:9.1f} {new_b / 1024:8.1f}")
+
+    engine.dispose()
+    shutil.rmtree(work, ignore_errors=True)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Listing / queue-claim query latency before and after the migration-2 indexes.
+
+Seeds a throwaway SQLite file with --variants variants in per-project
+blocks over --projects projects plus --jobs jobs (the newest --queued still
+queued), drops the listing indexes to get the pre-migration schema, times
+the hot queries, applies app.migrations and times them again:
+
+- latest variant:   projects.get_latest_variant / posttext.get_post_text
+- project jobs:     a project's jobs, newest first
+- claim:            jobqueue.claim_next's "oldest queued job" SELECT
+
+    cd backend && python -m scripts.bench_queries [--variants 1000000] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations, models
+from app.db import Base, make_engine
+
+INDEXES = ("ix_variants_project_id_id", "ix_jobs_project_id_id", "ix_jobs_status_id")
+BATCH = 50_000
+
+
+def _seed(engine, n_variants: int, n_projects: int, n_jobs: int, n_queued: int) -> None:
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.executemany("INSERT INTO projects (id, title) VALUES (?, ?)",
+                        ((i, f"p{i}") for i in range(1, n_projects + 1)))
+        rng = random.Random(7)
+        # batches write a project's variants together, so ids run in per-project blocks
+        for start in range(0, n_variants, BATCH):
+            cur.executemany(
+                "INSERT INTO variants (project_id, tone, status) VALUES (?, 'playful', 'ready')",
+                ((1 + i * n_projects // n_variants,) for i in range(start, min(n_variants, start + BATCH))),
+            )
+        for start in range(0, n_jobs, BATCH):
+            cur.executemany(
+                "INSERT INTO jobs (project_id, kind, status, progress) VALUES (?, 'assemble-variant', ?, 1.0)",
+                ((rng.randint(1, n_projects), "queued" if i >= n_jobs - n_queued else "completed")
+                 for i in range(start, min(n_jobs, start + BATCH))),
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def _time(fn, projects, rounds: int) -> float:
+    """Median ms per call."""
+    samples = []
+    for pid in projects[:rounds]:
+        t0 = time.perf_counter()
+        fn(pid)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _plan(engine, sql: str) -> str:
+    with engine.connect() as conn:
+        return " | ".join(r[-1] for r in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", type=int, default=1_000_000)
+    ap.add_argument("--projects", type=int, default=10_000)
+    ap.add_argument("--jobs", type=int, default=200_000)
+    ap.add_argument("--queued", type=int, default=20)
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--json", type=Path, default=None)
+    args = ap.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="bench_queries_"))
+    engine = make_engine(f"sqlite:///{work / 'bench.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    t0 = time.perf_counter()
+    _seed(engine, args.variants, args.projects, args.jobs, args.queued)
+    print(f"seeded {args.variants} variants / {args.jobs} jobs in {time.perf_counter() - t0:.1f}s")
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+
+    Session = sessionmaker(bind=engine, future=True)
+    db = Session()
+    projects = random.Random(11).sample(range(1, args.projects + 1), min(args.rounds, args.projects))
+
+    queries = {
+        "latest variant": lambda pid: db.query(models.Variant).filter(models.Variant.project_id == pid)
+        .order_by(models.Variant.id.desc()).first(),
+        "project jobs": lambda pid: db.execute(
+            select(models.Job.id).where(models.Job.project_id == pid).order_by(models.Job.id.desc()).limit(20)
+        ).all(),
+        "claim": lambda _pid: db.execute(
+            select(models.Job).where(models.Job.status == models.JobStatus.queued).order_by(models.Job.id).limit(1)
+        ).scalars().first(),
+    }
+    plans = {
+        "latest variant": "SELECT * FROM variants WHERE project_id = 1 ORDER BY id DESC LIMIT 1",
+        "project jobs": "SELECT id FROM jobs WHERE project_id = 1 ORDER BY id DESC LIMIT 20",
+        "claim": "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1",
+    }
+
+    rows = []
+    for phase in ("before", "after"):
+        if phase == "after":
+            db.close()
+            t0 = time.perf_counter()
+            migrations.migrate(engine)
+            with engine.connect() as conn:
+                conn.execute(text("ANALYZE"))
+            print(f"migrations applied in {time.perf_counter() - t0:.1f}s")
+        for name, fn in queries.items():
+            fn(projects[0])  # warm the page cache
+            ms = _time(fn, projects, args.rounds if phase == "after" else min(args.rounds, 50))
+            rows.append({"phase": phase, "query": name, "median_ms": round(ms, 3), "plan": _plan(engine, plans[name])})
+
+    print(f"{'query':16s} {'before ms':>10s} {'after ms':>10s} {'speedup':>8s}")
+    for name in queries:
+        before, after = (next(r["median_ms"] for r in rows if r["phase"] == p and r["query"] == name)
+                         for p in ("before", "after"))
+        print(f"{name:16s} {before:10.3f} {after:10.3f} {before / max(after, 1e-6):7.0f}x")
+    for r in rows:
+        print(f"  {r['phase']:6s} {r['query']:16s} {r['plan']}")
+
+    db.close()
+    engine.dispose()
+    shutil.rmtree(work, ignore_errors=True)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
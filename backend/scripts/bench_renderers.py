@@ -0,0 +1,64 @@
+"""
+Compare the MoviePy, direct-ffmpeg and segment-cache backends of generate_ai_ad.
+
+Each renderer runs in its own child process (free mode, so no API calls) and
+reports wall time plus peak RSS of the Python process and of the ffmpeg
+children it spawned.
+
+    cd backend && python -m scripts.bench_renderers [--runs 3]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STORY_PATH = ROOT / "demo" / "SAMPLE_STORYBOARD.json"
+
+
+def _run_one(renderer: str, storyboard: dict, q) -> None:
+    os.environ["REELIXX_FREE_MODE"] = "1"
+    from app.generators.video_ai import generate_ai_ad
+
+    t0 = time.perf_counter()
+    out = generate_ai_ad(storyboard, "benchmark", renderer=renderer)
+    wall = time.perf_counter() - t0
+
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    size = Path(out["path"]).stat().st_size if Path(out["path"]).exists() else 0
+    q.put({"wall_s": wall, "py_rss_mb": self_kb / 1024, "ffmpeg_rss_mb": child_kb / 1024, "bytes": size})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=1)
+    args = ap.parse_args()
+
+    with open(STORY_PATH) as f:
+        storyboard = json.load(f)
+
+    ctx = mp.get_context("spawn")
+    for renderer in ("moviepy", "ffmpeg", "segments"):
+        rows = []
+        for _ in range(args.runs):
+            q = ctx.Queue()
+            p = ctx.Process(target=_run_one, args=(renderer, storyboard, q))
+            p.start()
+            rows.append(q.get())
+            p.join()
+        best = min(rows, key=lambda r: r["wall_s"])
+        print(
+            f"{renderer:8s} wall={best['wall_s']:.2f}s "
+            f"py_rss={best['py_rss_mb']:.0f}MB ffmpeg_rss={best['ffmpeg_rss_mb']:.0f}MB "
+            f"size={best['bytes'] / 1e6:.2f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
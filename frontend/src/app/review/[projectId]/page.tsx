@@ -4,7 +4,7 @@
 import React, { useEffect, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
 import Link from "next/link";
-import { BACKEND_URL } from "@/lib/api";
+import { BACKEND_URL, waitForJob } from "@/lib/api";
 
 type Variant = { id: number; storyboard_json?: any; script_json?: any };
 
@@ -55,6 +55,8 @@ export default function ReviewPage() {
         const t = await res.text();
         throw new Error(`assemble failed: ${res.status} — ${t}`);
       }
+      const queued = await res.json();
+      if (queued?.job_id) await waitForJob(queued.job_id);
       setStatus("Opening share page…");
       router.push(`/share/${pid}`);
     } catch (e: any) {
@@ -2,7 +2,7 @@
 
 import React, { useEffect, useMemo, useState } from "react";
 import Link from "next/link";
-import { BACKEND_URL } from "@/lib/api";
+import { BACKEND_URL, waitForJob } from "@/lib/api";
 
 type Step = 1 | 2 | 3 | 4 | 5;
 type AdType = "video" | "static" | "carousel";
@@ -174,7 +174,8 @@ export default function StudioPage() {
         throw new Error(`Assemble failed: ${res.status} — ${t}`);
       }
     
-      const info = await res.json();
+      const queued = await res.json();
+      const info = queued?.job_id ? await waitForJob(queued.job_id) : queued;
       const url = info?.mp4_url || info?.url || "";
       setVariant((v) => (v ? { ...v, preview_url: url } : v));
       setStatus("Preview ready ✅");
@@ -43,13 +43,30 @@ export async function getPostText(projectId: number) {
   return r.json();
 }
 
+export async function getJob(jobId: number) {
+  const r = await fetch(`${BACKEND_URL}/jobs/${jobId}`, { cache: "no-store" });
+  if (!r.ok) throw new Error(await r.text());
+  return r.json();
+}
+
+// Renders are queued server-side; poll /jobs/{id} until the worker finishes.
+export async function waitForJob(jobId: number, intervalMs = 1500) {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (job.status === "completed") return job.result_json ?? {};
+    if (job.status === "failed") throw new Error(job.logs || `job ${jobId} failed`);
+    await new Promise((res) => setTimeout(res, intervalMs));
+  }
+}
+
 export async function assembleVariant(variantId: number) {
   const r = await fetch(`${BACKEND_URL}/variants/${variantId}/assemble`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
   });
   if (!r.ok) throw new Error(await r.text());
-  return r.json();
+  const info = await r.json();
+  return info?.job_id ? waitForJob(info.job_id) : info;
 }
 
 export function toAbsolute(u?: string | null) {